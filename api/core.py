@@ -8,7 +8,9 @@ description:
 """
 # ==== native ==== #
 import os
+import re
 import ast
+import time
 from datetime import datetime
 
 # ==== third ==== #
@@ -23,20 +25,37 @@ from machineMonitor.api.models import Log
 from machineMonitor.api.models import LogIn
 from machineMonitor.api.models import Employ
 from machineMonitor.api.models import EmployIn
-from machineMonitor.library.sqlLib import getPrimaryColumn
 from machineMonitor.library.sqlLib import getTableFromDb
 from machineMonitor.library.sqlLib import getRowAsDict
 from machineMonitor.library.sqlLib import getAllRows
-from machineMonitor.library.sqlLib import getAllColumns
+from machineMonitor.library.sqlLib import getRelatedSQLInfo
+from machineMonitor.library.sqlLib import getSchemaVersion
+from machineMonitor.library.sqlLib import getQueryPlan
+from machineMonitor.library.sqlLib import getTableStats
+from machineMonitor.library.sqlLib import getMaxRowid
+from machineMonitor.library.sqlLib import warmReadPool
 from machineMonitor.library.infoLib import getUUID
+from machineMonitor.library.infoLib import getTimeColumns
+from machineMonitor.library.infoLib import getTimeEpoch
 from machineMonitor.library.infoLib import AUTHORISATIONS
+from machineMonitor.library.infoLib import TIME_FORMAT
 
 # ==== global ==== #
 PACKAGE_REPO = os.sep.join(__file__.split(os.sep)[:-2])
-DB_PATH = os.path.join(PACKAGE_REPO, 'data', 'machineMonitor.db')
+DB_PATH = os.environ.get('MACHINE_MONITOR_DB') or os.path.join(PACKAGE_REPO, 'data', 'machineMonitor.db')
 MATCHING_OUT_TYPES = {'machines': Machine, 'logs': Log, 'employs': Employ}
 MATCHING_IN_TYPES = {'machines': MachineIn, 'logs': LogIn, 'employs': EmployIn}
-SQL_KEYS = ['limit', 'offset', 'orderBy', 'descending', 'like', 'iLike']
+SQL_KEYS = ['limit', 'offset', 'orderBy', 'descending', 'like', 'iLike', 'since', 'until']
+TIME_BOUNDS = {'since': '>=', 'until': '<'}  # time range filters on the tables with a timeStamp, until excluded
+DEFAULT_LIMIT = 1000  # rows per table when the client gives no limit
+MAX_LIMIT = 10000  # hard cap on rows per table
+QUERY_TIMEOUT = 5.0  # wall-clock budget in seconds of one /ask request
+PLAN_STEP = re.compile(r'^(SCAN|SEARCH) (?:TABLE )?(\w+)(?: USING (?:COVERING )?(?:INDEX (\w+)|INTEGER PRIMARY KEY))?'
+                       r'(?: \((.*)\))?')  # step of EXPLAIN QUERY PLAN: kind, table, index, constraint
+RANGE_SELECTIVITY = 4  # part of the rows a range on an index is guessed to match, as SQLite does without stat4
+AUTH_CACHE_TTL = 30  # seconds the token -> user mapping is trusted before reloading employs
+_SCHEMA = {}  # 'version' (PRAGMA schema_version) and 'tables' of the last getSchema load
+_USERS = {}  # 'time' and 'data' of the last getAllUserInfo load
 security = HTTPBearer()  # get token from URL Authorization header
 
 
@@ -68,6 +87,27 @@ def formatSqlModifiers(sqlData):
     return ' '.join(parts)
 
 
+def addTimeColumns(dataType, data):
+    """
+    Set the columns derived from timeStamp (ts_epoch, day) the table has, from the timeStamp of the data,
+    so a created or updated record stays in the time range requests. Given values are ignored.
+
+    :param dataType: Name of the table.
+    :type dataType: str
+    :param data: Column -> value of the record.
+    :type data: dict[str, any]
+
+    :return: Record with the derived columns of the table set, the others removed.
+    :rtype: dict[str, any]
+    """
+    timeColumns = getTimeColumns(data['timeStamp']) if data.get('timeStamp') else {}
+    columns = getColumns(dataType)
+
+    data = {k: v for k, v in data.items() if k not in ['ts_epoch', 'day']}
+    data.update({k: v for k, v in timeColumns.items() if k in columns})
+    return data
+
+
 def getAllowedNames(data, credentials : HTTPAuthorizationCredentials=Depends(security)):
     """
     Retrieve list of authorized usernames based on credentials and request data.
@@ -110,11 +150,47 @@ def getAllUserInfo():
     """
     Load and return all user information indexed by token.
 
+    The mapping is cached AUTH_CACHE_TTL seconds, resetCaches drops it after employs changes.
+
     :return: Dictionary with token as key and user info as value.
     :rtype: dict
     """
-    allUsers = getAllRows(DB_PATH, 'employs')
-    return {u.get('token'): u for u in allUsers}
+    now = time.monotonic()
+    if not _USERS or now - _USERS['time'] > AUTH_CACHE_TTL:
+        allUsers = getAllRows(DB_PATH, 'employs')
+        _USERS.update({'time': now, 'data': {u.get('token'): u for u in allUsers}})
+
+    return _USERS['data']
+
+
+def getAuthorisation(token):
+    """
+    Retrieve the role of the user owning the given token.
+
+    :param token: Bearer token of the user.
+    :type token: str
+
+    :return: Authorisation of the user, or None if the token is unknown.
+    :rtype: str | None
+    """
+    userData = getAllUserInfo().get(token)
+    if not userData:
+        return None
+
+    return userData.get('authorisation')
+
+
+def getColumns(dataType):
+    """
+    Retrieve the column names of a table from the schema cache.
+
+    :param dataType: Name of the table.
+    :type dataType: str
+
+    :return: Column names in order, empty list for an unknown table.
+    :rtype: list[str]
+    """
+    return getSchema().get(dataType, {}).get('columns', [])
 
 
 def getDataTypesAndColumns(data):
@@ -131,12 +207,58 @@ def getDataTypesAndColumns(data):
 
     result = {}
     for tableType in tables:
-        columns = getAllColumns(DB_PATH, tableType)
+        columns = getColumns(tableType)
         result[tableType] = {k: v for k, v in data.items() if k in columns}
 
     return result
 
 
+def getEstimatedCount(cmds, limit):
+    """
+    Estimate the rows each SELECT command of an /ask request will read, before running it,
+    from its query plan (EXPLAIN QUERY PLAN) and the ANALYZE statistics: nothing is scanned.
+
+    - index search on equality: average rows per value of the index (sqlite_stat1),
+    - index search on a range: the rows of the table / RANGE_SELECTIVITY,
+    - full scan: the rows of the table, limit when nothing filters nor sorts (the scan stops at LIMIT).
+
+    Without statistics, the rows of a table are bounded by its highest rowid.
+
+    :param cmds: Mapping of table names to (sql, values), as run (see getRequestCmds).
+    :type cmds: dict[str, tuple[str, tuple]]
+    :param limit: LIMIT of the commands.
+    :type limit: int
+
+    :return: Mapping of table names to their estimated number of rows.
+    :rtype: dict[str, int]
+    """
+    tableRows, indexRows = getTableStats(DB_PATH)
+
+    result = {}
+    for table, (sql, values) in cmds.items():
+        rows = tableRows.get(table) or getMaxRowid(DB_PATH, table)
+        plan = getQueryPlan(DB_PATH, sql, values)
+        sorted_ = any(step.startswith('USE TEMP B-TREE') for step in plan)
+
+        estimate = rows
+        for step in plan:
+            match = PLAN_STEP.match(step)
+            if not match or match.group(2) != table:
+                continue
+
+            kind, _, index, constraint = match.groups()
+            if kind == 'SEARCH' and constraint and not re.search(r'[<>]', constraint):
+                estimate = indexRows.get(index, 1)
+            elif kind == 'SEARCH':
+                estimate = rows // RANGE_SELECTIVITY
+            elif ' WHERE ' not in sql and not sorted_:
+                estimate = limit
+
+        result[table] = min(estimate, rows)
+
+    return result
+
+
 def getInfo(dataType, filters):
     """
     Retrieve a single log by its UUID.
@@ -151,11 +273,11 @@ def getInfo(dataType, filters):
     """
 
     # check dataType
-    primaryColumn = getPrimaryColumn(DB_PATH, dataType)
+    primaryColumn = getPrimaryKey(dataType)
     if not primaryColumn:
         raise ValueError(f'no primeKey found in: {DB_PATH} -> {dataType}')
 
-    dataTypes = getTableFromDb(DB_PATH)
+    dataTypes = list(getSchema())
     if not dataTypes:
         raise ValueError(f'no data types found in: {DB_PATH}')
 
@@ -179,6 +301,37 @@ def getInfo(dataType, filters):
     return result
 
 
+def getPrimaryKey(dataType):
+    """
+    Retrieve the primary key column of a table from the schema cache.
+
+    :param dataType: Name of the table.
+    :type dataType: str
+
+    :return: Primary key column name, None for an unknown table or a table without primary key.
+    :rtype: str | None
+    """
+    return getSchema().get(dataType, {}).get('primaryColumn')
+
+
+def getQueryLimit(sqlData):
+    """
+    Resolve the row limit applied to each table of an /ask request.
+
+    :param sqlData: SQL modifiers given by the client, possibly with 'limit'.
+    :type sqlData: dict[str, any]
+
+    :return: DEFAULT_LIMIT if no limit was given, the given limit capped to MAX_LIMIT otherwise.
+    :rtype: int
+    """
+    try:
+        limit = int(sqlData.get('limit') or DEFAULT_LIMIT)
+    except ValueError:
+        limit = DEFAULT_LIMIT
+
+    return max(1, min(limit, MAX_LIMIT))
+
+
 def getRelatedTables(data):
     """
     Identify which tables contain the provided filter keys.
@@ -190,9 +343,9 @@ def getRelatedTables(data):
     :rtype: dict[str, dict[str, any]]
     """
     tables = {}
-    for table in getTableFromDb(DB_PATH):
+    for table, schema in getSchema().items():
         # Fetch all column names for this table
-        columns = getAllColumns(DB_PATH, table)
+        columns = schema['columns']
         # Determine which filters apply to this table
         matching = [col for col in columns if col in data]
         if not matching:
@@ -236,22 +389,133 @@ def getRequestCmd(dataType, data=None, sqlData=None):
                 whereParts.append(f'{k} IN ({placeholders})')
                 values.extend(v)
 
-    cmd = f"SELECT * FROM {dataType}"
-
-    if whereParts:
-        cmd += ' WHERE ' + ' AND '.join(whereParts)
+    timeColumn = sqlData.get('timeColumn') if sqlData else None
+    for key, operator in TIME_BOUNDS.items():
+        if timeColumn and sqlData.get(key) is not None:
+            whereParts.append(f'{timeColumn} {operator} ?')
+            values.append(sqlData[key])
 
     likes = sqlData.get('like', {}) if sqlData else None
     if likes:
-        likeParts = [f'{x} ILIKE ?' if sqlData.get('iLike') else f'{x} LIKE ?' for x in likes]
-        cmd += ' AND ' + ' AND '.join(likeParts)
+        whereParts.extend([f'{x} ILIKE ?' if sqlData.get('iLike') else f'{x} LIKE ?' for x in likes])
         values.extend([f'%{x}%' for x in likes.values()])
 
-    cmd += ' ' + formatSqlModifiers(sqlData)
+    cmd = f"SELECT * FROM {dataType}"
+
+    if whereParts:
+        cmd += ' WHERE ' + ' AND '.join(whereParts)
+
+    cmd += ' ' + formatSqlModifiers(sqlData or {})
 
     return cmd.strip(), tuple(values)
 
 
+def getRequestCmds(tableData, sqlData, credentials):
+    """
+    Build the per table SELECT commands of an /ask request.
+
+    Every command gets a LIMIT of getQueryLimit(sqlData) + 1: the extra row only tells
+    that the table was truncated and is dropped from the result.
+
+    :param tableData: Mapping of table name to its column filters.
+    :type tableData: dict[str, dict]
+    :param sqlData: SQL modifiers (limit, offset, orderBy, ...).
+    :type sqlData: dict[str, any]
+    :param credentials: Token credentials of the caller.
+    :type credentials: fastapi.security.HTTPAuthorizationCredentials
+
+    :return: Mapping of table names to (sql, values).
+    :rtype: dict[str, tuple[str, tuple]]
+    """
+    guardedData = dict(sqlData, limit=getQueryLimit(sqlData) + 1)
+
+    cmds = {}
+    for table, filtersData in tableData.items():
+        if table == 'logs':
+            filtersData['userName'] = getAllowedNames(filtersData, credentials)
+
+        cmds[table] = getRequestCmd(table, filtersData, getTableSqlData(table, guardedData))
+
+    return cmds
+
+
+def getSchema():
+    """
+    Retrieve the tables of the database with their columns and primary key.
+
+    Read again only when PRAGMA schema_version moved (init_db migration, new table): every /ask
+    used to query sqlite_master and PRAGMA table_info several times per table.
+    resetCaches(schema=True) forces a reload.
+
+    :return: Mapping of table name to {'columns': [...], 'primaryColumn': str | None}.
+    :rtype: dict[str, dict]
+    """
+    version = getSchemaVersion(DB_PATH)
+    if _SCHEMA.get('version') == version:
+        return _SCHEMA['tables']
+
+    schema = {}
+    for table in getTableFromDb(DB_PATH):
+        if table.startswith('_'):  # bookkeeping tables (init_db sync state), not data
+            continue
+
+        info = getRelatedSQLInfo(DB_PATH, table)
+        primaryColumns = [x[1] for x in info if x[-1] == 1]
+        schema[table] = {'columns': [x[1] for x in info], 'primaryColumn': min(primaryColumns) if primaryColumns else None}
+
+    _SCHEMA.update({'version': version, 'tables': schema})
+    return schema
+
+
+def getTableSqlData(dataType, sqlData):
+    """
+    Keep only the SQL modifiers that apply to the given table.
+
+    orderBy and like entries naming a column the table does not have are dropped,
+    so one set of modifiers can be shared by every table of a multi-table request.
+
+    since / until (see getTimeEpoch for the accepted formats) only apply to tables with a timeStamp:
+    they filter, and orderBy=timeStamp sorts, on the indexed ts_epoch column when the database
+    has it (init_db migration 3), on the timeStamp text otherwise.
+
+    :param dataType: Name of the table.
+    :type dataType: str
+    :param sqlData: SQL modifiers given by the client.
+    :type sqlData: dict[str, any]
+
+    :return: SQL modifiers valid for this table.
+    :rtype: dict[str, any]
+    """
+    columns = getColumns(dataType)
+
+    tableSqlData = dict(sqlData)
+    if tableSqlData.get('orderBy') not in columns:
+        tableSqlData.pop('orderBy', None)
+        tableSqlData.pop('descending', None)
+
+    hasEpoch = 'ts_epoch' in columns
+    if tableSqlData.get('orderBy') == 'timeStamp' and hasEpoch:
+        tableSqlData['orderBy'] = 'ts_epoch'  # same order, served by the logs_ts_epoch index
+
+    for key in TIME_BOUNDS:
+        if key not in tableSqlData:
+            continue
+
+        if 'timeStamp' not in columns:
+            del tableSqlData[key]
+            continue
+
+        epoch = getTimeEpoch(tableSqlData[key])
+        tableSqlData[key] = epoch if hasEpoch else time.strftime(TIME_FORMAT, time.gmtime(epoch))
+        tableSqlData['timeColumn'] = 'ts_epoch' if hasEpoch else 'timeStamp'
+
+    likes = tableSqlData.get('like')
+    if isinstance(likes, dict):
+        tableSqlData['like'] = {k: v for k, v in likes.items() if k in columns}
+
+    return tableSqlData
+
+
 def getTables(data):
     """
     Retrieve a list of table names based on the 'dataType' field in the input data.
@@ -263,7 +527,7 @@ def getTables(data):
     :rtype: list[str]
     """
     dataType = data.get('dataType')
-    allTables = getTableFromDb(DB_PATH)
+    allTables = list(getSchema())
 
     if not dataType:
         tables = allTables  # No filter, return all tables
@@ -297,7 +561,7 @@ def getUnSerializedValue(dataType, data, inModel=False):
     :rtype: BaseModel
     """
     # determine primary key column for this table
-    primaryKey = getPrimaryColumn(DB_PATH, dataType)
+    primaryKey = getPrimaryKey(dataType)
     # fetch raw row as dict
     row = getRowAsDict(DB_PATH, dataType, data[primaryKey])
 
@@ -317,14 +581,7 @@ def hasAccess(credentials : HTTPAuthorizationCredentials=Depends(security)):
     :return: True if the user has access, False otherwise.
     :rtype: bool
     """
-    token = credentials.credentials
-
-    usersInfo = getAllUserInfo()
-    userData = usersInfo.get(token)
-    if not userData:
-        return False
-
-    return userData.get('authorisation') in AUTHORISATIONS
+    return getAuthorisation(credentials.credentials) in AUTHORISATIONS
 
 
 def logInToDict(logIn, dataType):
@@ -345,9 +602,33 @@ def logInToDict(logIn, dataType):
     if dataType == 'logs':
         # Serialize incoming Pydantic model to dict
         data.update({
-            'timeStamp': datetime.now().strftime('%Y_%m_%d__%H_%M_%S'),
+            'timeStamp': datetime.now().strftime(TIME_FORMAT),
             'userName': os.getlogin(),
             'uuid': getUUID()
         })
+        data = addTimeColumns(dataType, data)
 
     return data
+
+
+def resetCaches(schema=False):
+    """
+    Drop the cached user information and optionally the schema.
+
+    :param schema: Also drop the schema cache.
+    :type schema: bool
+    """
+    _USERS.clear()
+    if schema:
+        _SCHEMA.clear()
+
+
+def warmCaches():
+    """
+    Fill the schema cache, the user cache and the read connection pool.
+
+    Called once at startup so the first requests after a worker (re)start do not pay for it.
+    """
+    getSchema()
+    getAllUserInfo()
+    warmReadPool(DB_PATH)
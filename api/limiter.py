@@ -0,0 +1,121 @@
+"""
+===============================================================================
+fileName: limiter.py
+scripter: angiu
+creation date: 19/10/2026
+description:
+    - token bucket per bearer token, rate and burst scaled with AUTHORISATIONS degree
+    - cap on concurrent heavy queries (multi-table /ask, or reading HEAVY_ROWS rows or more, see api.core.getEstimatedCount)
+    - both raise 429 with a Retry-After header
+===============================================================================
+"""
+# ==== native ==== #
+import math
+import time
+import threading
+from contextlib import contextmanager
+
+# ==== third ==== #
+from fastapi import HTTPException
+
+# ==== local ===== #
+from machineMonitor.library.infoLib import AUTHORISATIONS
+
+# ==== global ==== #
+BASE_RATE = 5  # requests refilled per second for the lowest degree
+BASE_BURST = 20  # bucket capacity for the lowest degree
+RATE_LIMITS = {role: (BASE_RATE * (degree + 1), BASE_BURST * (degree + 1)) for role, degree in AUTHORISATIONS.items()}
+HEAVY_QUERY_SLOTS = 4
+HEAVY_QUERY_WAIT = 2.0  # seconds a heavy query waits for a free slot before 429
+HEAVY_ROWS = 10000  # estimated rows read from which a one table query is heavy
+_BUCKETS = {}
+_BUCKETS_LOCK = threading.Lock()
+_HEAVY_SEMAPHORE = threading.BoundedSemaphore(HEAVY_QUERY_SLOTS)
+
+
+class TokenBucket:
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def consume(self, amount=1):
+        """
+        Take tokens from the bucket.
+
+        :param amount: Number of tokens needed by the request.
+        :type amount: int
+
+        :return: 0 if the request is allowed, otherwise seconds to wait before retrying.
+        :rtype: float
+        """
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+            if self.tokens >= amount:
+                self.tokens -= amount
+                return 0
+
+            return (amount - self.tokens) / self.rate
+
+
+def checkRateLimit(token, authorisation):
+    """
+    Consume one request from the bucket of the given token, raise 429 if it is empty.
+
+    :param token: Bearer token already validated by hasAccess.
+    :type token: str
+    :param authorisation: Role of the token owner (key of AUTHORISATIONS).
+    :type authorisation: str
+    """
+    rate, capacity = RATE_LIMITS.get(authorisation, (BASE_RATE, BASE_BURST))
+
+    with _BUCKETS_LOCK:
+        bucket = _BUCKETS.get(token)
+        if not bucket or (bucket.rate, bucket.capacity) != (rate, capacity):
+            bucket = TokenBucket(rate, capacity)
+            _BUCKETS[token] = bucket
+
+    wait = bucket.consume()
+    if wait:
+        raise HTTPException(status_code=429, detail='too many requests', headers={'Retry-After': str(math.ceil(wait))})
+
+
+@contextmanager
+def heavyQuerySlot():
+    """
+    Hold one of the HEAVY_QUERY_SLOTS while the block runs, raise 429 if none frees up in time.
+    """
+    if not _HEAVY_SEMAPHORE.acquire(timeout=HEAVY_QUERY_WAIT):
+        raise HTTPException(status_code=429, detail='too many concurrent queries', headers={'Retry-After': '1'})
+
+    try:
+        yield
+
+    finally:
+        _HEAVY_SEMAPHORE.release()
+
+
+def isHeavyQuery(estimated):
+    """
+    Tell if an /ask request spans several tables or matches many rows.
+
+    :param estimated: Mapping of table name to its number of matching rows (see api.core.getEstimatedCount).
+    :type estimated: dict[str, int]
+
+    :return: True if the query should hold a heavy query slot.
+    :rtype: bool
+    """
+    return len(estimated) > 1 or any(count >= HEAVY_ROWS for count in estimated.values())
+
+
+def resetLimits():
+    """
+    Forget every token bucket (tests, config reload).
+    """
+    with _BUCKETS_LOCK:
+        _BUCKETS.clear()
@@ -5,42 +5,79 @@ scripter: angiu
 creation date: 29/07/2025
 description:
     - connexion: uvicorn machineMonitor.api.main:app --reload
+    - or with the factory: uvicorn --factory machineMonitor.api.main:createApp
 ===============================================================================
 """
 # ==== native ==== #
+from contextlib import asynccontextmanager
 
 # ==== third ==== #
 from fastapi import FastAPI
+from fastapi import APIRouter
 from fastapi import status
 from fastapi import Request
+from fastapi import Response
 from fastapi import Depends
 from fastapi import HTTPException
 from fastapi.security import HTTPAuthorizationCredentials
 
 # ==== local ===== #
-from machineMonitor.library.sqlLib import getPrimaryColumn
-from machineMonitor.library.sqlLib import getAllRows
 from machineMonitor.library.sqlLib import updateLine
 from machineMonitor.library.sqlLib import createLine
 from machineMonitor.library.sqlLib import deleteLine
-from machineMonitor.library.sqlLib import execMultiRequests
+from machineMonitor.library.sqlLib import execConcurrentRequests
+from machineMonitor.library.sqlLib import closeReadPool
+from machineMonitor.api.core import addTimeColumns
 from machineMonitor.api.core import getDataTypesAndColumns
 from machineMonitor.api.core import getUnSerializedValue
-from machineMonitor.api.core import getAllowedNames
-from machineMonitor.api.core import getRequestCmd
+from machineMonitor.api.core import getAuthorisation
+from machineMonitor.api.core import getEstimatedCount
+from machineMonitor.api.core import getPrimaryKey
+from machineMonitor.api.core import getQueryLimit
+from machineMonitor.api.core import getRequestCmds
 from machineMonitor.api.core import hasAccess
+from machineMonitor.api.core import resetCaches
+from machineMonitor.api.core import warmCaches
 from machineMonitor.api.core import DB_PATH
+from machineMonitor.api.core import QUERY_TIMEOUT
 from machineMonitor.api.core import SQL_KEYS
 from machineMonitor.api.core import MATCHING_OUT_TYPES
 from machineMonitor.api.core import security
+from machineMonitor.api.limiter import checkRateLimit
+from machineMonitor.api.limiter import heavyQuerySlot
+from machineMonitor.api.limiter import isHeavyQuery
 
 # ==== global ==== #
-print(f"Loading FastAPI app from: {__file__}")
+router = APIRouter()
 
-app = FastAPI()  # lowerCase -> conventional
 
+@asynccontextmanager
+async def lifespan(app):
+    """
+    Warm the schema cache, the user cache and the read connection pool before serving,
+    close the pooled connections on shutdown.
+
+    :param app: Application being started.
+    :type app: FastAPI
+    """
+    warmCaches()
+    yield
+    closeReadPool(DB_PATH)
+
+
+def createApp():
+    """
+    Build the FastAPI application.
+
+    :return: Application serving the routes of this module.
+    :rtype: FastAPI
+    """
+    newApp = FastAPI(lifespan=lifespan)
+    newApp.include_router(router)
+    return newApp
 
-@app.post("/create", status_code=status.HTTP_204_NO_CONTENT,  summary="add line from given type and data")
+
+@router.post("/create", status_code=status.HTTP_204_NO_CONTENT,  summary="add line from given type and data")
 def createRecord(request: Request):
     """
     add a record from the specified table.
@@ -60,11 +97,10 @@ def createRecord(request: Request):
 
     try:
         parsed = model(**{k: v for k, v in data.items() if k != 'tableType'})
+        recordData = addTimeColumns(tableType, parsed.model_dump())
     except Exception as e:
         raise HTTPException(status_code=422, detail=str(e))
 
-    recordData = parsed.model_dump()
-
     # Insert into database
     try:
         createLine(DB_PATH, tableType, recordData)
@@ -72,11 +108,14 @@ def createRecord(request: Request):
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
+    if tableType == 'employs':
+        resetCaches()  # new token must be accepted right away
+
     # get new created row
     return getUnSerializedValue(tableType, recordData, True)
 
 
-@app.delete("/delete", status_code=status.HTTP_204_NO_CONTENT, summary="Delete item from given type and primaryKey")
+@router.delete("/delete", status_code=status.HTTP_204_NO_CONTENT, summary="Delete item from given type and primaryKey")
 def deleteRecord(request: Request):
     """
     add a record from the specified table.
@@ -90,7 +129,7 @@ def deleteRecord(request: Request):
     if not tableType:
         raise HTTPException(status_code=422, detail='missing: tableType')
 
-    primaryColumn = getPrimaryColumn(DB_PATH, tableType)
+    primaryColumn = getPrimaryKey(tableType)
     if not primaryColumn:
         raise HTTPException(status_code=422, detail=f'no primary column found for: {tableType}')
 
@@ -104,47 +143,103 @@ def deleteRecord(request: Request):
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
+    if tableType == 'employs':
+        resetCaches()  # deleted token must be refused right away
+
 
-@app.get("/ask", response_model=list[dict], summary="search from filters")
-def dynamicRequest(credentials: HTTPAuthorizationCredentials=Depends(security), request: Request=None):
+@router.get("/ask", response_model=list[dict] | dict[str, list[dict]], summary="search from filters")
+def dynamicRequest(response: Response, credentials: HTTPAuthorizationCredentials=Depends(security), request: Request=None):
     """
     Retrieve machines with optional filters from query string.
 
+    A request matching one table returns its rows as a list. A request matching several
+    tables runs them concurrently and returns the rows grouped by dataType.
+
+    Each table returns at most getQueryLimit(sqlData) rows. When a table had more rows
+    than that, the response carries 'X-Result-Truncated: true' and 'X-Truncated-Tables'.
+
+    The rows each table will read are estimated first from its query plan, without running it
+    (getEstimatedCount, sent back in 'X-Estimated-Count'): a request over several tables or
+    reading HEAVY_ROWS rows or more waits for a heavy query slot.
+
+    since and until restrict the logs to a time range, until excluded (see getTableSqlData),
+    an unreadable time is refused with a 422.
+
+    :param response: FastAPI response, used to report truncation in headers.
+    :type response: Response
     :param credentials: Token credentials extracted from the HTTP Authorization header.
     :type credentials: fastapi.security.HTTPAuthorizationCredentials
     :param request: FastAPI request object containing query_params.
     :type request: Request
 
-    :return: List of Machine instances matching filters.
-    :rtype: list[dict]
+    :return: Rows matching filters, grouped by dataType if several tables matched.
+    :rtype: list[dict] | dict[str, list[dict]]
     """
     if not hasAccess(credentials):
         raise HTTPException(status_code=401, detail="Invalid or missing token")  # unrecognized user
 
+    token = credentials.credentials
+    checkRateLimit(token, getAuthorisation(token))  # 429 if this token exceeds its role rate
+
     requestDict = dict(request.query_params)
     tableData = getDataTypesAndColumns(requestDict)
     sqlData = {k: v for k,v in requestDict.items() if k in SQL_KEYS}
 
-    result = []
+    try:
+        cmds = getRequestCmds(tableData, sqlData, credentials)
+        estimated = getEstimatedCount(cmds, getQueryLimit(sqlData) + 1)
+
+        if isHeavyQuery(estimated):
+            with heavyQuerySlot():
+                result, truncated = runRequest(cmds, getQueryLimit(sqlData))
+        else:
+            result, truncated = runRequest(cmds, getQueryLimit(sqlData))
 
-    cmds = {}
-    for table, filtersData in tableData.items():
-        if table == 'logs':
-            filtersData['userName'] = getAllowedNames(filtersData, credentials)
+    except TimeoutError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={'Retry-After': '1'})
 
-        if not filtersData:
-            result.extend(getAllRows(DB_PATH, table))
-            continue
+    except ValueError as e:  # since / until not readable as a time
+        raise HTTPException(status_code=422, detail=str(e))
 
-        cmds[table] = getRequestCmd(table, filtersData, sqlData)
+    response.headers['X-Result-Limit'] = str(getQueryLimit(sqlData))
+    response.headers['X-Estimated-Count'] = str(sum(estimated.values()))
+    response.headers['X-Result-Truncated'] = 'true' if truncated else 'false'
+    if truncated:
+        response.headers['X-Truncated-Tables'] = ','.join(truncated)
 
-    if cmds:
-        result.extend(execMultiRequests(DB_PATH, cmds))
+    if len(result) <= 1:
+        return next(iter(result.values()), [])
 
     return result
 
 
-@app.put("/update", status_code=status.HTTP_204_NO_CONTENT,  summary="Update an existing record")
+def runRequest(cmds, limit, timeout=QUERY_TIMEOUT):
+    """
+    Execute the per table SELECT commands of an /ask request under the cost guard.
+
+    :param cmds: Mapping of table names to (sql, values) with a LIMIT of limit + 1 (see getRequestCmds).
+    :type cmds: dict[str, tuple[str, tuple]]
+    :param limit: Rows returned at most per table.
+    :type limit: int
+    :param timeout: Wall-clock budget in seconds of the request.
+    :type timeout: float
+
+    :return: Rows matching the filters per table and the names of the truncated tables.
+    :rtype: tuple[dict[str, list[dict]], list[str]]
+    """
+    if not cmds:
+        return {}, []
+
+    result = execConcurrentRequests(DB_PATH, cmds, timeout=timeout)
+
+    truncated = [table for table, rows in result.items() if len(rows) > limit]
+    for table in truncated:
+        del result[table][limit:]
+
+    return result, truncated
+
+
+@router.put("/update", status_code=status.HTTP_204_NO_CONTENT,  summary="Update an existing record")
 def updateRecord(request: Request):
     """
     update a record from the specified table.
@@ -158,7 +253,7 @@ def updateRecord(request: Request):
     if not tableType:
         raise HTTPException(status_code=422, detail='missing: tableType')
 
-    primaryColumn = getPrimaryColumn(DB_PATH, tableType)
+    primaryColumn = getPrimaryKey(tableType)
     if not primaryColumn:
         raise HTTPException(status_code=422, detail=f'no primary column found for: {tableType}')
 
@@ -172,21 +267,23 @@ def updateRecord(request: Request):
 
     try:
         parsed = model(**{k: v for k, v in data.items() if k != 'tableType'})
+        recordData = addTimeColumns(tableType, parsed.model_dump())
     except Exception as e:
         raise HTTPException(status_code=422, detail=str(e))
 
-    recordData = parsed.model_dump()
-
     try:
         updateLine(DB_PATH, tableType, recordData)
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+    if tableType == 'employs':
+        resetCaches()  # token or authorisation may have changed
+
     return getUnSerializedValue(tableType, recordData, True)
 
 
-print("Registered routes →", [route.path for route in app.routes])
+app = createApp()  # lowerCase -> conventional
 
 
 # def simulateServerRequest(filters):
@@ -40,6 +40,8 @@ class Log(BaseModel):
     userName: str
     comment: str | None = None
     modifications: list[tuple[str,str]] | None = None
+    ts_epoch: int | None = None  # derived from timeStamp, see api.core.addTimeColumns
+    day: int | None = None
 
 
 class Employ(BaseModel):
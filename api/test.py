@@ -1,5 +1,12 @@
+import os
+import sqlite3
+
 from fastapi.testclient import TestClient
 from machineMonitor.api.main import app
+from machineMonitor.api import limiter
+from machineMonitor.api import core
+from machineMonitor.library.sqlLib import closeReadPool
+from machineMonitor.library.sqlLib import getReadConnection
 
 client = TestClient(app)
 
@@ -40,3 +47,122 @@ def testGetLogsLikeUser():
 def testSecureLogsRequiresToken():
     response = client.get("/ask")  # no token
     assert response.status_code == 403
+
+
+def testRateLimitReturns429(monkeypatch):
+    limiter.resetLimits()
+    monkeypatch.setitem(limiter.RATE_LIMITS, 'supervisor', (0.5, 2))
+    codes = [client.get("/ask?name=toto&dataType=machines", headers=AUTH_HEADER).status_code for _ in range(3)]
+    assert codes == [200, 200, 429]
+
+    response = client.get("/ask?name=toto&dataType=machines", headers=AUTH_HEADER)
+    assert int(response.headers["Retry-After"]) >= 1
+    limiter.resetLimits()
+
+
+def testAskReportsTruncation():
+    response = client.get("/ask?dataType=machines&limit=1", headers=AUTH_HEADER)
+    assert response.status_code == 200
+    assert len(response.json()) == 1
+    assert response.headers["X-Result-Truncated"] == "true"
+    assert response.headers["X-Truncated-Tables"] == "machines"
+
+
+def testAskEstimatesFilteredCount():
+    response = client.get("/ask?name=testMachine&dataType=machines", headers=AUTH_HEADER)
+    assert response.status_code == 200
+    assert int(response.headers["X-Estimated-Count"]) == len(response.json())
+
+    response = client.get("/ask?dataType=machines&limit=1", headers=AUTH_HEADER)
+    assert int(response.headers["X-Estimated-Count"]) > 1
+
+
+def testAskGroupsMultiTableResults():
+    response = client.get("/ask?dataType=['machines', 'employs']", headers=AUTH_HEADER)
+    assert response.status_code == 200
+    result = response.json()
+    assert set(result) == {"machines", "employs"}
+    assert all(row["dataType"] == "machines" for row in result["machines"])
+
+
+def testAskTimeRangeUsesEpochColumn(monkeypatch):
+    sqlData = {'since': '2025-07-25', 'until': '2025_07_26', 'orderBy': 'timeStamp'}
+    monkeypatch.setattr(core, 'getColumns', lambda dataType: ['uuid', 'timeStamp', 'ts_epoch', 'day'])
+    assert core.getRequestCmd('logs', {}, core.getTableSqlData('logs', sqlData)) == (
+        'SELECT * FROM logs WHERE ts_epoch >= ? AND ts_epoch < ? ORDER BY ts_epoch ASC', (1753401600, 1753488000))
+
+    monkeypatch.setattr(core, 'getColumns', lambda dataType: ['uuid', 'timeStamp'])  # database not migrated
+    assert core.getRequestCmd('logs', {}, core.getTableSqlData('logs', sqlData)) == (
+        'SELECT * FROM logs WHERE timeStamp >= ? AND timeStamp < ? ORDER BY timeStamp ASC',
+        ('2025_07_25__00_00_00', '2025_07_26__00_00_00'))
+
+    monkeypatch.setattr(core, 'getColumns', lambda dataType: ['uuid', 'timeStamp', 'ts_epoch', 'day'])
+    assert core.getRequestCmd('logs', {}, core.getTableSqlData('logs', {'since': '20250725', 'until': 1753488000})) == (
+        'SELECT * FROM logs WHERE ts_epoch >= ? AND ts_epoch < ?', (1753401600, 1753488000))  # YYYYMMDD, not epoch
+
+    response = client.get("/ask?dataType=logs&since=yesterday", headers=AUTH_HEADER)
+    assert response.status_code == 422
+
+
+def testSchemaCacheFollowsMigrations(tmp_path, monkeypatch):
+    dbPath = str(tmp_path / 'schema.db')
+    with sqlite3.connect(dbPath) as conn:
+        conn.execute("CREATE TABLE logs (uuid TEXT PRIMARY KEY, timeStamp TEXT);")
+
+    monkeypatch.setattr(core, 'DB_PATH', dbPath)
+    monkeypatch.setattr(core, '_SCHEMA', {})
+    assert core.getColumns('logs') == ['uuid', 'timeStamp']
+
+    with sqlite3.connect(dbPath) as conn:
+        conn.execute("ALTER TABLE logs ADD COLUMN ts_epoch INTEGER;")
+
+    assert core.getColumns('logs') == ['uuid', 'timeStamp', 'ts_epoch']
+    closeReadPool(dbPath)
+
+
+def testReadPoolDropsConnectionsOfReplacedDatabase(tmp_path):
+    dbPath = str(tmp_path / 'pool.db')
+    for path, rows in [(dbPath, 1), (f'{dbPath}.rebuild', 2)]:
+        with sqlite3.connect(path) as conn:
+            conn.execute("CREATE TABLE logs (uuid TEXT PRIMARY KEY);")
+            conn.executemany("INSERT INTO logs VALUES (?);", [(str(i),) for i in range(rows)])
+
+    with getReadConnection(dbPath) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM logs;").fetchone()[0] == 1
+
+    os.replace(f'{dbPath}.rebuild', dbPath)  # as data.init_db.rebuildDatabase, from another process
+    with getReadConnection(dbPath) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM logs;").fetchone()[0] == 2
+
+    closeReadPool(dbPath)
+
+
+def testEstimateComesFromPlanAndStatistics(tmp_path, monkeypatch):
+    dbPath = str(tmp_path / 'estimate.db')
+    with sqlite3.connect(dbPath) as conn:
+        conn.execute("CREATE TABLE logs (uuid TEXT PRIMARY KEY, comment TEXT, userName TEXT, ts_epoch INTEGER);")
+        conn.execute("CREATE INDEX logs_userName ON logs(userName);")
+        conn.execute("CREATE INDEX logs_ts_epoch ON logs(ts_epoch);")
+        conn.executemany("INSERT INTO logs VALUES (?, ?, ?, ?);", [(str(i), '', f'u{i % 20}', i) for i in range(2000)])
+
+    monkeypatch.setattr(core, 'DB_PATH', dbPath)
+    cmds = {
+        'equality': ("SELECT * FROM logs WHERE userName = ? LIMIT 11", ('u1',)),
+        'range': ("SELECT * FROM logs WHERE ts_epoch >= ? AND ts_epoch < ? LIMIT 11", (0, 10)),
+        'unfiltered': ("SELECT * FROM logs LIMIT 11", ()),
+        'sorted': ("SELECT * FROM logs ORDER BY comment ASC LIMIT 11", ()),
+    }
+
+    def estimate(name):
+        return core.getEstimatedCount({'logs': cmds[name]}, 11)['logs']
+
+    assert estimate('unfiltered') == 11
+    assert estimate('sorted') == 2000  # without ANALYZE, rows bounded by the highest rowid
+
+    with sqlite3.connect(dbPath) as conn:
+        conn.execute("ANALYZE;")
+
+    assert estimate('equality') == 100
+    assert estimate('range') == 2000 // core.RANGE_SELECTIVITY
+    assert estimate('sorted') == 2000
+    closeReadPool(dbPath)
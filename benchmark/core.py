@@ -0,0 +1,663 @@
+"""
+===============================================================================
+fileName: machineMonitor.benchmark.core
+scripter: angiu
+creation date: 19/10/2026
+description:
+    - synthetic plant data (machines, employs, logs) written into a scratch machineMonitor.db
+    - in-process load test of the FastAPI app (/ask, /create, /update, /delete)
+    - results stored as JSON and compared against a previous run
+===============================================================================
+"""
+# ==== native ==== #
+import os
+import sys
+import json
+import time
+import uuid
+import random
+import shutil
+import asyncio
+import sqlite3
+import tempfile
+import subprocess
+from contextlib import contextmanager
+from contextlib import redirect_stdout
+from functools import partial
+from datetime import datetime
+from datetime import timedelta
+
+# ==== third ==== #
+
+# ==== local ===== #
+from machineMonitor.library.infoLib import getTimeColumns
+from machineMonitor.library.infoLib import AUTHORISATIONS
+from machineMonitor.library.infoLib import TIME_FORMAT
+from machineMonitor.library.fileLib import loadJsonFiles
+from machineMonitor.library.fileLib import readJsonFile
+from machineMonitor.library.fileLib import LOAD_MODES
+from machineMonitor.data import init_db
+from machineMonitor.logger import core as loggerCore
+from machineMonitor.logger import journal
+from machineMonitor.machineManager.core import NEEDED_INFOS
+
+# ==== global ==== #
+BENCH_FOLDER = os.path.split(__file__)[0]
+RESULTS_REPO = os.path.join(BENCH_FOLDER, 'results')
+SCRATCH_DB = os.path.join(tempfile.gettempdir(), 'machineMonitorBench', 'machineMonitor.db')
+SCRATCH_LOGS = os.path.join(tempfile.gettempdir(), 'machineMonitorBench', 'logs')
+REBUILD_TARGET = 60.0  # seconds to rebuild machineMonitor.db from a million log files
+LOG_TYPES = loggerCore.LOG_TYPES
+SECTORS = NEEDED_INFOS['sector']
+USAGES = NEEDED_INFOS['usage']
+PACKAGE_PARENT = os.sep.join(__file__.split(os.sep)[:-3])  # folder holding machineMonitor
+SCENARIOS = ['ask', 'window', 'create', 'update', 'delete']
+WRITE_SAMPLE = 2000  # logs saved one by one, then by groups, by runLogsBenchmark
+METRICS = ['throughput', 'p50', 'p95', 'p99', 'importMs', 'startupMs', 'totalMs', 'duration']  # compared between runs
+COLD_START_CODE = """
+import time, json, asyncio
+start = time.perf_counter()
+from {module} import app
+imported = time.perf_counter()
+
+async def startup():
+    async with app.router.lifespan_context(app):
+        print(json.dumps({{'importMs': (imported - start) * 1000, 'startupMs': (time.perf_counter() - imported) * 1000}}))
+
+asyncio.run(startup())
+"""
+BATCH_SIZE = 50000
+
+
+def comparePerformances(current, previous):
+    """
+    Compare two benchmark results scenario by scenario.
+
+    :param current: Result of the run to check (see saveResult).
+    :type current: dict
+    :param previous: Result of the reference run.
+    :type previous: dict
+
+    :return: scenario -> metric -> (previous, current, relative change in %).
+    :rtype: dict[str, dict[str, tuple[float, float, float]]]
+    """
+    comparison = {}
+    for name, stats in current.get('scenarios', {}).items():
+        reference = previous.get('scenarios', {}).get(name)
+        if not reference:
+            continue
+
+        for metric in METRICS:
+            old, new = reference.get(metric), stats.get(metric)
+            if not old or new is None:
+                continue
+
+            comparison.setdefault(name, {})[metric] = (old, new, round((new - old) / old * 100, 1))
+
+    return comparison
+
+
+def generateLogFiles(folder=SCRATCH_LOGS, count=100000, machines=40, seed=0):
+    """
+    Write synthetic log JSON files named by UUID, as the Logger saves them.
+
+    The folder is emptied first.
+
+    :param folder: Folder receiving the logs.
+    :type folder: str
+    :param count: Number of log files.
+    :type count: int
+    :param machines: Number of distinct machine names.
+    :type machines: int
+    :param seed: Random seed.
+    :type seed: int
+
+    :return: Paths of the written files.
+    :rtype: list[str]
+    """
+    if os.path.exists(folder):
+        for entry in os.scandir(folder):
+            if entry.is_file():
+                os.remove(entry.path)
+    else:
+        os.makedirs(folder)
+        print(f'created: {folder}')
+
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 1)
+
+    paths = []
+    for _ in range(count):
+        logUuid = str(uuid.UUID(int=rng.getrandbits(128), version=4))
+        timeStamp = start + timedelta(seconds=rng.randrange(365 * 24 * 3600))
+        data = {'machineName': f'machine_{rng.randrange(machines):04d}', 'type': rng.choice(LOG_TYPES),
+                'project': f'project_{rng.randrange(200)}', 'comment': f'synthetic log {rng.randrange(1000)}',
+                'timeStamp': timeStamp.strftime(TIME_FORMAT), 'userName': f'e{rng.randrange(50):02d}'}
+
+        filePath = os.path.join(folder, f'{logUuid}.json')
+        with open(filePath, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+
+        paths.append(filePath)
+
+    print(f'generated: {count} log files in: {folder}')
+    return paths
+
+
+def generatePlantData(dbPath=SCRATCH_DB, machines=40, employs=50, logs=1000000, seed=0):
+    """
+    Create a scratch database filled with synthetic machines, employs and logs.
+
+    Any existing file at dbPath is replaced. Logs are inserted by batches of BATCH_SIZE
+    with journaling disabled: the file is scratch data, only speed matters. The database
+    is then migrated (init_db.MIGRATIONS) to get the indexes of a production database.
+
+    :param dbPath: Path of the database to create.
+    :type dbPath: str
+    :param machines: Number of machines.
+    :type machines: int
+    :param employs: Number of employs, roles spread over AUTHORISATIONS.
+    :type employs: int
+    :param logs: Number of logs.
+    :type logs: int
+    :param seed: Random seed, same seed gives the same data.
+    :type seed: int
+
+    :return: Token of every employ by role.
+    :rtype: dict[str, list[str]]
+    """
+    folder = os.path.split(dbPath)[0]
+    if not os.path.exists(folder):
+        os.makedirs(folder)
+        print(f'created: {folder}')
+
+    if os.path.exists(dbPath):
+        os.remove(dbPath)
+
+    rng = random.Random(seed)
+    roles = list(AUTHORISATIONS)
+
+    machineNames = [f'machine_{i:04d}' for i in range(machines)]
+    machineRows = [(name, '', rng.random() > 0.1, f'maker_{rng.randrange(8)}', rng.choice(SECTORS),
+                    f'{rng.randrange(10 ** 8):08d}', rng.choice(USAGES), rng.randrange(1990, 2026)) for name in machineNames]
+
+    tokens = {}
+    employRows = []
+    for i in range(employs):
+        role = roles[i % len(roles)]
+        token = f'{rng.getrandbits(256):064x}'
+        tokens.setdefault(role, []).append(token)
+        employRows.append((f'e{i:02d}', token, f'first_{i}', f'last_{i}', role))
+
+    trigrams = [row[0] for row in employRows]
+    start = datetime(2025, 1, 1)
+
+    def logRows():
+        for _ in range(logs):
+            timeStamp = (start + timedelta(seconds=rng.randrange(365 * 24 * 3600))).strftime(TIME_FORMAT)
+            timeColumns = getTimeColumns(timeStamp)
+            yield (str(uuid.UUID(int=rng.getrandbits(128), version=4)), f'synthetic log {rng.randrange(1000)}',
+                   rng.choice(machineNames), f'project_{rng.randrange(200)}', timeStamp,
+                   rng.choice(LOG_TYPES), rng.choice(trigrams), None, timeColumns['ts_epoch'], timeColumns['day'])
+
+    conn = sqlite3.connect(dbPath)
+    try:
+        conn.execute('PRAGMA journal_mode=OFF;')
+        conn.execute('PRAGMA synchronous=OFF;')
+        init_db.createTables(conn)
+        conn.executemany('INSERT INTO machines (name, comment, in_service, manufacturer, sector, serial_number, usage, '
+                         'year_of_acquisition) VALUES (?, ?, ?, ?, ?, ?, ?, ?);', machineRows)
+        conn.executemany('INSERT INTO employs (trigram, token, first_name, last_name, authorisation) '
+                         'VALUES (?, ?, ?, ?, ?);', employRows)
+
+        rows = logRows()
+        while True:
+            batch = [row for _, row in zip(range(BATCH_SIZE), rows)]
+            if not batch:
+                break
+
+            conn.executemany('INSERT INTO logs (uuid, comment, machineName, project, timeStamp, type, userName, '
+                             'modifications, ts_epoch, day) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?);', batch)
+
+        conn.commit()
+
+    finally:
+        conn.close()
+
+    init_db.migrateDatabase(dbPath)
+
+    print(f'generated: {machines} machines, {employs} employs, {logs} logs in: {dbPath}')
+    return tokens
+
+
+def getPeakRss():
+    """
+    Peak resident memory of the current process.
+
+    :return: Peak RSS in KB, or None where the resource module is not available (Windows).
+    :rtype: int | None
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == 'darwin' else peak  # bytes on macOS, KB elsewhere
+
+
+def getScenarioRequests(name, count, tokens, machineNames, seed=0):
+    """
+    Build the requests of one scenario.
+
+    create, update and delete all work on the same count generated machine names,
+    so running them in that order leaves the database as it was.
+
+    :param name: One of SCENARIOS.
+    :type name: str
+    :param count: Number of requests.
+    :type count: int
+    :param tokens: Tokens allowed to call /ask.
+    :type tokens: list[str]
+    :param machineNames: Existing machine names /ask filters on.
+    :type machineNames: list[str]
+    :param seed: Random seed.
+    :type seed: int
+
+    :return: (method, url, params, headers) per request.
+    :rtype: list[tuple[str, str, dict, dict]]
+    """
+    rng = random.Random(seed)
+
+    requests = []
+    for i in range(count):
+        if name == 'ask':
+            headers = {'Authorization': f'Bearer {rng.choice(tokens)}'}
+            params = {'dataType': 'logs', 'machineName': rng.choice(machineNames), 'limit': 100}
+            requests.append(('GET', '/ask', params, headers))
+            continue
+
+        if name == 'window':  # one day of logs, latest first
+            headers = {'Authorization': f'Bearer {rng.choice(tokens)}'}
+            day = datetime(2025, 1, 1) + timedelta(days=rng.randrange(365))
+            params = {'dataType': 'logs', 'since': day.strftime('%Y-%m-%d'),
+                      'until': (day + timedelta(days=1)).strftime('%Y-%m-%d'),
+                      'orderBy': 'timeStamp', 'descending': True, 'limit': 100}
+            requests.append(('GET', '/ask', params, headers))
+            continue
+
+        params = {'tableType': 'machines', 'name': f'bench_{i:06d}'}
+        if name == 'delete':
+            requests.append(('DELETE', '/delete', params, {}))
+            continue
+
+        params.update({'sector': rng.choice(SECTORS), 'serial_number': f'{i:08d}', 'manufacturer': 'bench',
+                       'usage': rng.choice(USAGES), 'year_of_acquisition': 2025, 'in_service': True,
+                       'comment': f'{name} {i}'})
+        requests.append(('POST' if name == 'create' else 'PUT', f'/{name}', params, {}))
+
+    return requests
+
+
+def getStats(latencies, codes, duration):
+    """
+    Summarize the latencies of one scenario.
+
+    :param latencies: Latency of each request in seconds.
+    :type latencies: list[float]
+    :param codes: HTTP status code of each request.
+    :type codes: list[int]
+    :param duration: Wall-clock duration of the scenario in seconds.
+    :type duration: float
+
+    :return: Request count, error count, status codes, throughput (req/s) and latency percentiles (ms).
+    :rtype: dict
+    """
+    ordered = sorted(latencies)
+
+    def percentile(pct):
+        if not ordered:
+            return None
+
+        index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))  # nearest rank
+        return round(ordered[index] * 1000, 3)
+
+    statusCodes = {}
+    for code in codes:
+        statusCodes[str(code)] = statusCodes.get(str(code), 0) + 1
+
+    return {
+        'requests': len(latencies),
+        'errors': len([x for x in codes if x >= 400]),
+        'statusCodes': statusCodes,
+        'duration': round(duration, 3),
+        'throughput': round(len(latencies) / duration, 1) if duration else None,
+        'mean': round(sum(ordered) / len(ordered) * 1000, 3) if ordered else None,
+        'p50': percentile(50),
+        'p95': percentile(95),
+        'p99': percentile(99)
+    }
+
+
+async def runScenario(app, requests, concurrency):
+    """
+    Send requests to the ASGI app in-process with at most concurrency in flight.
+
+    :param app: FastAPI application.
+    :type app: fastapi.FastAPI
+    :param requests: (method, url, params, headers) per request.
+    :type requests: list[tuple[str, str, dict, dict]]
+    :param concurrency: Maximum number of requests in flight.
+    :type concurrency: int
+
+    :return: Stats of the scenario (see getStats).
+    :rtype: dict
+    """
+    import httpx
+
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    codes = []
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url='http://benchmark') as client:
+        async def send(method, url, params, headers):
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.request(method, url, params=params, headers=headers)
+                latencies.append(time.perf_counter() - start)
+                codes.append(response.status_code)
+
+        start = time.perf_counter()
+        await asyncio.gather(*[send(*request) for request in requests])
+        duration = time.perf_counter() - start
+
+    return getStats(latencies, codes, duration)
+
+
+def measureColdStart(module='machineMonitor.api.main', runs=5, dbPath=None, top=10):
+    """
+    Measure how long a fresh interpreter takes to import the API and run its startup hook.
+
+    Each run is a new process started with python -X importtime, as a uvicorn worker restart would be.
+    The best run is kept, with the modules costing the most import time in it.
+
+    :param module: Module exposing the FastAPI app.
+    :type module: str
+    :param runs: Number of processes started.
+    :type runs: int
+    :param dbPath: Database the API opens, None for its default.
+    :type dbPath: str | None
+    :param top: Number of slowest modules reported.
+    :type top: int
+
+    :return: importMs, startupMs and totalMs of the best run, and its slowest modules (self time in ms).
+    :rtype: dict
+    """
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join([PACKAGE_PARENT] + ([env['PYTHONPATH']] if env.get('PYTHONPATH') else []))
+    if dbPath:
+        env['MACHINE_MONITOR_DB'] = dbPath
+
+    best = None
+    for _ in range(runs):
+        process = subprocess.run([sys.executable, '-X', 'importtime', '-c', COLD_START_CODE.format(module=module)],
+                                 capture_output=True, text=True, env=env, check=True)
+        timings = json.loads(process.stdout.strip().splitlines()[-1])
+        timings['totalMs'] = timings['importMs'] + timings['startupMs']
+        if best and best[0]['totalMs'] <= timings['totalMs']:
+            continue
+
+        modules = []
+        for line in process.stderr.splitlines():
+            if not line.startswith('import time:') or 'self [us]' in line:
+                continue
+
+            selfTime, _, name = line[len('import time:'):].split('|')
+            modules.append((name.strip(), int(selfTime) / 1000))
+
+        best = (timings, modules)
+
+    timings, modules = best
+    result = {k: round(v, 3) for k, v in timings.items()}
+    result['slowestModules'] = sorted(modules, key=lambda x: x[1], reverse=True)[:top]
+    result['localImportMs'] = round(sum(t for name, t in modules if name.startswith('machineMonitor')), 3)
+
+    print(f"cold start: import {result['importMs']} ms, startup {result['startupMs']} ms "
+          f"(machineMonitor modules {result['localImportMs']} ms)")
+    return result
+
+
+def runLogsBenchmark(folder=SCRATCH_LOGS, workers=None, modes=None):
+    """
+    Time the loading of every log file of folder: sequential, with each pool mode of loadJsonFiles,
+    then through logger.core.refreshLogsIndex (full rebuild, then refresh with nothing changed),
+    then migrated to logger.journal and read back with one sequential scan.
+    Last, WRITE_SAMPLE logs are saved through logger.core.saveData, one file each then by group commits.
+
+    Files are read once before timing so every scenario sees the same (warm) OS cache;
+    on a network share the pool modes gain much more than on a local disk.
+
+    :param folder: Folder of log files (see generateLogFiles).
+    :type folder: str
+    :param workers: Pool size, None for the executor default.
+    :type workers: int or None
+    :param modes: Pool modes to time, default LOAD_MODES.
+    :type modes: list[str] or None
+
+    :return: files, duration (s) and throughput (files/s) per scenario.
+    :rtype: dict[str, dict]
+    """
+    paths = sorted(entry.path for entry in os.scandir(folder) if entry.name.endswith('.json'))
+    reference = [readJsonFile(path) for path in paths]  # warm the OS cache
+
+    def timed(name, load, files=len(paths)):
+        start = time.perf_counter()
+        loaded = load()
+        duration = time.perf_counter() - start
+        result[name] = {'files': files, 'duration': round(duration, 3),
+                        'throughput': round(files / duration, 1) if duration else None}
+        print(f'{name}: {result[name]["throughput"]} files/s ({result[name]["duration"]} s)')
+        return loaded
+
+    result = {}
+    timed('sequential', lambda: [readJsonFile(path) for path in paths])
+    for mode in modes or LOAD_MODES:
+        loaded = timed(mode, lambda: loadJsonFiles(paths, workers, mode))
+        if loaded != reference:
+            raise RuntimeError(f'{mode} load does not match the sequential one')
+
+    with scratchLogsRepo(folder):
+        timed('indexRebuild', loggerCore.refreshLogsIndex)
+        timed('indexRefresh', loggerCore.refreshLogsIndex)
+        timed('journalMigration', loggerCore.migrateLogsToJournal)
+        journal.resetJournal()
+        timed('journalScan', journal.getLogs)
+
+    def save(logs):
+        with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+            for logData in logs:
+                loggerCore.saveData(dict(logData))
+
+            loggerCore.flushLogs()
+
+    writes = [x for x in reference if x][:WRITE_SAMPLE]
+    batch = loggerCore.WRITE_BATCH
+    for name, size in [('saveEach', 0), ('saveBatched', 256)]:
+        writeFolder = os.path.join(folder, f'.{name}')
+        with scratchLogsRepo(writeFolder):
+            loggerCore.WRITE_BATCH = size
+            try:
+                timed(name, partial(save, writes), len(writes))
+            finally:
+                loggerCore.WRITE_BATCH = batch
+
+        shutil.rmtree(writeFolder)
+
+    return result
+
+
+def runRebuildBenchmark(folder=SCRATCH_LOGS, dbPath=SCRATCH_DB, workers=None, mode='process'):
+    """
+    Time init_db.rebuildDatabase on the log files of folder (machines and employs folders left empty).
+
+    :param folder: Folder of log files (see generateLogFiles).
+    :type folder: str
+    :param dbPath: Database to rebuild, replaced.
+    :type dbPath: str
+    :param workers: Pool size, None for the executor default.
+    :type workers: int or None
+    :param mode: 'process' or 'thread'.
+    :type mode: str
+
+    :return: Stage metrics, duration (s), throughput (logs/s) and the projected duration for a million logs.
+    :rtype: dict[str, dict]
+    """
+    emptyFolder = tempfile.mkdtemp(prefix='machineMonitorBench')
+    saved = dict(init_db.REPOS), init_db.DB_PATH
+    init_db.REPOS.update({'machines': emptyFolder, 'logs': folder, 'employs': emptyFolder})
+    init_db.DB_PATH = dbPath
+    os.makedirs(os.path.dirname(dbPath), exist_ok=True)
+    try:
+        rebuilt = init_db.rebuildDatabase(workers, mode)
+
+    finally:
+        init_db.REPOS.clear()
+        init_db.REPOS.update(saved[0])
+        init_db.DB_PATH = saved[1]
+        shutil.rmtree(emptyFolder)
+
+    logs = rebuilt['logs']['written']
+    projected = rebuilt['total'] * 10 ** 6 / logs if logs else None
+    print(f'rebuild: {logs} logs in {rebuilt["total"]} s, projected for 1M logs: {projected:.1f} s (target {REBUILD_TARGET} s)')
+
+    result = {f'rebuild.{stage}': metrics for stage, metrics in rebuilt['logs']['stages'].items()}
+    result['rebuild'] = {'files': logs, 'duration': rebuilt['total'], 'index': rebuilt['index'],
+                         'throughput': round(logs / rebuilt['total'], 1) if rebuilt['total'] else None,
+                         'projectedMillion': round(projected, 1) if projected else None}
+    return result
+
+
+def runApiBenchmark(dbPath=SCRATCH_DB, requests=1000, concurrency=8, scenarios=None, rateLimit=False, seed=0):
+    """
+    Drive the API in-process against an existing benchmark database.
+
+    The API reads MACHINE_MONITOR_DB at import, so this must run before anything
+    imported machineMonitor.api in the current process.
+
+    :param dbPath: Database generated by generatePlantData.
+    :type dbPath: str
+    :param requests: Number of requests per scenario.
+    :type requests: int
+    :param concurrency: Maximum number of requests in flight.
+    :type concurrency: int
+    :param scenarios: Scenarios to run, in order, default SCENARIOS.
+    :type scenarios: list[str] | None
+    :param rateLimit: Keep the per-token rate limits, off by default to measure the raw API.
+    :type rateLimit: bool
+    :param seed: Random seed.
+    :type seed: int
+
+    :return: Stats per scenario.
+    :rtype: dict[str, dict]
+    """
+    os.environ['MACHINE_MONITOR_DB'] = dbPath
+    from machineMonitor.api.main import app
+    from machineMonitor.api.core import DB_PATH
+    from machineMonitor.api import limiter
+
+    if os.path.realpath(DB_PATH) != os.path.realpath(dbPath):
+        raise RuntimeError(f'api already loaded on: {DB_PATH}')
+
+    if not rateLimit:
+        for role in limiter.RATE_LIMITS:
+            limiter.RATE_LIMITS[role] = (10 ** 9, 10 ** 9)
+
+        limiter.resetLimits()
+
+    with sqlite3.connect(dbPath) as conn:
+        rows = conn.execute('SELECT trigram, token, authorisation FROM employs;').fetchall()
+        machineNames = [row[0] for row in conn.execute('SELECT name FROM machines;')]
+
+    tokens = [token for _, token, role in rows if role in AUTHORISATIONS]
+
+    result = {}
+    for name in scenarios or SCENARIOS:
+        scenarioRequests = getScenarioRequests(name, requests, tokens, machineNames, seed)
+        result[name] = asyncio.run(runScenario(app, scenarioRequests, concurrency))
+        print(f"{name}: {result[name]['throughput']} req/s, p50 {result[name]['p50']} ms, "
+              f"p95 {result[name]['p95']} ms, p99 {result[name]['p99']} ms, {result[name]['errors']} errors")
+
+    return result
+
+
+@contextmanager
+def scratchLogsRepo(folder):
+    """
+    Point logger.core and logger.journal at another logs folder for the duration of the block,
+    starting with an empty index and an empty journal.
+
+    :param folder: Logs folder to use.
+    :type folder: str
+    """
+    saved = loggerCore.LOGS_REPO, loggerCore.LOGS_INDEX_FILE, dict(loggerCore._LOGS_INDEX), journal.JOURNAL_REPO
+    loggerCore.LOGS_REPO = folder
+    loggerCore.LOGS_INDEX_FILE = os.path.join(folder, '.index.json')
+    loggerCore._LOGS_INDEX.clear()
+    if os.path.exists(loggerCore.LOGS_INDEX_FILE):
+        os.remove(loggerCore.LOGS_INDEX_FILE)
+
+    journal.JOURNAL_REPO = os.path.join(folder, '.journal')
+    journal.resetJournal()
+    if os.path.exists(journal.JOURNAL_REPO):
+        shutil.rmtree(journal.JOURNAL_REPO)
+
+    try:
+        yield
+
+    finally:
+        loggerCore.LOGS_REPO, loggerCore.LOGS_INDEX_FILE = saved[:2]
+        loggerCore._LOGS_INDEX.clear()
+        loggerCore._LOGS_INDEX.update(saved[2])
+        journal.JOURNAL_REPO = saved[3]
+        journal.resetJournal()
+
+
+def saveResult(kind, config, scenarios, folder=RESULTS_REPO):
+    """
+    Write a benchmark result as JSON.
+
+    :param kind: Benchmark name, used as file prefix.
+    :type kind: str
+    :param config: Parameters of the run.
+    :type config: dict
+    :param scenarios: Stats per scenario.
+    :type scenarios: dict[str, dict]
+    :param folder: Folder receiving the result.
+    :type folder: str
+
+    :return: Path of the written file and its content.
+    :rtype: tuple[str, dict]
+    """
+    if not os.path.exists(folder):
+        os.makedirs(folder)
+        print(f'created: {folder}')
+
+    timeStamp = datetime.now().strftime(TIME_FORMAT)
+    data = {
+        'kind': kind,
+        'timeStamp': timeStamp,
+        'python': sys.version.split()[0],
+        'platform': sys.platform,
+        'sqlite': sqlite3.sqlite_version,
+        'config': config,
+        'peakRssKb': getPeakRss(),
+        'scenarios': scenarios
+    }
+
+    filePath = os.path.join(folder, f'{kind}_{timeStamp}.json')
+    with open(filePath, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
+
+    print(f'saved: {filePath}')
+    return filePath, data
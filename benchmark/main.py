@@ -0,0 +1,125 @@
+"""
+===============================================================================
+fileName: machineMonitor.benchmark.main
+scripter: angiu
+creation date: 19/10/2026
+description:
+    - python -m machineMonitor.benchmark.main api --logs 1000000 --requests 2000 --concurrency 16
+    - python -m machineMonitor.benchmark.main --compare benchmark/results/api_<date>.json api --skip-generate
+    - python -m machineMonitor.benchmark.main importtime --runs 10
+    - python -m machineMonitor.benchmark.main logs --files 100000 --workers 16
+    - python -m machineMonitor.benchmark.main rebuild --files 1000000
+===============================================================================
+"""
+# ==== native ==== #
+import sys
+import json
+import argparse
+
+# ==== third ==== #
+
+# ==== local ===== #
+from machineMonitor.benchmark.core import comparePerformances
+from machineMonitor.benchmark.core import generateLogFiles
+from machineMonitor.benchmark.core import generatePlantData
+from machineMonitor.benchmark.core import measureColdStart
+from machineMonitor.benchmark.core import runApiBenchmark
+from machineMonitor.benchmark.core import runLogsBenchmark
+from machineMonitor.benchmark.core import runRebuildBenchmark
+from machineMonitor.benchmark.core import saveResult
+from machineMonitor.benchmark.core import RESULTS_REPO
+from machineMonitor.benchmark.core import SCENARIOS
+from machineMonitor.benchmark.core import SCRATCH_DB
+from machineMonitor.benchmark.core import SCRATCH_LOGS
+from machineMonitor.library.fileLib import LOAD_MODES
+
+# ==== global ==== #
+
+
+def getParser():
+    parser = argparse.ArgumentParser(prog='machineMonitor.benchmark', description='machineMonitor benchmarks')
+    parser.add_argument('--results', default=RESULTS_REPO, help='folder receiving the JSON results')
+    parser.add_argument('--compare', help='previous result JSON to compare with')
+    subParsers = parser.add_subparsers(dest='kind', required=True)
+
+    api = subParsers.add_parser('api', help='load test of the FastAPI app on synthetic data')
+    api.add_argument('--db', default=SCRATCH_DB, help='scratch database path')
+    api.add_argument('--machines', type=int, default=40)
+    api.add_argument('--employs', type=int, default=50)
+    api.add_argument('--logs', type=int, default=1000000)
+    api.add_argument('--requests', type=int, default=1000, help='requests per scenario')
+    api.add_argument('--concurrency', type=int, default=8)
+    api.add_argument('--scenarios', nargs='+', choices=SCENARIOS, default=SCENARIOS)
+    api.add_argument('--seed', type=int, default=0)
+    api.add_argument('--rate-limit', action='store_true', help='keep the per-token rate limits')
+    api.add_argument('--skip-generate', action='store_true', help='reuse the existing scratch database')
+
+    importTime = subParsers.add_parser('importtime', help='cold start of the API in fresh interpreters')
+    importTime.add_argument('--module', default='machineMonitor.api.main')
+    importTime.add_argument('--runs', type=int, default=5)
+    importTime.add_argument('--db', help='database opened by the startup hook, default the API one')
+
+    logs = subParsers.add_parser('logs', help='loading of many log files, sequential vs pools vs log index vs journal')
+    logs.add_argument('--folder', default=SCRATCH_LOGS, help='scratch logs folder')
+    logs.add_argument('--files', type=int, default=100000)
+    logs.add_argument('--machines', type=int, default=40)
+    logs.add_argument('--workers', type=int)
+    logs.add_argument('--modes', nargs='+', choices=LOAD_MODES, default=LOAD_MODES)
+    logs.add_argument('--seed', type=int, default=0)
+    logs.add_argument('--skip-generate', action='store_true', help='reuse the existing scratch logs')
+
+    rebuild = subParsers.add_parser('rebuild', help='full rebuild of machineMonitor.db from log files (init_db --rebuild)')
+    rebuild.add_argument('--folder', default=SCRATCH_LOGS, help='scratch logs folder')
+    rebuild.add_argument('--db', default=SCRATCH_DB, help='scratch database path')
+    rebuild.add_argument('--files', type=int, default=1000000)
+    rebuild.add_argument('--machines', type=int, default=40)
+    rebuild.add_argument('--workers', type=int)
+    rebuild.add_argument('--mode', choices=['process', 'thread'], default='process')
+    rebuild.add_argument('--seed', type=int, default=0)
+    rebuild.add_argument('--skip-generate', action='store_true', help='reuse the existing scratch logs')
+
+    return parser
+
+
+def printComparison(comparison):
+    for name, metrics in comparison.items():
+        for metric, (old, new, change) in metrics.items():
+            print(f'{name}.{metric}: {old} -> {new} ({change:+}%)')
+
+
+def main(argv=None):
+    args = getParser().parse_args(argv)
+
+    if args.kind == 'api':
+        if not args.skip_generate:
+            generatePlantData(args.db, args.machines, args.employs, args.logs, args.seed)
+
+        scenarios = runApiBenchmark(args.db, args.requests, args.concurrency, args.scenarios, args.rate_limit, args.seed)
+
+    elif args.kind == 'importtime':
+        scenarios = {args.module: measureColdStart(args.module, args.runs, args.db)}
+
+    elif args.kind == 'logs':
+        if not args.skip_generate:
+            generateLogFiles(args.folder, args.files, args.machines, args.seed)
+
+        scenarios = runLogsBenchmark(args.folder, args.workers, args.modes)
+
+    elif args.kind == 'rebuild':
+        if not args.skip_generate:
+            generateLogFiles(args.folder, args.files, args.machines, args.seed)
+
+        scenarios = runRebuildBenchmark(args.folder, args.db, args.workers, args.mode)
+
+    config = {k: v for k, v in vars(args).items() if k not in ['results', 'compare']}
+    _, result = saveResult(args.kind, config, scenarios, args.results)
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            printComparison(comparePerformances(result, json.load(f)))
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -8,10 +8,19 @@ Creates the tables `machines` and `logs` if they don’t exist.
 
 import sqlite3
 import os
+import argparse
 import json
+import time
+import hashlib
+from collections import deque
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ProcessPoolExecutor
 
-from machineMonitor.library.sqlLib import getRelatedSQLInfo
-from machineMonitor.library.sqlLib import syncDatabase
+from machineMonitor.library.sqlLib import writeLines
+from machineMonitor.library.sqlLib import closeReadPool
+from machineMonitor.library.infoLib import getTimeColumns
+from machineMonitor.logger import journal
 
 
 # 1. db based on this module path
@@ -24,6 +33,13 @@ REPOS = {
 }
 BOOLEAN_CONVERTER = {True: ['oui', 'o', 'yes', 'y', 'true'], False: ['non', 'n', 'no', 'false']}
 MATCHING_TYPES = {'TEXT': str, 'BOOLEAN': bool, 'INTEGER': int}
+SYNC_BATCH = 5000  # files converted by one worker task and written in one transaction by publishFromLocal
+SYNC_DEPTH = 2  # batches in flight per worker between the convert and write stages
+SYNC_WORKERS = int(os.environ.get('MACHINE_MONITOR_SYNC_WORKERS') or 0) or None  # None: executor default
+SYNC_MODE = os.environ.get('MACHINE_MONITOR_SYNC_MODE') or 'process'
+BACKFILL_CHUNK = 20000  # rows per transaction when a migration fills a new column
+DERIVED_COLUMNS = {'ts_epoch': 'timeStamp', 'day': 'timeStamp'}  # column -> source field, see getTimeColumns
+LOG_STORAGE = os.environ.get('MACHINE_MONITOR_LOG_STORAGE') or 'files'  # where the logs are read, see logger.core.LOG_STORAGE
 
 
 # DLL: Data Definition Language
@@ -61,80 +77,604 @@ CREATE TABLE IF NOT EXISTS employs(
     last_name TEXT,
     authorisation TEXT
 );
+
+
+CREATE TABLE IF NOT EXISTS _sync_state(
+    tableName TEXT NOT NULL,
+    fileName TEXT NOT NULL,
+    mtime INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    hash TEXT NOT NULL,
+    PRIMARY KEY(tableName, fileName)
+);
 '''
 
 
-def publishFromLocal():
-    """
-    Synchronize local JSON data files into the SQLite database.
+# secondary indexes, see MIGRATIONS
+INDEXES = '''
+CREATE INDEX IF NOT EXISTS logs_machineName ON logs(machineName);
+CREATE INDEX IF NOT EXISTS logs_userName ON logs(userName);
+CREATE INDEX IF NOT EXISTS logs_timeStamp ON logs(timeStamp);
+'''
+
+
+# numeric time columns of the logs, see MIGRATIONS
+TIME_INDEXES = '''
+CREATE INDEX IF NOT EXISTS logs_ts_epoch ON logs(ts_epoch);
+CREATE INDEX IF NOT EXISTS logs_day ON logs(day);
+'''
+
 
-    Iterates over each table in REPOS, loads corresponding JSON files,
-    converts their fields to the appropriate types, and inserts or updates
-    records via `updateDb`.
+def convertRecord(relatedDBInfo, keyName, jsonData, filePath=None):
     """
-    data = {}
-    for tableName, folder in REPOS.items():
-        relatedDBInfo = getRelatedSQLInfo(DB_PATH, tableName)
-        if not relatedDBInfo:
+    Convert the content of a JSON file into a row of its table.
+
+    :param relatedDBInfo: Column metadata of the table (see sqlLib.getRelatedSQLInfo).
+    :type relatedDBInfo: list[tuple]
+    :param keyName: Primary key value (file name without extension).
+    :type keyName: str
+    :param jsonData: Content of the JSON file.
+    :type jsonData: dict
+    :param filePath: Source of the data, for error messages.
+    :type filePath: str or None
+
+    :return: Column -> converted value, optional columns without value left out.
+    :rtype: dict
+    """
+    toSync = {}
+    derived = {}
+    for info in relatedDBInfo:
+        columnName, columnType, required, isPrimKey = info[1], info[2], info[3], info[5]
+        if isPrimKey:
+            toSync[columnName] = keyName
+            continue
+
+        source = DERIVED_COLUMNS.get(columnName)
+        if source:
+            if source not in derived:
+                derived[source] = readTimeColumns(jsonData.get(source))  # empty for a bad timeStamp: NULL columns
+
+            if columnName in derived[source]:
+                toSync[columnName] = derived[source][columnName]
+
             continue
 
-        for filename  in os.listdir(folder):
-            if not filename .endswith('.json'):
+        # check if value was given and if it's a required value
+        raw = jsonData.get(columnName)
+        if not raw:
+            if not required:
                 continue
 
-            keyName = os.path.splitext(filename)[0]
-            path = os.path.join(folder, filename)
+            raise ValueError(f'missing {columnName} in: {filePath or keyName}')
+
+        # Conversion from data type
+        if columnType == 'BOOLEAN':
+            booleanValue = [k for k, v in BOOLEAN_CONVERTER.items() if raw.lower() in v]
+            if not booleanValue:
+                raise ValueError(f"can't convert: {raw} as boolean")
+
+            toSync[columnName] = booleanValue[0]
+
+        else:
+            toSync[columnName] = MATCHING_TYPES[columnType](raw)
+
+    return toSync
+
+
+def getFileHash(content):
+    """
+    :param content: Bytes of a JSON file.
+    :type content: bytes
+
+    :return: Digest telling a touched file from a modified one.
+    :rtype: str
+    """
+    return hashlib.blake2b(content, digest_size=16).hexdigest()
+
+
+def getTimeColumn(column, timeStamp):
+    """
+    :param column: One of DERIVED_COLUMNS.
+    :type column: str
+    :param timeStamp: Time stamp of a log.
+    :type timeStamp: str or None
+
+    :return: Value of the column for this timeStamp, None if it can't be read (left NULL).
+    :rtype: int or None
+    """
+    return readTimeColumns(timeStamp).get(column)
+
+
+def readTimeColumns(timeStamp):
+    """
+    :param timeStamp: Time stamp of a log.
+    :type timeStamp: str or None
+
+    :return: DERIVED_COLUMNS of this timeStamp (see getTimeColumns), empty if it can't be read.
+    :rtype: dict[str, int]
+    """
+    try:
+        return getTimeColumns(timeStamp)
+    except (TypeError, ValueError):
+        return {}
+
 
-            filePath = os.path.join(folder, filename)
-            with open(path, 'r', encoding='utf-8') as f:
-                jsonData = json.load(f)
+def getSyncState(conn, tableName):
+    """
+    :param conn: Connection to the database.
+    :type conn: sqlite3.Connection
+    :param tableName: Table synchronized from REPOS.
+    :type tableName: str
+
+    :return: fileName -> (mtime ns, size, hash) of the files synchronized by the last run.
+    :rtype: dict[str, tuple]
+    """
+    cursor = conn.execute("SELECT fileName, mtime, size, hash FROM _sync_state WHERE tableName = ?;", (tableName,))
+    return {row[0]: tuple(row[1:]) for row in cursor}
 
-            toSync = {}
-            for info in relatedDBInfo:
-                columnName, columnType, required, isPrimKey = info[1], info[2], info[3], info[5]
-                if isPrimKey:
-                    toSync[columnName] = keyName
-                    continue
 
-                # check if value was given and if it's a required value
-                raw = jsonData.get(columnName)
-                if not raw:
-                    if not required:
-                        continue
+def convertFiles(relatedDBInfo, files, hashes):
+    """
+    Convert stage of publishFromLocal, run by the worker pool: read, hash, parse and convert a batch of files.
+
+    :param relatedDBInfo: Column metadata of the table (PRAGMA table_info).
+    :type relatedDBInfo: list[tuple]
+    :param files: (fileName, path, mtime ns, size) of the files to convert.
+    :type files: list[tuple]
+    :param hashes: fileName -> hash stored by the last run, for the files already synchronized.
+    :type hashes: dict[str, str]
+
+    :return: rows to write, (fileName, mtime, size, hash) sync states, files skipped, seconds spent.
+    :rtype: tuple[list[dict], list[tuple], int, float]
+    """
+    start = time.perf_counter()
+    rows = []
+    states = []
+    skipped = 0
+    for filename, filePath, mtime, size in files:
+        try:
+            with open(filePath, 'rb') as f:
+                content = f.read()
 
-                    raise ValueError(f'missing {columnName} in: {filePath}')
+            fileHash = getFileHash(content)
+            if hashes.get(filename) != fileHash:  # else touched, not modified
+                rows.append(convertRecord(relatedDBInfo, os.path.splitext(filename)[0], json.loads(content), filePath))
 
-                # Conversion from data type
-                if columnType == 'BOOLEAN':
-                    booleanValue = [k for k, v in BOOLEAN_CONVERTER.items() if raw.lower() in v]
-                    if not booleanValue:
-                        raise ValueError(f"can't convert: {raw} as boolean")
+            states.append((filename, mtime, size, fileHash))
+
+        except (OSError, ValueError) as e:
+            print(f"[SKIP] {filePath} -> {e}")  # read again next run
+            skipped += 1
+
+    return rows, states, skipped, time.perf_counter() - start
+
+
+def convertJournalLogs(relatedDBInfo, logs, hashes):
+    """
+    Convert stage of publishFromLocal for the logs of the journal (LOG_STORAGE 'journal').
+
+    :param relatedDBInfo: Column metadata of the logs table (PRAGMA table_info).
+    :type relatedDBInfo: list[tuple]
+    :param logs: (fileName, data, ts, length) of the logs to convert, see scanJournal.
+    :type logs: list[tuple]
+    :param hashes: fileName -> hash stored by the last run, for the logs already synchronized.
+    :type hashes: dict[str, str]
+
+    :return: rows to write, (fileName, ts, length, hash) sync states, logs skipped, seconds spent.
+    :rtype: tuple[list[dict], list[tuple], int, float]
+    """
+    start = time.perf_counter()
+    rows = []
+    states = []
+    skipped = 0
+    for filename, data, ts, length in logs:
+        try:
+            fileHash = getFileHash(json.dumps(data, sort_keys=True).encode('utf-8'))
+            if hashes.get(filename) != fileHash:
+                rows.append(convertRecord(relatedDBInfo, os.path.splitext(filename)[0], data, journal.JOURNAL_REPO))
 
-                    toSync[columnName] = booleanValue[0]
+            states.append((filename, ts, length, fileHash))
 
+        except (TypeError, ValueError) as e:
+            print(f"[SKIP] {filename} -> {e}")
+            skipped += 1
+
+    return rows, states, skipped, time.perf_counter() - start
+
+
+def scanJournal():
+    """
+    :return: (fileName, data, ts, length) of every living log of the journal. The fileName is the one
+        of the log file (<uuid>.json), so the sync state carries over when the logs move to the journal.
+    :rtype: list[tuple]
+    """
+    logs = journal.getLogs()
+    return [(f'{logUuid}.json', logs[logUuid], ts, length) for logUuid, (ts, length) in journal.getLogStates().items()
+            if logUuid in logs]
+
+
+def publishFromLocal(full=False, workers=SYNC_WORKERS, mode=SYNC_MODE, dbPath=None, fresh=False):
+    """
+    Synchronize local JSON data files into the SQLite database, incrementally.
+
+    The _sync_state table remembers the mtime, size and hash of every file synchronized:
+    only new files and files whose mtime or size changed are read, a file whose hash did not change
+    is not parsed again, and only the rows whose file disappeared since the last run are deleted
+    (rows created through the API or the logger write-through are left alone).
+    With LOG_STORAGE 'journal', the logs are read from the journal instead of REPOS['logs'] (see scanJournal),
+    the ts and length of their record standing for the mtime and size of a file.
+
+    Each table goes through a staged pipeline: the directory scan cuts the changed files into batches
+    of SYNC_BATCH, a worker pool converts them (see convertFiles), and the writer inserts each batch then
+    its sync state, so an interrupted run is completed by the next one. At most SYNC_DEPTH batches per
+    worker are in flight between the stages. Below two batches or two workers, no pool is started.
+    Stage durations are summed per stage: the convert one adds up the time of every worker.
+
+    :param full: Forget the sync state first, every file is read and written again.
+    :type full: bool
+    :param workers: Pool size, None for the executor default.
+    :type workers: int or None
+    :param mode: 'process' (parsing holds the GIL) or 'thread' (slow storage).
+    :type mode: str
+    :param dbPath: Database to synchronize, default DB_PATH.
+    :type dbPath: str or None
+    :param fresh: dbPath is a new database holding the tables only (see rebuildDatabase): rows are
+        inserted with plain executemany on one connection, journaling and disk syncs off.
+    :type fresh: bool
+
+    :return: tableName -> {'written', 'deleted', 'skipped', 'stages': stage -> {'files', 'duration', 'throughput'}}.
+    :rtype: dict[str, dict]
+    """
+    dbPath = dbPath or DB_PATH
+    conn = sqlite3.connect(dbPath)
+    try:
+        if fresh:
+            conn.execute("PRAGMA journal_mode=OFF;")  # a crash leaves a temporary file to throw away
+            conn.execute("PRAGMA synchronous=OFF;")
+
+        if full:
+            with conn:
+                conn.execute("DELETE FROM _sync_state;")
+
+        result = {}
+        for tableName, folder in REPOS.items():
+            fromJournal = tableName == 'logs' and LOG_STORAGE == 'journal'
+            if fromJournal:
+                folder = journal.JOURNAL_REPO
+
+            relatedDBInfo = conn.execute(f"PRAGMA table_info({tableName});").fetchall()
+            if not relatedDBInfo or not os.path.exists(folder):
+                continue
+
+            syncState = getSyncState(conn, tableName)
+            counts = {'written': 0, 'deleted': 0, 'skipped': 0}
+            timings = {'scan': 0.0, 'convert': 0.0, 'write': 0.0}
+            found = set()
+            changed = []  # (fileName, path, mtime, size) of new or modified files
+
+            start = time.perf_counter()
+            if fromJournal:
+                for filename, data, ts, length in scanJournal():
+                    found.add(filename)
+                    state = syncState.get(filename)
+                    if not state or state[:2] != (ts, length):
+                        changed.append((filename, data, ts, length))
+
+            else:
+                with os.scandir(folder) as entries:
+                    for entry in entries:
+                        # hidden files are the logger's own (index, queues, temporary files), not records
+                        if entry.name.startswith('.') or not entry.name.endswith('.json') or not entry.is_file():
+                            continue
+
+                        found.add(entry.name)
+                        stat = entry.stat()
+                        state = syncState.get(entry.name)
+                        if state and state[:2] == (stat.st_mtime_ns, stat.st_size):
+                            continue
+
+                        changed.append((entry.name, entry.path, stat.st_mtime_ns, stat.st_size))
+
+            changed.sort(key=lambda x: x[0])  # same files, same insertion order: reproducible rebuilds
+            timings['scan'] = time.perf_counter() - start
+            batches = [changed[i:i + SYNC_BATCH] for i in range(0, len(changed), SYNC_BATCH)]
+
+            def write(converted):
+                rows, states, skipped, duration = converted
+                start = time.perf_counter()
+                if fresh:
+                    columns = [x[1] for x in relatedDBInfo]
+                    with conn:
+                        conn.executemany(f"INSERT INTO {tableName} ({', '.join(columns)}) "
+                                         f"VALUES ({', '.join('?' for _ in columns)});",
+                                         [tuple(row.get(c) for c in columns) for row in rows])
                 else:
-                    toSync[columnName] = MATCHING_TYPES[columnType](raw)
+                    writeLines(dbPath, tableName, rows)
+
+                with conn:
+                    conn.executemany("INSERT OR REPLACE INTO _sync_state VALUES (?, ?, ?, ?, ?);",
+                                     [(tableName,) + x for x in states])
+
+                timings['write'] += time.perf_counter() - start
+                timings['convert'] += duration
+                counts['written'] += len(rows)
+                counts['skipped'] += skipped
+
+            def getHashes(batch):
+                return {x[0]: syncState[x[0]][2] for x in batch if x[0] in syncState}
+
+            convert = convertJournalLogs if fromJournal else convertFiles
+            poolSize = workers or os.cpu_count() or 1
+            if len(batches) < 2 or poolSize < 2:
+                for batch in batches:
+                    write(convert(relatedDBInfo, batch, getHashes(batch)))
+
+            else:
+                executorClass = ProcessPoolExecutor if mode == 'process' else ThreadPoolExecutor
+                with executorClass(max_workers=workers) as executor:
+                    depth = poolSize * SYNC_DEPTH
+                    inFlight = deque()
+                    for batch in batches:
+                        inFlight.append(executor.submit(convert, relatedDBInfo, batch, getHashes(batch)))
+                        if len(inFlight) >= depth:
+                            write(inFlight.popleft().result())
+
+                    while inFlight:
+                        write(inFlight.popleft().result())
+
+            start = time.perf_counter()
+            removed = sorted(set(syncState) - found)
+            for i in range(0, len(removed), SYNC_BATCH):
+                batch = removed[i:i + SYNC_BATCH]
+                writeLines(dbPath, tableName, [], [os.path.splitext(x)[0] for x in batch])
+                with conn:
+                    conn.executemany("DELETE FROM _sync_state WHERE tableName = ? AND fileName = ?;",
+                                     [(tableName, x) for x in batch])
+
+                counts['deleted'] += len(batch)
+
+            timings['write'] += time.perf_counter() - start
+
+            stageFiles = {'scan': len(found), 'convert': len(changed), 'write': counts['written'] + counts['deleted']}
+            counts['stages'] = {stage: {'files': stageFiles[stage], 'duration': round(duration, 3),
+                                        'throughput': round(stageFiles[stage] / duration, 1) if duration else None}
+                                for stage, duration in timings.items()}
+            result[tableName] = counts
+            print(f"[OK] {tableName}: {counts['written']} written, {counts['deleted']} deleted, "
+                  f"{counts['skipped']} skipped, {len(found) - len(changed)} unchanged")
+            for stage, metrics in counts['stages'].items():
+                print(f"    {stage}: {metrics['files']} files in {metrics['duration']}s ({metrics['throughput']} files/s)")
 
-            data.setdefault(tableName, []).append(toSync)
+    finally:
+        conn.close()
+
+    return result
 
-    syncDatabase(DB_PATH, data)
 
+def addColumn(conn, tableName, column, columnType):
+    """
+    Migration helper: add a column unless the table already has it (databases created by createTables).
+
+    :param conn: Connection to the database.
+    :type conn: sqlite3.Connection
+    :param tableName: Table to alter.
+    :type tableName: str
+    :param column: Column name.
+    :type column: str
+    :param columnType: SQL type of the column.
+    :type columnType: str
+    """
+    if column in [x[1] for x in conn.execute(f"PRAGMA table_info({tableName});")]:
+        return
 
-def main():
-    conn = sqlite3.connect(DB_PATH)  # open or create dataBase
+    with conn:
+        conn.execute(f"ALTER TABLE {tableName} ADD COLUMN {column} {columnType};")
+
+
+def backfillColumn(conn, tableName, column, expression, chunk=BACKFILL_CHUNK):
+    """
+    Migration helper: fill a column where it is NULL, by rowid ranges of chunk rows, one transaction each,
+    so readers and writers only wait for one chunk at a time on a large table.
+
+    :param conn: Connection to the database.
+    :type conn: sqlite3.Connection
+    :param tableName: Table to update.
+    :type tableName: str
+    :param column: Column to fill.
+    :type column: str
+    :param expression: SQL expression of the value (functions registered on conn with create_function allowed).
+    :type expression: str
+    :param chunk: Rows per transaction.
+    :type chunk: int
+
+    :return: Number of rows updated.
+    :rtype: int
+    """
+    lastRowid = conn.execute(f"SELECT max(rowid) FROM {tableName};").fetchone()[0] or 0
+    updated = 0
+    for start in range(0, lastRowid, chunk):
+        with conn:
+            cursor = conn.execute(f"UPDATE {tableName} SET {column} = {expression} "
+                                  f"WHERE rowid > ? AND rowid <= ? AND {column} IS NULL;", (start, start + chunk))
+            updated += cursor.rowcount
+
+    return updated
+
+
+def runScript(script, conn):
+    """
+    Migration helper: run a DDL script made of idempotent statements (IF NOT EXISTS).
+
+    :param script: SQL statements.
+    :type script: str
+    :param conn: Connection to the database.
+    :type conn: sqlite3.Connection
+    """
+    conn.executescript(script)
+
+
+def addTimeColumns(conn):
+    """
+    Migration step: add the numeric ts_epoch and day columns to the logs, fill them from timeStamp
+    and index them, so time range requests seek the index instead of comparing text on every row.
+
+    :param conn: Connection to the database.
+    :type conn: sqlite3.Connection
+    """
+    for column in DERIVED_COLUMNS:
+        addColumn(conn, 'logs', column, 'INTEGER')
+        conn.create_function(f'get_{column}', 1, partial(getTimeColumn, column), deterministic=True)
+        print(f"backfilled: {backfillColumn(conn, 'logs', column, f'get_{column}(timeStamp)')} logs.{column}")
+
+    runScript(TIME_INDEXES, conn)
+
+
+def createTables(conn):
+    """
+    Create the tables with every column MIGRATIONS adds, but none of their indexes, for bulk loads
+    (rebuildDatabase, benchmark) that run MIGRATIONS once the rows are in.
+
+    :param conn: Connection to the new database.
+    :type conn: sqlite3.Connection
+    """
+    runScript(DLL, conn)
+    for column in DERIVED_COLUMNS:
+        addColumn(conn, 'logs', column, 'INTEGER')
+
+
+# (version, name, step): applied in order by migrateDatabase, each step once per database (PRAGMA user_version).
+# Steps must be idempotent: a database made by createTables already holds the columns the later ones add.
+# Never edit a released step (DLL included), append a new one.
+MIGRATIONS = [
+    (1, 'tables', partial(runScript, DLL)),
+    (2, 'logs secondary indexes', partial(runScript, INDEXES)),
+    (3, 'logs numeric time columns', addTimeColumns),
+]
+
+
+def migrateDatabase(dbPath=None):
+    """
+    Apply the MIGRATIONS newer than the version of the database, in order, timing each step.
+
+    The version is stored in PRAGMA user_version and moved after each step, so an interrupted migration
+    resumes at the failed step.
+
+    :param dbPath: Database to migrate, default DB_PATH.
+    :type dbPath: str or None
+
+    :return: {'version', 'name', 'duration'} of the steps applied.
+    :rtype: list[dict]
+    """
+    dbPath = dbPath or DB_PATH
+    conn = sqlite3.connect(dbPath)
     try:
-        conn.executescript(DLL)  # exec DLL
-        conn.commit()  # valid changes
+        current = conn.execute("PRAGMA user_version;").fetchone()[0]
+        applied = []
+        for version, name, step in sorted(MIGRATIONS, key=lambda x: x[0]):
+            if version <= current:
+                continue
+
+            start = time.perf_counter()
+            step(conn)
+            conn.commit()
+            conn.execute(f"PRAGMA user_version = {int(version)};")
+            duration = time.perf_counter() - start
+            applied.append({'version': version, 'name': name, 'duration': round(duration, 3)})
+            print(f"[OK] migration {version} ({name}) in {duration:.3f}s")
+
+        if applied:
+            conn.execute("ANALYZE;")  # statistics of the new indexes, else the planner may skip them
+            conn.commit()
+
+    finally:
+        conn.close()
+
+    return applied
+
+
+def rebuildDatabase(workers=SYNC_WORKERS, mode=SYNC_MODE):
+    """
+    Rebuild DB_PATH from the JSON files only (the journal for the logs, see LOG_STORAGE), then swap it into place.
+
+    The new database is written next to DB_PATH: tables first, rows through the publishFromLocal pipeline
+    with journaling and disk syncs off and executemany inserts, MIGRATIONS (indexes) once every row is in,
+    then a single fsync and os.replace. Readers see the old database or the complete new one; the read pool
+    of this process is closed before the swap, the pools of other processes drop their connections on next use
+    (see sqlLib.getReadConnection). Rows that exist in the database only (API / write-through without JSON file)
+    are not kept.
+
+    On Windows a file still open can't be replaced: the rebuild is offline only there, with the API stopped.
+    If the swap is refused, the rebuilt database is kept next to DB_PATH and PermissionError raised.
+
+    :param workers: Pool size, None for the executor default.
+    :type workers: int or None
+    :param mode: 'process' or 'thread', see publishFromLocal.
+    :type mode: str
+
+    :return: Result of publishFromLocal, plus 'index' and 'total' durations in seconds.
+    :rtype: dict
+    """
+    start = time.perf_counter()
+    tempPath = f'{DB_PATH}.rebuild'
+    for path in [tempPath, f'{tempPath}-journal']:
+        if os.path.exists(path):
+            os.remove(path)
+
+    conn = sqlite3.connect(tempPath)
+    try:
+        createTables(conn)
+
+    finally:
+        conn.close()
+
+    result = publishFromLocal(workers=workers, mode=mode, dbPath=tempPath, fresh=True)
+
+    indexStart = time.perf_counter()
+    migrateDatabase(tempPath)  # indexes, derived data and ANALYZE, now that every row is in
+    result['index'] = round(time.perf_counter() - indexStart, 3)
+
+    fd = os.open(tempPath, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+
+    finally:
+        os.close(fd)
+
+    closeReadPool(DB_PATH)  # before the swap: Windows refuses to replace a file still open
+    try:
+        os.replace(tempPath, DB_PATH)
+
+    except PermissionError:
+        print(f'[ERROR] {DB_PATH} is still open by another process (API): '
+              f'stop it and replace the file with {tempPath}')
+        raise
+
+    result['total'] = round(time.perf_counter() - start, 3)
+    print(f"[OK] Database rebuilt at {DB_PATH} in {result['total']}s")
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='init_db', description='initialize or synchronize machineMonitor.db')
+    parser.add_argument('--full', action='store_true', help='forget the sync state, read every JSON file again')
+    parser.add_argument('--rebuild', action='store_true', help='rebuild the database from the JSON files only')
+    parser.add_argument('--workers', type=int, default=SYNC_WORKERS)
+    parser.add_argument('--mode', choices=['process', 'thread'], default=SYNC_MODE)
+    args = parser.parse_args(argv)
+
+    if args.rebuild:
+        rebuildDatabase(args.workers, args.mode)
+        return
+
+    try:
+        migrateDatabase()  # creates the tables of a new database
         print(f"[OK] Database initialized at {DB_PATH}")
 
-        publishFromLocal()
+        publishFromLocal(args.full, args.workers, args.mode)
 
     except sqlite3.Error as e:
         print(f"[ERROR] Failed to initialize database: {e}")
 
-    finally:
-        conn.close()  # end connection
-
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,162 @@
+import os
+import json
+import sqlite3
+
+import pytest
+
+from machineMonitor.data import init_db
+from machineMonitor.library import sqlLib
+from machineMonitor.logger import journal
+
+LOG = {'machineName': 'testMachine', 'type': 'info', 'project': 'test', 'comment': '',
+       'timeStamp': '2025_07_25__15_18_25', 'userName': 'tester'}
+LOG_UUID = '8300c91a-fc2b-43d8-93ac-4d1b33b82fdb'
+
+
+@pytest.fixture
+def localRepos(tmp_path, monkeypatch):
+    repos = {name: tmp_path / name for name in init_db.REPOS}
+    for folder in repos.values():
+        folder.mkdir()
+
+    monkeypatch.setattr(init_db, 'REPOS', {name: str(folder) for name, folder in repos.items()})
+    dbPath = str(tmp_path / 'machineMonitor.db')
+    init_db.migrateDatabase(dbPath)
+    return repos, dbPath
+
+
+def countLogs(dbPath):
+    with sqlite3.connect(dbPath) as conn:
+        return conn.execute("SELECT COUNT(*) FROM logs;").fetchone()[0]
+
+
+def testSyncIgnoresHiddenFiles(localRepos):
+    repos, dbPath = localRepos
+    (repos['logs'] / f'{LOG_UUID}.json').write_text(json.dumps(LOG), encoding='utf-8')
+    (repos['logs'] / '.index.json').write_text(json.dumps({LOG_UUID: LOG}), encoding='utf-8')
+
+    result = init_db.publishFromLocal(workers=1, dbPath=dbPath)
+    assert (result['logs']['written'], result['logs']['skipped']) == (1, 0)
+    assert countLogs(dbPath) == 1
+
+
+def testJournalLogsSurviveSyncAndRebuild(localRepos, tmp_path, monkeypatch):
+    repos, dbPath = localRepos
+    (repos['logs'] / f'{LOG_UUID}.json').write_text(json.dumps(LOG), encoding='utf-8')
+    assert init_db.publishFromLocal(workers=1, dbPath=dbPath)['logs']['written'] == 1
+
+    # logs moved to the journal, files removed (logger.core.migrateLogsToJournal(removeFiles=True))
+    monkeypatch.setattr(journal, 'JOURNAL_REPO', str(tmp_path / '.journal'))
+    monkeypatch.setattr(init_db, 'LOG_STORAGE', 'journal')
+    journal.resetJournal()
+    journal.appendLogs([(LOG_UUID, LOG)])
+    (repos['logs'] / f'{LOG_UUID}.json').unlink()
+
+    assert init_db.publishFromLocal(workers=1, dbPath=dbPath)['logs']['deleted'] == 0
+    assert countLogs(dbPath) == 1
+    assert init_db.publishFromLocal(workers=1, dbPath=dbPath)['logs']['written'] == 0  # unchanged record
+
+    journal.appendLogs([(LOG_UUID, dict(LOG, comment='edited'))])
+    assert init_db.publishFromLocal(workers=1, dbPath=dbPath)['logs']['written'] == 1
+    with sqlite3.connect(dbPath) as conn:
+        assert conn.execute("SELECT comment FROM logs;").fetchone()[0] == 'edited'
+
+    monkeypatch.setattr(init_db, 'DB_PATH', str(tmp_path / 'rebuilt.db'))
+    init_db.rebuildDatabase(workers=1)
+    assert countLogs(init_db.DB_PATH) == 1
+
+    assert journal.deleteLog(LOG_UUID)
+    assert init_db.publishFromLocal(workers=1, dbPath=dbPath)['logs']['deleted'] == 1
+    assert countLogs(dbPath) == 0
+    journal.resetJournal()
+
+
+def testTimeColumnsComeFromTheirOwnMigration(localRepos):
+    repos, dbPath = localRepos
+    with sqlite3.connect(dbPath) as conn:
+        conn.execute("PRAGMA user_version = 0;")
+        conn.execute("DROP TABLE logs;")  # database of the first release: step 1 only
+        conn.executescript(init_db.DLL)
+        conn.execute("INSERT INTO logs (uuid, machineName, project, timeStamp, type, userName) "
+                     "VALUES (?, ?, ?, ?, ?, ?);", (LOG_UUID, 'testMachine', 'test', LOG['timeStamp'], 'info', 'tester'))
+
+    assert [x['version'] for x in init_db.migrateDatabase(dbPath)] == [1, 2, 3]
+    with sqlite3.connect(dbPath) as conn:
+        assert conn.execute("SELECT ts_epoch, day FROM logs;").fetchone() == (1753456705, 20250725)
+        assert conn.execute("SELECT COUNT(*) FROM sqlite_stat1 WHERE idx = 'logs_ts_epoch';").fetchone()[0] == 1
+
+
+def testBadTimeStampKeepsLogWithNullTimeColumns(localRepos):
+    repos, dbPath = localRepos
+    (repos['logs'] / f'{LOG_UUID}.json').write_text(json.dumps(dict(LOG, timeStamp='25/07/2025')), encoding='utf-8')
+
+    result = init_db.publishFromLocal(workers=1, dbPath=dbPath)
+    assert (result['logs']['written'], result['logs']['skipped']) == (1, 0)
+    with sqlite3.connect(dbPath) as conn:
+        assert conn.execute("SELECT timeStamp, ts_epoch, day FROM logs;").fetchone() == ('25/07/2025', None, None)
+
+
+def dumpDatabase(dbPath):
+    with sqlite3.connect(dbPath) as conn:
+        return (conn.execute("SELECT * FROM logs ORDER BY rowid;").fetchall(),
+                conn.execute("SELECT * FROM _sync_state ORDER BY tableName, fileName;").fetchall())
+
+
+@pytest.mark.parametrize('mode', ['thread', 'process'])
+def testPipelineMatchesSequentialSync(localRepos, tmp_path, monkeypatch, mode):
+    repos, dbPath = localRepos
+    pooledPath = str(tmp_path / 'pooled.db')
+    init_db.migrateDatabase(pooledPath)
+    monkeypatch.setattr(init_db, 'SYNC_BATCH', 3)
+
+    logUuids = [f'8300c91a-fc2b-43d8-93ac-4d1b33b8{i:04x}' for i in range(14)]
+    for i, logUuid in enumerate(logUuids):
+        log = dict(LOG, comment=str(i), timeStamp=f'2025_07_{i + 1:02d}__15_18_25')
+        if i == 4:
+            del log['machineName']  # skipped: required field
+        elif i == 9:
+            log['timeStamp'] = 'unknown'
+
+        (repos['logs'] / f'{logUuid}.json').write_text(json.dumps(log), encoding='utf-8')
+
+    def sync():
+        sequential = init_db.publishFromLocal(workers=1, dbPath=dbPath)['logs']
+        pooled = init_db.publishFromLocal(workers=2, mode=mode, dbPath=pooledPath)['logs']
+        assert [pooled[k] for k in ['written', 'deleted', 'skipped']] == \
+            [sequential[k] for k in ['written', 'deleted', 'skipped']]
+        assert pooled['stages']['convert']['files'] == sequential['stages']['convert']['files']
+        assert dumpDatabase(pooledPath) == dumpDatabase(dbPath)
+        return sequential
+
+    assert sync()['written'] == 13
+
+    (repos['logs'] / f'{logUuids[2]}.json').write_text(json.dumps(dict(LOG, comment='edited')), encoding='utf-8')
+    (repos['logs'] / f'{logUuids[7]}.json').unlink()
+    result = sync()
+    assert (result['written'], result['deleted']) == (1, 1)
+
+
+def testRebuildClosesReadPoolBeforeSwap(localRepos, tmp_path, monkeypatch):
+    repos, dbPath = localRepos
+    (repos['logs'] / f'{LOG_UUID}.json').write_text(json.dumps(LOG), encoding='utf-8')
+    monkeypatch.setattr(init_db, 'DB_PATH', dbPath)
+    with sqlLib.getReadConnection(dbPath) as conn:
+        conn.execute("SELECT COUNT(*) FROM logs;")
+
+    swaps = []
+    replace = os.replace
+
+    def refuseSwap(source, destination):
+        swaps.append(dbPath in sqlLib._READ_POOLS)
+        raise PermissionError(13, 'file in use', destination)  # Windows, database still open elsewhere
+
+    monkeypatch.setattr(os, 'replace', refuseSwap)
+    with pytest.raises(PermissionError):
+        init_db.rebuildDatabase(workers=1)
+
+    assert swaps == [False]
+    assert countLogs(f'{dbPath}.rebuild') == 1 and countLogs(dbPath) == 0
+
+    monkeypatch.setattr(os, 'replace', replace)
+    init_db.rebuildDatabase(workers=1)
+    assert countLogs(dbPath) == 1 and not os.path.exists(f'{dbPath}.rebuild')
@@ -0,0 +1,125 @@
+"""
+===============================================================================
+fileName: completionLib
+scripter: angiu
+creation date: 19/10/2026
+description: completion engine for filter fields
+    - values sorted by lower case text: prefix lookup with bisect
+    - substring fallback with str.find on the joined values
+    - top-k by frequency (number of logs holding the value)
+===============================================================================
+"""
+# ==== native ==== #
+import heapq
+from itertools import islice
+from bisect import bisect_left
+
+# ==== third ==== #
+
+# ==== local ===== #
+
+# ==== global ==== #
+TOP_K = 20  # candidates pushed to the completer popup
+SEPARATOR = '\n'  # joins the values for substring lookup, never part of a value
+
+
+class CompletionEngine:
+    def __init__(self, counts=None):
+        self.keys = []  # lower case text, sorted
+        self.entries = []  # (text, field, count), same order as keys
+        self.ranked = []  # indices of entries, highest count first
+        self.joined = ''
+        self.starts = []  # offset of each key in joined
+
+        if counts:
+            self.update(counts)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def update(self, counts, excluded=None):
+        """
+        Rebuild the sorted arrays from completion counts.
+
+        :param counts: field -> {value: count} (see logger.core.getCompletionCounts).
+        :type counts: dict[str, dict]
+        :param excluded: Values to leave out (filters already applied).
+        :type excluded: list or None
+        """
+        excluded = set(str(x) for x in excluded or [])
+        items = sorted((str(v).lower(), str(v), k, c) for k, values in counts.items() for v, c in values.items()
+                       if str(v) not in excluded and SEPARATOR not in str(v))
+
+        self.keys = [x[0] for x in items]
+        self.entries = [x[1:] for x in items]
+        self.ranked = sorted(range(len(items)), key=lambda i: -items[i][3])
+        self.joined = SEPARATOR.join(self.keys)
+
+        self.starts = []
+        offset = 0
+        for key in self.keys:
+            self.starts.append(offset)
+            offset += len(key) + len(SEPARATOR)
+
+    def complete(self, text, k=TOP_K):
+        """
+        Best candidates for text: prefix matches first, then substring matches, each by frequency.
+
+        :param text: Text typed so far.
+        :type text: str
+        :param k: Maximum number of candidates.
+        :type k: int
+
+        :return: (text, field, count) of up to k values.
+        :rtype: list[tuple[str, str, int]]
+        """
+        result = self.getPrefixMatches(text, k)
+        if len(result) < k and text:
+            found = set(result)
+            result += [x for x in self.getSubstringMatches(text, k + len(result)) if x not in found][:k - len(result)]
+
+        return result
+
+    def getPrefixMatches(self, text, k=TOP_K):
+        """
+        :param text: Start of the values (case insensitive).
+        :type text: str
+        :param k: Maximum number of candidates.
+        :type k: int
+
+        :return: (text, field, count) of the k most frequent values starting with text.
+        :rtype: list[tuple[str, str, int]]
+        """
+        if not text:
+            return [self.entries[i] for i in self.ranked[:k]]
+
+        text = text.lower()
+        low = bisect_left(self.keys, text)
+        high = bisect_left(self.keys, text + '\U0010ffff', low)
+        if high - low > len(self.keys) // 8:  # short prefix: the k first ranked values in range come quicker
+            return [self.entries[i] for i in islice((i for i in self.ranked if low <= i < high), k)]
+
+        return heapq.nlargest(k, self.entries[low:high], key=lambda x: x[2])
+
+    def getSubstringMatches(self, text, k=TOP_K):
+        """
+        :param text: Part of the values (case insensitive).
+        :type text: str
+        :param k: Maximum number of candidates.
+        :type k: int
+
+        :return: (text, field, count) of the k most frequent values containing text.
+        :rtype: list[tuple[str, str, int]]
+        """
+        text = text.lower()
+        if not text or SEPARATOR in text:
+            return []
+
+        indices = []
+        position = self.joined.find(text)
+        while position != -1:
+            index = bisect_left(self.starts, position + 1) - 1
+            indices.append(index)
+            position = self.joined.find(text, self.starts[index + 1] if index + 1 < len(self.starts) else len(self.joined))
+
+        return heapq.nlargest(k, (self.entries[i] for i in indices), key=lambda x: x[2])
@@ -0,0 +1,268 @@
+"""
+===============================================================================
+fileName: fileLib
+scripter: angiu
+creation date: 19/10/2026
+description: json file helpers shared by the tools (atomic writes, parallel loading)
+===============================================================================
+"""
+# ==== native ==== #
+import os
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ProcessPoolExecutor
+
+# ==== third ==== #
+
+# ==== local ===== #
+from machineMonitor.library.infoLib import getUUID
+
+# ==== global ==== #
+LOAD_MODES = ['thread', 'process']
+
+
+def writeJsonAtomic(filePath, data, fsync=False):
+    """
+    Write data as JSON so readers see either the previous file or the complete new one.
+
+    The content goes to a temporary file of the same folder which then replaces filePath.
+
+    :param filePath: Destination file.
+    :type filePath: str
+    :param data: JSON serializable data.
+    :type data: any
+    :param fsync: Flush the temporary file to disk before replacing (durability over speed).
+    :type fsync: bool
+    """
+    folder = os.path.split(filePath)[0]
+    if not os.path.exists(folder):
+        os.makedirs(folder)
+        print(f'created: {folder}')
+
+    tempPath = os.path.join(folder, f'.{getUUID()}.tmp')
+    # not mkstemp: its 0600 would hide the file from the other users, 0o666 lets the process umask apply as usual
+    fd = os.open(tempPath, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+
+        os.replace(tempPath, filePath)
+
+    except BaseException:
+        if os.path.exists(tempPath):
+            os.remove(tempPath)
+
+        raise
+
+
+def syncFolder(folder):
+    """
+    Flush the entries of a folder to disk, so the files just renamed into it survive a power loss.
+
+    Nothing to do on Windows: a folder can't be opened there, and NTFS journals the renames itself.
+
+    :param folder: Folder to flush.
+    :type folder: str
+    """
+    if os.name == 'nt':
+        return
+
+    fd = os.open(folder, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+
+    finally:
+        os.close(fd)
+
+
+def loadJsonFiles(filePaths, workers=None, mode='thread'):
+    """
+    Read and parse many JSON files with a pool of workers, results in the order of filePaths.
+
+    'thread' suits slow storage (network share: reads wait on I/O), 'process' suits large files
+    where json parsing holds the GIL. Throughput is printed once done.
+
+    :param filePaths: Files to load.
+    :type filePaths: list[str]
+    :param workers: Pool size, None for the executor default.
+    :type workers: int or None
+    :param mode: One of LOAD_MODES.
+    :type mode: str
+
+    :return: Parsed content of each file, None for files that could not be read or parsed.
+    :rtype: list
+    """
+    if mode not in LOAD_MODES:
+        raise ValueError(f'unknown load mode: {mode}, expected one of: {LOAD_MODES}')
+
+    start = time.perf_counter()
+    if mode == 'thread':
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            result = list(executor.map(readJsonFile, filePaths))
+
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            chunkSize = max(1, len(filePaths) // ((workers or os.cpu_count() or 1) * 4))
+            result = list(executor.map(readJsonFile, filePaths, chunksize=chunkSize))
+
+    duration = time.perf_counter() - start
+    print(f'loaded: {len(filePaths)} files in {duration:.2f}s ({len(filePaths) / duration if duration else 0:.0f} files/s, {mode})')
+
+    return result
+
+
+def readJsonFile(filePath):
+    """
+    Read and parse one JSON file.
+
+    :param filePath: File to load.
+    :type filePath: str
+
+    :return: Parsed content, None if the file could not be read or parsed.
+    :rtype: any
+    """
+    try:
+        with open(filePath, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    except (OSError, ValueError) as e:
+        print(f'skipped: {filePath} -> {e}')
+        return None
+
+
+def createLockFile(lockPath, token):
+    """
+    Create a lock file holding the token of its owner, with O_EXCL: also exclusive on network shares
+    where flock is not.
+
+    :param lockPath: Lock file.
+    :type lockPath: str
+    :param token: Token of the owner, unique per acquisition.
+    :type token: str
+
+    :return: True if created, False if the lock is held.
+    :rtype: bool
+    """
+    try:
+        fd = os.open(lockPath, os.O_WRONLY | os.O_CREAT | os.O_EXCL)
+    except FileExistsError:
+        return False
+
+    try:
+        os.write(fd, token.encode('utf-8'))
+    finally:
+        os.close(fd)
+
+    return True
+
+
+def releaseLockFile(lockPath, token):
+    """
+    Remove a lock file if it still holds the given token: a lock broken as abandoned then taken
+    by another owner is left to that owner.
+
+    :param lockPath: Lock file.
+    :type lockPath: str
+    :param token: Token written by createLockFile.
+    :type token: str
+    """
+    try:
+        if readLockToken(lockPath) == token:
+            os.remove(lockPath)
+        else:
+            print(f'lock taken over while held: {lockPath}')
+
+    except OSError:
+        print(f'lock removed while held: {lockPath}')
+
+
+def breakStaleLock(lockPath, maxAge):
+    """
+    Remove a lock file older than maxAge, age measured with the clock of the file server (see getLockAge).
+
+    :param lockPath: Lock file.
+    :type lockPath: str
+    :param maxAge: Seconds after which the lock is considered abandoned.
+    :type maxAge: float
+
+    :return: True if the lock is gone (broken or released meanwhile), False if still held.
+    :rtype: bool
+    """
+    try:
+        staleToken = readLockToken(lockPath)
+        if getLockAge(lockPath) <= maxAge:
+            return False
+
+        breakLock(lockPath, staleToken)
+
+    except OSError:
+        pass  # released meanwhile
+
+    return True
+
+
+def breakLock(lockPath, staleToken):
+    """
+    Remove an abandoned lock, unless another waiter broke it and locked again meanwhile.
+
+    The lock is first renamed (only one waiter succeeds), then removed if it still holds staleToken,
+    given back otherwise.
+
+    :param lockPath: Lock file.
+    :type lockPath: str
+    :param staleToken: Token read from the lock when it was found abandoned.
+    :type staleToken: str
+    """
+    stalePath = f'{lockPath}.{getUUID()}.stale'
+    try:
+        os.rename(lockPath, stalePath)
+    except OSError:
+        return  # broken or released by someone else
+
+    if readLockToken(stalePath) == staleToken:
+        os.remove(stalePath)
+        print(f'broke abandoned lock: {lockPath}')
+        return
+
+    try:
+        os.link(stalePath, lockPath)  # fails if yet another owner holds the lock now
+    except OSError:
+        print(f'lock lost by its owner: {lockPath}')
+
+    os.remove(stalePath)
+
+
+def getLockAge(lockPath):
+    """
+    Age of a lock in the clock of the file server: the mtime of a file created now minus the mtime
+    of the lock, both set by the same server, so a skewed local clock never steals a live lock.
+
+    :param lockPath: Lock file.
+    :type lockPath: str
+
+    :return: Seconds since the lock was taken.
+    :rtype: float
+    """
+    probePath = f'{lockPath}.{getUUID()}.probe'
+    os.close(os.open(probePath, os.O_WRONLY | os.O_CREAT | os.O_EXCL))
+    try:
+        return os.path.getmtime(probePath) - os.path.getmtime(lockPath)
+
+    finally:
+        os.remove(probePath)
+
+
+def readLockToken(lockPath):
+    """
+    :param lockPath: Lock file.
+    :type lockPath: str
+
+    :return: Token of the owner of the lock, empty while the owner is writing it.
+    :rtype: str
+    """
+    with open(lockPath, 'r', encoding='utf-8') as f:
+        return f.read()
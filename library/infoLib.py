@@ -9,12 +9,16 @@ description:
 # ==== native ==== #
 import os
 import uuid
+import ctypes
 import ast
 import sys
 import site
 import importlib.util
 import sysconfig
 import json
+import time
+import calendar
+from datetime import datetime
 
 # ==== third ==== #
 
@@ -31,6 +35,8 @@ COLORS = {
     "green": (52, 168, 83)
 }
 AUTHORISATIONS = {'admin': 3, 'supervisor': 2, 'lead': 1, 'user': 0}
+TIME_FORMAT = '%Y_%m_%d__%H_%M_%S'  # timeStamp of the logs, local time of the writer
+TIME_INPUT_FORMATS = [TIME_FORMAT, '%Y_%m_%d', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d %H:%M:%S', '%Y-%m-%d', '%Y%m%d']
 
 
 def getEmployeesData(employs=None):
@@ -107,6 +113,80 @@ def getUUID(logsRepo=None):
 
     return newId
 
+
+def isProcessAlive(pid):
+    """
+    :param pid: Process id on this machine.
+    :type pid: int
+
+    :return: True if a process with this id is running.
+    :rtype: bool
+    """
+    if sys.platform == 'win32':  # os.kill would terminate the process there
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+        if not handle:
+            return False
+
+        exitCode = ctypes.c_ulong()
+        try:
+            kernel32.GetExitCodeProcess(handle, ctypes.byref(exitCode))
+        finally:
+            kernel32.CloseHandle(handle)
+
+        return exitCode.value == 259  # STILL_ACTIVE
+
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # running, as another user
+
+    return True
+
+
+def getTimeColumns(timeStamp):
+    """
+    Numeric columns derived from a log timeStamp, indexed in the logs table for time range queries.
+
+    :param timeStamp: Time stamp of a log (TIME_FORMAT).
+    :type timeStamp: str
+
+    :return: 'ts_epoch' (see getTimeEpoch) and 'day' (YYYYMMDD as an int).
+    :rtype: dict[str, int]
+    """
+    epoch = getTimeEpoch(timeStamp)
+    return {'ts_epoch': epoch, 'day': int(time.strftime('%Y%m%d', time.gmtime(epoch)))}
+
+
+def getTimeEpoch(value):
+    """
+    Seconds since 1970-01-01 of a wall-clock time.
+
+    The time is read as UTC: timeStamps carry no timezone, this keeps the order and the day
+    of the timeStamp whatever the timezone or DST of the machine converting it.
+
+    :param value: Time in one of TIME_INPUT_FORMATS, or already seconds since epoch.
+        A string of 8 digits is a day (YYYYMMDD, like the day column), not seconds since epoch.
+    :type value: str or int
+
+    :return: Seconds since epoch.
+    :rtype: int
+    """
+    text = str(value)
+    if isinstance(value, int) or (text.lstrip('-').isdigit() and not (text.isdigit() and len(text) == 8)):
+        return int(value)
+
+    for timeFormat in TIME_INPUT_FORMATS:
+        try:
+            return calendar.timegm(datetime.strptime(value, timeFormat).timetuple())
+        except ValueError:
+            continue
+
+    raise ValueError(f"can't read time: {value}, expected seconds since epoch or one of: {TIME_INPUT_FORMATS}")
+
+
 def getLibraryModules():
     """
     Retrieve the set of Python standard library module names.
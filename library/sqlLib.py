@@ -7,13 +7,25 @@ description:
 ===============================================================================
 """
 # ==== native ==== #
+import os
+import time
+import queue
 import sqlite3
+import pathlib
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
 
 # ==== third ==== #
 
 # ==== local ===== #
 
 # ==== global ==== #
+PROGRESS_STEPS = 1000  # SQLite VM instructions between two timeout checks
+READ_POOL_SIZE = 8  # idle read-only connections kept per database
+_READ_POOLS = {}  # dbPath -> queue of idle (read-only connection, (st_dev, st_ino) of the file it opened)
+_READ_POOLS_LOCK = threading.Lock()
+
 
 def execMultiRequests(dbPath, cmds):
     """
@@ -43,6 +55,70 @@ def execMultiRequests(dbPath, cmds):
     return result
 
 
+def execConcurrentRequests(dbPath, cmds, timeout=None):
+    """
+    Execute one parameterized SQL command per table, each on its own read connection, concurrently.
+
+    sqlite3 releases the GIL while a statement runs, so a request over several tables
+    costs about the slowest table instead of the sum of all of them.
+
+    :param dbPath: Filesystem path to the SQLite database file.
+    :type dbPath: str
+    :param cmds: Mapping of table names to (sql, values).
+    :type cmds: dict[str, tuple[str, tuple]]
+    :param timeout: Wall-clock budget in seconds shared by all commands, None for no limit.
+    :type timeout: float | None
+
+    :return: Mapping of table names to their row dictionaries, each with an added 'dataType' field.
+    :rtype: dict[str, list[dict]]
+    """
+    deadline = time.monotonic() + timeout if timeout else None
+
+    def run(dType, sql, values):
+        with getReadConnection(dbPath) as conn:
+            if deadline:
+                conn.set_progress_handler(lambda: time.monotonic() > deadline, PROGRESS_STEPS)
+
+            try:
+                rows = conn.execute(sql, values).fetchall()
+
+            except sqlite3.OperationalError as e:
+                if str(e) == 'interrupted':
+                    raise TimeoutError(f'query exceeded {timeout}s on: {dType}') from e
+
+                raise
+
+            finally:
+                conn.set_progress_handler(None, 0)
+
+        return [dict(row, dataType=dType) for row in rows]
+
+    if len(cmds) == 1:
+        dType, (sql, values) = next(iter(cmds.items()))
+        return {dType: run(dType, sql, values)}
+
+    with ThreadPoolExecutor(max_workers=min(len(cmds), READ_POOL_SIZE)) as executor:
+        futures = {dType: executor.submit(run, dType, sql, values) for dType, (sql, values) in cmds.items()}
+        return {dType: future.result() for dType, future in futures.items()}
+
+
+def closeReadPool(dbPath):
+    """
+    Close the idle read-only connections kept for the given database.
+
+    :param dbPath: Path to the SQLite database file.
+    :type dbPath: str
+    """
+    with _READ_POOLS_LOCK:
+        pool = _READ_POOLS.pop(dbPath, None)
+
+    while pool:
+        try:
+            pool.get_nowait()[0].close()
+        except queue.Empty:
+            break
+
+
 def getAllColumns(dbPath, tableName):
     """
     Return the list of column names for a given table in a SQLite database.
@@ -121,6 +197,82 @@ def getPrimaryColumn (dbPath, tableName):
     return min(primaryKeyValues)
 
 
+def getQueryPlan(dbPath, sql, values):
+    """
+    Plan SQLite chose for a command, without running it.
+
+    :param dbPath: Path to the SQLite database file.
+    :type dbPath: str
+    :param sql: Parameterized command.
+    :type sql: str
+    :param values: Parameters of the command.
+    :type values: tuple
+
+    :return: Detail of each step of EXPLAIN QUERY PLAN, e.g. 'SEARCH logs USING INDEX logs_userName (userName=?)'.
+    :rtype: list[str]
+    """
+    with getReadConnection(dbPath) as conn:
+        return [row[3] for row in conn.execute(f'EXPLAIN QUERY PLAN {sql}', values)]
+
+
+@contextmanager
+def getReadConnection(dbPath):
+    """
+    Borrow a read-only connection from the pool of the given database.
+
+    Connections are opened with mode=ro, rows come back as sqlite3.Row,
+    and up to READ_POOL_SIZE idle connections are kept for the next callers.
+    A pooled connection is closed instead of reused once dbPath is another file than the one it opened
+    (database swapped by os.replace, see data.init_db.rebuildDatabase).
+
+    :param dbPath: Path to the SQLite database file.
+    :type dbPath: str
+
+    :return: Context manager yielding the connection.
+    :rtype: sqlite3.Connection
+    """
+    with _READ_POOLS_LOCK:
+        pool = _READ_POOLS.setdefault(dbPath, queue.LifoQueue(maxsize=READ_POOL_SIZE))
+
+    fileId = getFileId(dbPath)
+    while True:
+        try:
+            conn, connFileId = pool.get_nowait()
+        except queue.Empty:
+            conn, connFileId = openReadConnection(dbPath), fileId
+            break
+
+        if connFileId == fileId:
+            break
+
+        conn.close()  # still reading the replaced file
+
+    try:
+        yield conn
+
+    finally:
+        try:
+            pool.put_nowait((conn, connFileId))
+        except queue.Full:
+            conn.close()
+
+
+def getFileId(dbPath):
+    """
+    :param dbPath: Path to the SQLite database file.
+    :type dbPath: str
+
+    :return: (st_dev, st_ino) of the file, None if it does not exist.
+    :rtype: tuple[int, int] or None
+    """
+    try:
+        stat = os.stat(dbPath)
+    except OSError:
+        return None
+
+    return stat.st_dev, stat.st_ino
+
+
 def getRelatedSQLInfo(dbPath, tableName):
     """
     Retrieve detailed schema information for a specific table in the SQLite database.
@@ -175,6 +327,63 @@ def getRowAsDict(dbPath, tableName, primaryKey):
         return result
 
 
+def getSchemaVersion(dbPath):
+    """
+    :param dbPath: Path to the SQLite database file.
+    :type dbPath: str
+
+    :return: PRAGMA schema_version, changed by SQLite on every schema change (tables, columns, indexes).
+    :rtype: int
+    """
+    with getReadConnection(dbPath) as conn:
+        return conn.execute("PRAGMA schema_version;").fetchone()[0]
+
+
+def getTableStats(dbPath):
+    """
+    Row statistics gathered by the last ANALYZE (sqlite_stat1), read without scanning any table.
+
+    :param dbPath: Path to the SQLite database file.
+    :type dbPath: str
+
+    :return: table -> number of rows, and index -> average number of rows per value of its first column.
+        Both empty before the first ANALYZE.
+    :rtype: tuple[dict[str, int], dict[str, int]]
+    """
+    tableRows = {}
+    indexRows = {}
+    with getReadConnection(dbPath) as conn:
+        if not conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1';").fetchone():
+            return tableRows, indexRows
+
+        for table, index, stat in conn.execute("SELECT tbl, idx, stat FROM sqlite_stat1;"):
+            numbers = [int(x) for x in stat.split() if x.isdigit()]
+            if numbers:
+                tableRows[table] = numbers[0]
+
+            if index and len(numbers) > 1:
+                indexRows[index] = numbers[1]
+
+    return tableRows, indexRows
+
+
+def getMaxRowid(dbPath, tableName):
+    """
+    Highest rowid of a table, read from the end of its B-tree: an upper bound of its number of rows
+    at the cost of one seek, when no ANALYZE statistics exist (see getTableStats).
+
+    :param dbPath: Path to the SQLite database file.
+    :type dbPath: str
+    :param tableName: Name of the table.
+    :type tableName: str
+
+    :return: Highest rowid, 0 for an empty table.
+    :rtype: int
+    """
+    with getReadConnection(dbPath) as conn:
+        return conn.execute(f"SELECT max(rowid) FROM {tableName};").fetchone()[0] or 0
+
+
 def getTableFromDb(dbPath):
     """
     Return a list of all table names in the SQLite database.
@@ -234,11 +443,48 @@ def isTableExists(dbPath, tableName):
         # Verify table exists
         cursor.execute(
             "SELECT 1 FROM sqlite_master WHERE type='table' AND name = ?;",  # sqlite_master = intern table that repo all DB objects
-            (tableName)
+            (tableName,)
         )
         return cursor.fetchone() is not None
 
 
+def openReadConnection(dbPath):
+    """
+    Open a read-only connection usable from any thread, rows returned as sqlite3.Row.
+
+    :param dbPath: Path to the SQLite database file.
+    :type dbPath: str
+
+    :return: The new connection.
+    :rtype: sqlite3.Connection
+    """
+    uri = pathlib.Path(dbPath).resolve().as_uri() + '?mode=ro'
+    conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def warmReadPool(dbPath, size=2):
+    """
+    Open read-only connections ahead of the first requests.
+
+    :param dbPath: Path to the SQLite database file.
+    :type dbPath: str
+    :param size: Number of connections to have ready, capped to READ_POOL_SIZE.
+    :type size: int
+    """
+    with _READ_POOLS_LOCK:
+        pool = _READ_POOLS.setdefault(dbPath, queue.LifoQueue(maxsize=READ_POOL_SIZE))
+
+    for _ in range(min(size, READ_POOL_SIZE) - pool.qsize()):
+        fileId = getFileId(dbPath)
+        conn = openReadConnection(dbPath)
+        try:
+            pool.put_nowait((conn, fileId))
+        except queue.Full:
+            conn.close()
+
+
 def deleteLine(dbPath, tableName, primKey):
     """
     Delete a single row from the specified table by primary key.
@@ -348,7 +594,7 @@ def updateLine(dbPath, tableName, data):
     rows = getAllRows(dbPath, tableName)
     primaryValue  = data[primaryColumn]
     existing = [row for row in rows if row[primaryColumn] == primaryValue ]
-    if len(existing) >= 1:
+    if not existing:
         raise ValueError(f"Primary key '{primaryValue }' not found in table '{tableName}'")
 
     current = existing[0]
@@ -439,3 +685,43 @@ def syncDatabase(dbPath, data):
 
     finally:
         conn.close()
+
+
+def writeLines(dbPath, tableName, rows, deletedKeys=None, timeout=5.0):
+    """
+    Insert or update rows and delete others in a single transaction.
+
+    Unlike createLine / updateLine, existing rows are not read first: one executemany upsert
+    (INSERT ... ON CONFLICT DO UPDATE) and one executemany delete. The database must exist,
+    a missing file raises sqlite3.OperationalError instead of creating an empty database.
+
+    :param dbPath: Filesystem path to the SQLite database file.
+    :type dbPath: str
+    :param tableName: Name of the table to write.
+    :type tableName: str
+    :param rows: Complete rows: column -> value, missing columns are written as NULL.
+    :type rows: list[dict[str, any]]
+    :param deletedKeys: Primary key values of the rows to delete.
+    :type deletedKeys: list or None
+    :param timeout: Seconds to wait for a database locked by another writer.
+    :type timeout: float
+    """
+    uri = pathlib.Path(dbPath).resolve().as_uri() + '?mode=rw'
+    conn = sqlite3.connect(uri, uri=True, timeout=timeout)
+    try:
+        sqlInfo = conn.execute(f"PRAGMA table_info({tableName});").fetchall()
+        if not sqlInfo:
+            raise ValueError(f"'{tableName}' does not exist in database: {dbPath}")
+
+        columns = [x[1] for x in sqlInfo]
+        primaryColumn = min(x[1] for x in sqlInfo if x[-1] == 1)
+        updates = ", ".join(f"{c} = excluded.{c}" for c in columns if c != primaryColumn)
+
+        with conn:  # commit on success / rollback on error
+            conn.executemany(f"INSERT INTO {tableName} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)}) "
+                             f"ON CONFLICT({primaryColumn}) DO UPDATE SET {updates};",
+                             [tuple(row.get(c) for c in columns) for row in rows])
+            conn.executemany(f"DELETE FROM {tableName} WHERE {primaryColumn} = ?;", [(k,) for k in deletedKeys or []])
+
+    finally:
+        conn.close()
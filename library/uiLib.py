@@ -26,6 +26,7 @@ STYLE_SHEET = {
     'QCheckBox': "color: rgb(212, 212, 212);",
     'QWidget': "background-color: transparent;",
     'QTableWidget': "QTableWidget {background-color: rgb(45, 45, 45); color: rgb(212, 212, 212);} QHeaderView::section { background-color: rgb(85, 85, 85); color: rgb(212, 212, 212);}",
+    'QTableView': "QTableView {background-color: rgb(45, 45, 45); color: rgb(212, 212, 212);} QHeaderView::section { background-color: rgb(85, 85, 85); color: rgb(212, 212, 212);}",
     'QMenuBar': "background-color: transparent; color: rgb(212, 212, 212);",
     'QLineEdit': "background-color: rgb(85, 85, 85); color: rgb(212, 212, 212); border: 4px solid rgb(85, 85, 85)",
     'QTextEdit': "background-color: rgb(85, 85, 85); color: rgb(212, 212, 212); border: 4px solid rgb(85, 85, 85)",
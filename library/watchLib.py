@@ -0,0 +1,317 @@
+"""
+===============================================================================
+fileName: watchLib
+scripter: angiu
+creation date: 19/10/2026
+description: folder watcher, calls back with added / modified / deleted events on the files of some folders
+    - inotify through ctypes on linux for local folders
+    - periodic os.scandir stat diff otherwise (network shares do not report remote changes to inotify)
+    - hidden files (temporary files, indexes) are ignored
+===============================================================================
+"""
+# ==== native ==== #
+import os
+import sys
+import time
+import ctypes
+import ctypes.util
+import select
+import struct
+import threading
+
+# ==== third ==== #
+
+# ==== local ===== #
+
+# ==== global ==== #
+EVENT_KINDS = ['added', 'modified', 'deleted', 'rescan']  # rescan: events were lost, name is None
+WATCH_MODES = ['auto', 'inotify', 'poll']
+POLL_INTERVAL = 2.0  # seconds between two scandir passes
+DEBOUNCE = 0.2  # seconds without new event before the callback
+MAX_DELAY = 1.0  # seconds after which pending events are sent even if more keep coming
+NETWORK_FILESYSTEMS = ['nfs', 'nfs4', 'cifs', 'smbfs', 'smb3', 'fuse.sshfs', '9p']
+IN_CLOSE_WRITE = 0x8
+IN_MOVED_FROM = 0x40
+IN_MOVED_TO = 0x80
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_Q_OVERFLOW = 0x4000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+INOTIFY_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+EVENT_HEADER = struct.Struct('iIII')  # wd, mask, cookie, len
+
+
+class FolderWatcher:
+    def __init__(self, folders, callback, mode='auto', interval=POLL_INTERVAL):
+        """
+        :param folders: Folders to watch (not recursive), missing ones are watched once created in poll mode.
+        :type folders: list[str]
+        :param callback: Called from the watcher thread with a list of (kind, folder, name).
+        :type callback: callable
+        :param mode: One of WATCH_MODES, 'auto' picks inotify when every folder is local.
+        :type mode: str
+        :param interval: Seconds between two passes in poll mode.
+        :type interval: float
+        """
+        if mode not in WATCH_MODES:
+            raise ValueError(f'unknown watch mode: {mode}, expected one of: {WATCH_MODES}')
+
+        self.folders = [os.path.abspath(x) for x in folders]
+        self.callback = callback
+        self.interval = interval
+        self.mode = mode
+        if mode == 'auto':
+            self.mode = 'inotify' if isInotifyAvailable() and all(isLocalFolder(x) for x in self.folders) else 'poll'
+
+        self._stop = threading.Event()
+        self._thread = None
+        self._inotify = None  # (fd, watch descriptor -> folder) opened by prepare
+        self._states = {}  # folder -> scanFolder baseline taken by prepare
+
+    def isRunning(self):
+        return bool(self._thread and self._thread.is_alive())
+
+    def start(self):
+        """
+        Start watching: every change made once start returned is reported.
+        """
+        if self.isRunning():
+            return
+
+        self._stop.clear()
+        self.prepare()
+        self._thread = threading.Thread(target=self.run, name='folderWatcher', daemon=True)
+        self._thread.start()
+        print(f'watching: {len(self.folders)} folders ({self.mode})')
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def prepare(self):
+        """
+        Add the inotify watches, or take the poll baseline, in the calling thread: taken later by the
+        watcher thread, a change made in between would be part of the baseline and never reported.
+        """
+        if self.mode == 'inotify':
+            try:
+                self._inotify = self.openInotify()
+                return
+
+            except OSError as e:
+                print(f'inotify unavailable: {e}, polling instead')
+                self.mode = 'poll'
+
+        self._states = {folder: scanFolder(folder) for folder in self.folders}
+
+    def run(self):
+        if self.mode == 'inotify':
+            try:
+                self.runInotify()
+                return
+
+            except OSError as e:
+                print(f'inotify failed: {e}, polling instead')
+                self.mode = 'poll'
+                self._states = {folder: scanFolder(folder) for folder in self.folders}
+
+        self.runPoll()
+
+    def emit(self, events):
+        events = mergeEvents(events)
+        if not events:
+            return
+
+        try:
+            self.callback(events)
+        except Exception as e:
+            print(f'watch callback failed: {e}')
+
+    def openInotify(self):
+        """
+        :return: inotify file descriptor, watch descriptor -> folder of the existing folders.
+        :rtype: tuple[int, dict[int, str]]
+        """
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+
+        folders = {}
+        for folder in self.folders:
+            if not os.path.isdir(folder):
+                continue
+
+            wd = libc.inotify_add_watch(fd, os.fsencode(folder), INOTIFY_MASK)
+            if wd < 0:
+                errno = ctypes.get_errno()
+                os.close(fd)
+                raise OSError(errno, f'inotify_add_watch failed on: {folder}')
+
+            folders[wd] = folder
+
+        return fd, folders
+
+    def runInotify(self):
+        fd, folders = self._inotify
+        try:
+            pending = []
+            first = None
+            while not self._stop.is_set():
+                ready, _, _ = select.select([fd], [], [], DEBOUNCE if pending else 0.5)
+                if ready:
+                    try:
+                        buffer = os.read(fd, 64 * 1024)
+                    except BlockingIOError:
+                        buffer = b''
+
+                    pending += parseInotifyEvents(buffer, folders)
+                    first = first or time.monotonic()
+                    if time.monotonic() - first < MAX_DELAY:
+                        continue
+
+                if pending:
+                    self.emit(pending)
+                    pending = []
+                    first = None
+
+        finally:
+            os.close(fd)
+            self._inotify = None
+
+    def runPoll(self):
+        states = self._states
+        while not self._stop.wait(self.interval):
+            events = []
+            for folder in self.folders:
+                state = scanFolder(folder)
+                previous = states[folder]
+                for name, signature in state.items():
+                    if name not in previous:
+                        events.append(('added', folder, name))
+                    elif previous[name] != signature:
+                        events.append(('modified', folder, name))
+
+                events += [('deleted', folder, name) for name in previous.keys() - state.keys()]
+                states[folder] = state
+
+            self.emit(events)
+
+
+def isInotifyAvailable():
+    """
+    :return: True on linux when libc exposes inotify.
+    :rtype: bool
+    """
+    if not sys.platform.startswith('linux'):
+        return False
+
+    libcName = ctypes.util.find_library('c')
+    return bool(libcName) and hasattr(ctypes.CDLL(libcName), 'inotify_init1')
+
+
+def isLocalFolder(folder):
+    """
+    :param folder: Folder path.
+    :type folder: str
+
+    :return: False if the folder is on a network filesystem according to /proc/mounts, True otherwise.
+    :rtype: bool
+    """
+    try:
+        with open('/proc/mounts', 'r', encoding='utf-8') as f:
+            mounts = [line.split()[1:3] for line in f if len(line.split()) > 2]
+
+    except OSError:
+        return True
+
+    folder = os.path.realpath(folder)
+    matching = [(point, fsType) for point, fsType in mounts if folder == point or folder.startswith(point.rstrip('/') + '/')]
+    if not matching:
+        return True
+
+    return max(matching, key=lambda x: len(x[0]))[1] not in NETWORK_FILESYSTEMS
+
+
+def mergeEvents(events):
+    """
+    Keep one event per file: added + modified -> added, added + deleted -> nothing, deleted + added -> modified.
+
+    :param events: (kind, folder, name) in the order they happened.
+    :type events: list[tuple]
+
+    :return: Merged events, in order of first appearance.
+    :rtype: list[tuple]
+    """
+    merged = {}
+    for kind, folder, name in events:
+        key = (folder, name)
+        previous = merged.get(key)
+        if previous == 'added' and kind == 'modified':
+            continue
+
+        if previous == 'added' and kind == 'deleted':
+            del merged[key]
+            continue
+
+        if previous == 'deleted' and kind == 'added':
+            kind = 'modified'
+
+        merged[key] = kind
+
+    return [(kind, folder, name) for (folder, name), kind in merged.items()]
+
+
+def parseInotifyEvents(buffer, folders):
+    """
+    :param buffer: Bytes read from the inotify file descriptor.
+    :type buffer: bytes
+    :param folders: watch descriptor -> folder.
+    :type folders: dict[int, str]
+
+    :return: (kind, folder, name) of the files events.
+    :rtype: list[tuple]
+    """
+    events = []
+    offset = 0
+    while offset + EVENT_HEADER.size <= len(buffer):
+        wd, mask, _, length = EVENT_HEADER.unpack_from(buffer, offset)
+        name = os.fsdecode(buffer[offset + EVENT_HEADER.size:offset + EVENT_HEADER.size + length].rstrip(b'\0'))
+        offset += EVENT_HEADER.size + length
+
+        if mask & IN_Q_OVERFLOW:
+            events += [('rescan', folder, None) for folder in folders.values()]
+            continue
+
+        folder = folders.get(wd)
+        if not folder or not name or name.startswith('.') or mask & IN_ISDIR:
+            continue
+
+        if mask & (IN_CREATE | IN_MOVED_TO):
+            events.append(('added', folder, name))
+        elif mask & IN_CLOSE_WRITE:
+            events.append(('modified', folder, name))
+        elif mask & (IN_DELETE | IN_MOVED_FROM):
+            events.append(('deleted', folder, name))
+
+    return events
+
+
+def scanFolder(folder):
+    """
+    :param folder: Folder path.
+    :type folder: str
+
+    :return: name -> (mtime ns, size) of the visible files, empty if the folder does not exist.
+    :rtype: dict[str, tuple]
+    """
+    try:
+        with os.scandir(folder) as entries:
+            return {entry.name: (entry.stat().st_mtime_ns, entry.stat().st_size) for entry in entries
+                    if not entry.name.startswith('.') and entry.is_file()}
+
+    except OSError:
+        return {}
@@ -10,20 +10,45 @@ description:
 import os
 import re
 import json
+import time
+import atexit
+import hashlib
+import sqlite3
+import threading
+from bisect import bisect_left
 from datetime import datetime
 from datetime import timedelta
+from functools import partial
+from contextlib import contextmanager
 
 # ==== third ==== #
 
 # ==== local ===== #
 from machineMonitor.library.infoLib import COLORS
 from machineMonitor.library.infoLib import getUUID
+from machineMonitor.library.infoLib import isProcessAlive
+from machineMonitor.library.fileLib import writeJsonAtomic
+from machineMonitor.library.fileLib import loadJsonFiles
+from machineMonitor.library.fileLib import readJsonFile
+from machineMonitor.library.fileLib import syncFolder
+from machineMonitor.library.fileLib import createLockFile
+from machineMonitor.library.fileLib import breakStaleLock
+from machineMonitor.library.fileLib import releaseLockFile
+from machineMonitor.library.sqlLib import getRelatedSQLInfo
+from machineMonitor.library.sqlLib import writeLines
+from machineMonitor.library.watchLib import FolderWatcher
+from machineMonitor.machineManager.core import getMachineRecord
+from machineMonitor.machineManager.core import MACHINE_FOLDER
+from machineMonitor.logger import journal
+from machineMonitor.data.init_db import convertRecord
+from machineMonitor.data.init_db import DB_PATH
 
 # ==== global ==== #
 BASE_FOLDER = os.sep.join(__file__.split(os.sep)[:-2])
 DATA_REPO = os.path.join(BASE_FOLDER, 'data')
 LOGS_REPO = os.path.join(DATA_REPO, 'logs')
 MACHINE_REPO = os.path.join(DATA_REPO, 'machines')
+EMPLOYS_REPO = os.path.join(DATA_REPO, 'employs')
 ICON_FOLDER = os.path.join(BASE_FOLDER, 'icon')
 AUTHORISATION_MENUS = {2: ['edit', 'delete'], 1: ['edit']}
 LOG_TYPES = ['empty consumable & reload', 'info', 'error']
@@ -33,23 +58,171 @@ NO_MACHINE_CMD = (f"QComboBox {{ border: 2px solid rgb({R}, {G}, {B});"
                   f"background-color: rgb(85, 85, 85)}}")
 DATE_FILE_PATTERN = re.compile(r'^(?P<year>\d{4})_(?P<month>0[1-9]|1[0-2])_(?P<day>0[1-9]|[12]\d|3[01])$')
 UUID_PATTERN = re.compile(r'^[0-9a-f]{8}-[0-9a-f]{4}-4[0-9a-f]{3}-[89ab][0-9a-f]{3}-[0-9a-f]{12}$', re.IGNORECASE)
-EXCLUDED_KEYS = ['file', 'machineData', 'comment', 'timeStamp']
+EXCLUDED_KEYS = ['file', 'machineData', 'comment', 'timeStamp', 'version']
+CACHE_FOLDER = os.environ.get('MACHINE_MONITOR_CACHE') or os.path.join(
+    os.environ.get('LOCALAPPDATA') or os.path.join(os.path.expanduser('~'), '.cache'), 'machineMonitor')  # local, per user
+LOGS_INDEX_FILE = os.path.join(  # kept per workstation: rewriting one shared index on every change races on the share
+    CACHE_FOLDER, f"logsIndex_{hashlib.blake2b(os.path.abspath(LOGS_REPO).encode('utf-8'), digest_size=8).hexdigest()}.json")
+INDEX_VERSION = 1  # bump when the layout of LOGS_INDEX_FILE changes
+LOAD_WORKERS = int(os.environ.get('MACHINE_MONITOR_LOAD_WORKERS') or 0) or None  # None: executor default
+LOAD_MODE = os.environ.get('MACHINE_MONITOR_LOAD_MODE') or 'thread'  # 'thread' (I/O bound) or 'process' (parse bound)
+PARALLEL_LOAD_THRESHOLD = 256  # files to parse from which refreshLogsIndex uses loadJsonFiles
+LOAD_CHUNK = 2000  # files parsed between two checks of the cancellation of refreshLogsIndex
+LOG_STORAGES = ['files', 'journal']  # one JSON file per log, or append-only segments (see logger.journal)
+LOG_STORAGE = os.environ.get('MACHINE_MONITOR_LOG_STORAGE') or 'files'
+MIGRATION_BATCH = 1000  # logs appended per journal write by migrateLogsToJournal
+WATCH_MODE = os.environ.get('MACHINE_MONITOR_WATCH_MODE') or 'auto'  # see watchLib.WATCH_MODES
+WRITE_BATCH = int(os.environ.get('MACHINE_MONITOR_WRITE_BATCH') or 0)  # logs per group commit, 0: saveData writes at once
+WRITE_DELAY = float(os.environ.get('MACHINE_MONITOR_WRITE_DELAY') or 2.0)  # seconds before an incomplete batch is written
+LOCK_FOLDER = '.locks'  # in LOGS_REPO, one lock file per log being updated (see lockLog)
+LOCK_TIMEOUT = 10.0  # seconds an update waits for the lock of its log
+LOCK_AGE = 60  # seconds after which a log lock is considered abandoned, in the clock of the file server
+LOCK_CHECK = 1.0  # seconds a waiter lets pass between two checks of the age of a lock
+WRITE_THROUGH = os.environ.get('MACHINE_MONITOR_WRITE_THROUGH') == '1'  # also write saved / deleted logs to SQL_DB
+SQL_DB = os.environ.get('MACHINE_MONITOR_DB') or DB_PATH
+DB_TIMEOUT = 5.0  # seconds to wait for a locked database before using the outbox
+OUTBOX_FOLDER = '.outbox'  # in LOGS_REPO, changes not written to SQL_DB yet, one file per writer
+OUTBOX_BATCH = 500  # records per transaction when draining the outbox
+PENDING_FOLDER = '.pending'  # in LOGS_REPO, one queue file per writer process (see getPendingPath)
+DRAFT_KINDS = {'temp': [], 'error': ['error']}  # kind -> sub folders of .temp before <userName>
+DRAFTS_FILE = '.drafts.json'  # per user manifest, in the temp drafts folder
+DRAFTS_VERSION = 1  # bump when the layout of DRAFTS_FILE changes
+RETENTION_DAYS = 3  # age after which temp drafts are removed
+RETENTION_INTERVAL = 6 * 3600  # seconds between two retention passes
+_LOGS_INDEX = {}  # in-memory copy of LOGS_INDEX_FILE: uuid -> {'mtime', 'size', 'data'}
+_VALUE_INDEX = {}  # log field value -> set of uuids
+_INDEXED_LOGS = {}  # uuid -> (log data the entry was built from, (field, value) pairs)
+_MACHINE_LOGS = {}  # machineName -> set of uuids
+_MACHINE_VALUES = {}  # machine field value -> set of machineNames
+_MACHINE_RECORDS = {}  # machineName -> machine record, machines having logs only
+_COMPLETIONS = {}  # log field -> {value: number of logs holding it}
+_DRAFTS = {}  # userName -> (manifest mtime ns, manifest)
+_DRAFT_LOCK = threading.RLock()
+_PENDING_LOGS = {}  # uuid -> data queued by saveData, not yet written
+_WRITE_LOCK = threading.RLock()
+_WRITE_STATE = {'fd': None, 'pid': None, 'timer': None, 'recovered': False, 'claimed': []}
+_OUTBOX_LOCK = threading.RLock()
+_INDEX_LOCK = threading.RLock()  # the value index is refreshed by the LogViewer loading thread
+_INDEX_STATE = {'version': 0, 'snapshot': None}  # version moves on each change of the indexed logs or machines
+_WATCH_STATE = {'watcher': None, 'synced': False}  # synced: _LOGS_INDEX is kept current by the watcher events
+_WATCH_LOCK = threading.Lock()  # the watcher is started by the LogViewer loading thread, stopped by the GUI one
+
+
+class LogConflictError(RuntimeError):
+    pass
+
+
+class LogSnapshot:
+    """
+    Logs and machines as they were at one version of the value index, shared by the table and the completer.
+
+    Nothing in a snapshot is modified once built: a change of the logs gives a new snapshot.
+    """
+    def __init__(self, version, logs, machines, counts):
+        self.version = version
+        self.logs = logs  # uuid -> log content
+        self.machines = machines  # machineName -> machine record or None
+        self.counts = counts  # completion counts, see getCompletionCounts
+        self.headers = getTableHeaders(logs)
+        self._rows = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.logs)
+
+    def getRows(self):
+        """
+        :return: Rows of getAllData, built on first call then shared: read only.
+        :rtype: list[dict]
+        """
+        with self._lock:
+            if self._rows is None:
+                self._rows = [buildRow(uuidValue, logData, self.machines) for uuidValue, logData in self.logs.items()]
+
+            return self._rows
+
+
+def addDraft(filePath, kind='temp', userName=None):
+    """
+    Register a draft written by saveData in the manifest of its user.
+
+    :param filePath: Path of the draft file (name starting with its time stamp).
+    :type filePath: str
+    :param kind: One of DRAFT_KINDS.
+    :type kind: str
+    :param userName: Owner of the draft, default the current user.
+    :type userName: str or None
+    """
+    userName = userName or os.getlogin()
+    with _DRAFT_LOCK:
+        manifest = getDraftManifest(userName)
+        names = manifest['drafts'][kind]
+        name = os.path.basename(filePath)
+        index = bisect_left(names, name)
+        if index < len(names) and names[index] == name:
+            return
+
+        names.insert(index, name)  # time stamped names: an append most of the time
+        saveDraftManifest(userName, manifest)
+
+
+def buildDraftManifest(userName):
+    """
+    List the draft folders of a user once, for a missing or outdated manifest.
+
+    :param userName: Owner of the drafts.
+    :type userName: str
+
+    :return: {'version', 'drafts': kind -> sorted file names, 'cleaned': time of the last retention pass}
+    :rtype: dict
+    """
+    drafts = {}
+    for kind in DRAFT_KINDS:
+        folder = getDraftFolder(kind, userName)
+        names = []
+        if os.path.exists(folder):
+            with os.scandir(folder) as entries:
+                names = [entry.name for entry in entries if entry.is_file() and isDraftName(entry.name)]
+
+        drafts[kind] = sorted(names)
+
+    return {'version': DRAFTS_VERSION, 'drafts': drafts, 'cleaned': 0}
 
 
-def clearTempData():
+def clearTempData(force=False):
     """
-    Remove temporary data files older than 3 days from the temp folder.
+    Remove the temp drafts older than RETENTION_DAYS, at most once every RETENTION_INTERVAL seconds.
 
-    This function checks all files returned by getTempData() and deletes
-    those whose date (parsed from filename) is more than 3 days before now.
+    The drafts of the manifest are sorted by time stamp: the expired ones are a prefix found with bisect.
+    Error backups are kept, they are removed once loaded by the Logger.
+
+    :param force: Run the retention pass even if the last one is recent.
+    :type force: bool
+
+    :return: Number of drafts removed.
+    :rtype: int
     """
-    tempData = getTempData()
-    cutoff = datetime.now() - timedelta(days=3)
-    for dateStr, filePath in tempData.items():
-        fileDate = datetime.strptime(dateStr, '%Y_%m_%d')
-        if fileDate < cutoff:
-            os.remove(filePath)
-            print('deleted: filePath')
+    userName = os.getlogin()
+    with _DRAFT_LOCK:
+        manifest = getDraftManifest(userName)
+        if not force and time.time() - manifest.get('cleaned', 0) < RETENTION_INTERVAL:
+            return 0
+
+        names = manifest['drafts']['temp']
+        cutoff = (datetime.now() - timedelta(days=RETENTION_DAYS)).strftime('%Y_%m_%d__%H_%M_%S')
+        index = bisect_left(names, cutoff)
+        folder = getDraftFolder('temp', userName)
+        for name in names[:index]:
+            filePath = os.path.join(folder, name)
+            if os.path.exists(filePath):
+                os.remove(filePath)
+                print(f'deleted: {filePath}')
+
+        manifest['drafts']['temp'] = names[index:]
+        manifest['cleaned'] = time.time()
+        saveDraftManifest(userName, manifest)
+
+    return index
 
 
 def deleteLogs(logUuid):
@@ -62,14 +235,61 @@ def deleteLogs(logUuid):
     :return: None if the file was deleted or not found, otherwise the caught Exception.
     :rtype: None or Exception
     """
+    try:
+        with lockLog(logUuid):
+            return removeLog(logUuid)
+
+    except Exception as e:
+        return e
+
+
+def removeLog(logUuid):
+    """
+    deleteLogs once the log is locked.
+
+    :param logUuid: The UUID of the log to delete.
+    :type logUuid: str
+
+    :return: None if the file was deleted or not found, otherwise the caught Exception.
+    :rtype: None or Exception
+    """
+    if logUuid in _PENDING_LOGS:
+        try:
+            flushLogs()
+        except Exception as e:
+            return e
+
+    if LOG_STORAGE == 'journal':
+        try:
+            if not journal.deleteLog(logUuid):
+                print(f'not found: {logUuid}')
+
+            if logUuid in _INDEXED_LOGS:
+                unIndexLog(logUuid)
+
+            syncLogs([(logUuid, None)])
+            return None
+
+        except Exception as e:
+            return e
+
     relatedFile = os.path.join(LOGS_REPO, f'{logUuid}.json')
     if not os.path.exists(relatedFile):
         print(f'not found: {relatedFile}')
+        syncLogs([(logUuid, None)])  # the database may still hold it
         return None
 
     try:
         os.remove(relatedFile)
+        if _WATCH_STATE['synced']:
+            with _INDEX_LOCK:
+                _LOGS_INDEX.pop(logUuid, None)
+
+        if logUuid in _INDEXED_LOGS:
+            unIndexLog(logUuid)
+
         print(f'deleted: {relatedFile}')
+        syncLogs([(logUuid, None)])
         return None
 
     except Exception as e:
@@ -109,14 +329,64 @@ def getDataFromUuid(logsUuid):
     :return: Parsed JSON content as a dict, or an empty dict if the file is missing.
     :rtype: dict
     """
+    if logsUuid in _PENDING_LOGS:
+        return dict(_PENDING_LOGS[logsUuid])
+
+    if LOG_STORAGE == 'journal':
+        return dict(journal.getLog(logsUuid) or {})
+
     logsPath = os.path.join(LOGS_REPO, f'{logsUuid}.json')
     if not os.path.exists(logsPath):
         return {}
 
-    with open(logsUuid, 'r', encoding='utf-8') as f:
+    with open(logsPath, 'r', encoding='utf-8') as f:
         return json.load(f)
 
 
+def getDraftFolder(kind, userName):
+    """
+    :param kind: One of DRAFT_KINDS.
+    :type kind: str
+    :param userName: Owner of the drafts.
+    :type userName: str
+
+    :return: LOGS_REPO/.temp/<userName> for temp drafts, LOGS_REPO/.temp/error/<userName> for backups.
+    :rtype: str
+    """
+    return os.path.join(LOGS_REPO, '.temp', *DRAFT_KINDS[kind], userName)
+
+
+def getDraftManifest(userName):
+    """
+    Manifest of the drafts of a user, read again only when its file changed.
+
+    :param userName: Owner of the drafts.
+    :type userName: str
+
+    :return: {'version', 'drafts': kind -> sorted file names, 'cleaned': time of the last retention pass}
+    :rtype: dict
+    """
+    manifestPath = os.path.join(getDraftFolder('temp', userName), DRAFTS_FILE)
+    with _DRAFT_LOCK:
+        try:
+            mtime = os.stat(manifestPath).st_mtime_ns
+        except OSError:
+            mtime = None
+
+        cached = _DRAFTS.get(userName)
+        if cached and mtime is not None and cached[0] == mtime:
+            return cached[1]
+
+        manifest = readJsonFile(manifestPath) if mtime is not None else None
+        if not isinstance(manifest, dict) or manifest.get('version') != DRAFTS_VERSION:
+            manifest = buildDraftManifest(userName)
+            saveDraftManifest(userName, manifest)
+            return manifest
+
+        _DRAFTS[userName] = (mtime, manifest)
+        return manifest
+
+
 def getFileData(folder):
     """
     Retrieve the most recent file in the specified folder matching the date pattern.
@@ -130,19 +400,11 @@ def getFileData(folder):
     if not os.path.exists(folder):
         return None
 
-    data = {}
-    for item in os.listdir(folder):
-        shortName = os.path.splitext(item)[0].split('__')[0]
-        if not re.match(DATE_FILE_PATTERN, shortName):
-            continue
-
-        data[shortName] = os.path.join(folder, item)
-
-    if not data:
-        return {}
+    names = [x for x in os.listdir(folder) if isDraftName(x)]
+    if not names:
+        return None
 
-    latestDateStr = max(data.keys(), key=lambda ds: datetime.strptime(ds, '%Y_%m_%d'))
-    return data[latestDateStr]
+    return os.path.join(folder, max(names))  # zero padded time stamps: the text order is the time order
 
 
 def getInitInfo():
@@ -156,39 +418,89 @@ def getInitInfo():
     :rtype: tuple[str or None, dict, bool]
     """
     userName = os.getlogin()
-    filePath = getFileData(os.path.join(LOGS_REPO, '.temp', 'error', userName))
+    filePath = getLatestDraft('error', userName)
     fromError = True
     if not filePath:
-        filePath = getFileData(os.path.join(LOGS_REPO, '.temp', userName))
+        filePath = getLatestDraft('temp', userName)
         fromError = False
 
     return filePath, getDataFromFile(filePath), fromError
 
 
-def getTempData():
+def getLatestDraft(kind='temp', userName=None):
     """
-    Collect temporary data files from the user's temp directory.
+    :param kind: One of DRAFT_KINDS.
+    :type kind: str
+    :param userName: Owner of the drafts, default the current user.
+    :type userName: str or None
+
+    :return: Path of the most recent draft (last of the manifest), None if there is none.
+        Drafts removed outside of removeDraft are dropped from the manifest on the way.
+    :rtype: str or None
+    """
+    userName = userName or os.getlogin()
+    folder = getDraftFolder(kind, userName)
+    with _DRAFT_LOCK:
+        manifest = getDraftManifest(userName)
+        names = manifest['drafts'][kind]
+        stale = False
+        while names and not os.path.exists(os.path.join(folder, names[-1])):
+            names.pop()
+            stale = True
+
+        if stale:
+            saveDraftManifest(userName, manifest)
 
-    Scans LOGS_REPO/.temp/<username>/ for JSON files and returns
-    a dict mapping each file's date string (YYYY_MM_DD) to its full path.
+        return os.path.join(folder, names[-1]) if names else None
 
-    :return: Mapping of date strings to file paths.
+
+def getTempData():
+    """
+    Collect the temp drafts of the current user, from its manifest.
+
+    :return: Mapping of time stamps (YYYY_MM_DD__HH_MM_SS) to file paths, oldest first.
     :rtype: dict
     """
-    tempFolder = os.path.join(LOGS_REPO, '.temp', os.getlogin())
+    userName = os.getlogin()
+    folder = getDraftFolder('temp', userName)
+    return {os.path.splitext(name)[0]: os.path.join(folder, name) for name in getDraftManifest(userName)['drafts']['temp']}
+
+
+def isDraftName(name):
+    """
+    :param name: File name.
+    :type name: str
 
-    tempData = {}
-    if not os.path.exists(tempFolder):
-        return tempData
+    :return: True if the name starts with a date (YYYY_MM_DD), like the drafts written by saveData.
+    :rtype: bool
+    """
+    return bool(re.match(DATE_FILE_PATTERN, os.path.splitext(name)[0].split('__')[0]))
 
-    for item in os.listdir(tempFolder):
-        relatedDate = os.path.splitext(item)[0].split('__')[0]
-        tempData[relatedDate] = os.path.join(tempFolder, item)
 
-    return tempData
+def removeDraft(filePath, userName=None):
+    """
+    Delete a draft file and its manifest entry.
+
+    :param filePath: Path of the draft.
+    :type filePath: str
+    :param userName: Owner of the draft, default the current user.
+    :type userName: str or None
+    """
+    userName = userName or os.getlogin()
+    if os.path.exists(filePath):
+        os.remove(filePath)
+        print(f'deleted: {filePath}')
 
+    with _DRAFT_LOCK:
+        manifest = getDraftManifest(userName)
+        name = os.path.basename(filePath)
+        for kind, names in manifest['drafts'].items():
+            if filePath == os.path.join(getDraftFolder(kind, userName), name) and name in names:
+                names.remove(name)
+                saveDraftManifest(userName, manifest)
 
-def saveData(data, mode='save', logUuid=None):
+
+def saveData(data, mode='save', logUuid=None, version=None):
     """
     Save or update log data in LOGS_REPO according to mode and logUuid.
 
@@ -202,6 +514,12 @@ def saveData(data, mode='save', logUuid=None):
     :type mode: str
     :param logUuid: If provided, update the existing JSON log; otherwise generate a new UUID.
     :type logUuid: str or None
+    :param version: For an update, 'version' of the log when it was read: the update is refused with a
+        LogConflictError if the log changed since. None updates whatever the current version.
+    :type version: int or None
+
+    An update reads, merges and writes the log under its lock (see lockLog) and bumps its 'version'.
+    Logs are written through writeLog: atomic file replace, journal or group commit.
 
     :return: None if successful or mode unknown, otherwise the caught Exception.
     :rtype: None or Exception
@@ -209,30 +527,49 @@ def saveData(data, mode='save', logUuid=None):
     timeStamp = datetime.now().strftime('%Y_%m_%d__%H_%M_%S')
     userName = os.getlogin()
 
-    if not logUuid:
-        logUuid = getUUID()
+    if logUuid:
+        try:
+            with lockLog(logUuid):
+                if logUuid in _PENDING_LOGS:
+                    flushLogs()  # another process only sees written logs
+
+                existingData = getDataFromUuid(logUuid)
+                current = existingData.get('version', 0)
+                if version is not None and version != current:
+                    raise LogConflictError(f'{logUuid} changed since version {version} (now {current})')
 
-        data.update({'timeStamp': timeStamp, 'userName': userName})
+                existingData.update(data)
+                existingData.setdefault('modified', []).append([timeStamp, userName])
+                existingData['version'] = current + 1
+                writeLog(logUuid, existingData, mode, queue=False)
 
-        if mode == 'save':
-            filePath = os.path.join(LOGS_REPO, f'{logUuid}.json')
+            return None
 
-        elif mode == 'temp':
-            filePath = os.path.join(LOGS_REPO, '.temp', userName, f'{timeStamp}.json')
+        except Exception as e:
+            print(f'error while saving: {e}')
+            return e
 
-        elif mode == 'backup':
-            filePath = os.path.join(LOGS_REPO, '.temp', 'error', userName, f'{timeStamp}.txt')
+    logUuid = getUUID()
+    data.update({'timeStamp': timeStamp, 'userName': userName})
 
-        else:
-            print(f'unknown mode: {mode}')
+    if mode == 'save':
+        try:
+            writeLog(logUuid, data, mode)
             return None
 
-    else:
-        existingData = getDataFromUuid(logUuid)
-        existingData.update(data)
-        existingData.setdefault('modified', []).append([timeStamp, userName])
+        except Exception as e:
+            print(f'error while saving: {e}')
+            return e
 
-        filePath = os.path.join(LOGS_REPO, f'{logUuid}.json')
+    elif mode == 'temp':
+        filePath = os.path.join(LOGS_REPO, '.temp', userName, f'{timeStamp}.json')
+
+    elif mode == 'backup':
+        filePath = os.path.join(LOGS_REPO, '.temp', 'error', userName, f'{timeStamp}.txt')
+
+    else:
+        print(f'unknown mode: {mode}')
+        return None
 
     folder = os.path.split(filePath)[0]
     if not os.path.exists(folder):
@@ -247,20 +584,646 @@ def saveData(data, mode='save', logUuid=None):
             elif filePath.endswith('.txt'):
                 f.write('\n'.join([f'- {k}: {v}' for k, v in data.items()]))
 
-            print(f'{mode} as: {filePath}')
-            return None
+        addDraft(filePath, 'error' if mode == 'backup' else 'temp', userName)
+        print(f'{mode} as: {filePath}')
+        return None
 
     except Exception as e:
         print(f'error while saving: {e}')
         return e
 
 
+def saveDraftManifest(userName, manifest):
+    """
+    :param userName: Owner of the drafts.
+    :type userName: str
+    :param manifest: See getDraftManifest.
+    :type manifest: dict
+    """
+    manifestPath = os.path.join(getDraftFolder('temp', userName), DRAFTS_FILE)
+    with _DRAFT_LOCK:
+        writeJsonAtomic(manifestPath, manifest)
+        _DRAFTS[userName] = (os.stat(manifestPath).st_mtime_ns, manifest)
+
+
+def writeLog(logUuid, data, mode='save', queue=True):
+    """
+    Write the complete content of a log and index it.
+
+    :param logUuid: The UUID of the log.
+    :type logUuid: str
+    :param data: Complete content of the log.
+    :type data: dict
+    :param mode: saveData mode, printed only.
+    :type mode: str
+    :param queue: Let WRITE_BATCH queue the log (see queueLog), False writes it at once.
+    :type queue: bool
+
+    With WRITE_THROUGH, the log is also written to SQL_DB (see syncLogs), queued logs once flushed.
+    """
+    if WRITE_BATCH and queue:
+        queueLog(logUuid, data)
+        print(f'{mode} queued: {logUuid}')
+
+    elif LOG_STORAGE == 'journal':
+        journal.appendLogs([(logUuid, data)])
+        print(f'{mode} in journal: {logUuid}')
+
+    else:
+        filePath = os.path.join(LOGS_REPO, f'{logUuid}.json')
+        writeJsonAtomic(filePath, data)  # readers never see a half written log
+        cacheLogFile(logUuid, filePath, data)
+        print(f'{mode} as: {filePath}')
+
+    indexLog(logUuid, data)
+    if not (WRITE_BATCH and queue):
+        syncLogs([(logUuid, data)])
+
+
+@contextmanager
+def lockLog(logUuid, timeout=LOCK_TIMEOUT):
+    """
+    Advisory lock of one log, shared by the threads and processes using LOGS_REPO.
+
+    The lock is a file created with O_EXCL (LOGS_REPO/.locks/<uuid>.lock), which also holds on
+    network shares where flock does not. It holds the token of its owner: the owner only removes
+    a lock still holding its token. A lock older than LOCK_AGE, in the clock of the file server, is considered
+    abandoned (see fileLib.breakStaleLock).
+
+    :param logUuid: The UUID of the log.
+    :type logUuid: str
+    :param timeout: Seconds to wait for the lock before raising TimeoutError.
+    :type timeout: float
+    """
+    lockPath = os.path.join(LOGS_REPO, LOCK_FOLDER, f'{logUuid}.lock')
+    os.makedirs(os.path.dirname(lockPath), exist_ok=True)
+    token = f'{journal.getWriter()}:{os.getpid()}:{getUUID()}'
+
+    deadline = time.monotonic() + timeout
+    nextCheck = time.monotonic() + LOCK_CHECK
+    delay = 0.001
+    while not createLockFile(lockPath, token):
+        if time.monotonic() > nextCheck:
+            nextCheck = time.monotonic() + LOCK_CHECK
+            if breakStaleLock(lockPath, LOCK_AGE):
+                continue
+
+        if time.monotonic() > deadline:
+            raise TimeoutError(f'log locked: {logUuid}')
+
+        time.sleep(delay)
+        delay = min(delay * 2, 0.05)
+
+    try:
+        yield
+
+    finally:
+        releaseLockFile(lockPath, token)
+
+
+def flushLogs():
+    """
+    Write the queued logs in one group: each log replaces its file through a temporary one synced
+    to disk (or the whole group is appended to the journal and synced), then the folder is synced,
+    and only then the queue is emptied, so a power loss never drops a log the queue no longer holds.
+
+    Registered with atexit, also called by the WRITE_DELAY timer and once WRITE_BATCH logs are queued.
+
+    :return: Number of logs written.
+    :rtype: int
+    """
+    with _WRITE_LOCK:
+        timer = _WRITE_STATE['timer']
+        if timer:
+            timer.cancel()
+            _WRITE_STATE['timer'] = None
+
+        if not _PENDING_LOGS:
+            return 0
+
+        records = list(_PENDING_LOGS.items())
+        if LOG_STORAGE == 'journal':
+            journal.appendLogs(records, fsync=True)
+
+        else:
+            for logUuid, data in records:
+                filePath = os.path.join(LOGS_REPO, f'{logUuid}.json')
+                writeJsonAtomic(filePath, data, fsync=True)
+                cacheLogFile(logUuid, filePath, data)
+
+            syncFolder(LOGS_REPO)
+
+        if _WRITE_STATE['fd'] is not None:
+            os.ftruncate(_WRITE_STATE['fd'], 0)
+
+        for claimedPath in _WRITE_STATE['claimed']:
+            os.remove(claimedPath)
+
+        _WRITE_STATE['claimed'] = []
+        _PENDING_LOGS.clear()
+
+    print(f'written: {len(records)} queued logs')
+    syncLogs(records)
+    return len(records)
+
+
+def flushPendingLogs():
+    """
+    flushLogs for the WRITE_DELAY timer: errors are printed and the queue is retried later.
+    """
+    try:
+        flushLogs()
+
+    except Exception as e:
+        print(f'fail to write queued logs: {e}')
+        with _WRITE_LOCK:
+            _WRITE_STATE['timer'] = threading.Timer(WRITE_DELAY, flushPendingLogs)
+            _WRITE_STATE['timer'].daemon = True
+            _WRITE_STATE['timer'].start()
+
+
+def getPendingPath(pid=None):
+    """
+    Each process has its own queue: one never replays nor empties the logs queued by another.
+
+    :param pid: Process owning the queue, default this process.
+    :type pid: int or None
+
+    :return: Queue file: LOGS_REPO/.pending/<writer>__<pid>.jsonl
+    :rtype: str
+    """
+    return os.path.join(LOGS_REPO, PENDING_FOLDER, f'{journal.getWriter()}__{pid or os.getpid()}.jsonl')
+
+
+def getPendingPid(fileName):
+    """
+    :param fileName: Name of a file of the queue folder.
+    :type fileName: str
+
+    :return: Process of the queue if it is one of this writer, 0 for a queue from before the per process
+        queues (owner unknown), None for any other file.
+    :rtype: int or None
+    """
+    writer = journal.getWriter()
+    if not fileName.startswith(writer) or not fileName.endswith('.jsonl'):
+        return None
+
+    rest = fileName[len(writer):-len('.jsonl')]
+    if not rest:
+        return 0
+
+    pid = rest[2:].split('.')[0]  # <writer>__<pid>.jsonl, or <writer>__<pid>.<ns>.jsonl once claimed
+    return int(pid) if rest.startswith('__') and pid.isdigit() else None
+
+
+def queueLog(logUuid, data):
+    """
+    Queue a log for the next group commit (see flushLogs).
+
+    The log is appended to the queue file at once, so a crash of the application before the flush
+    loses nothing: recoverPendingLogs writes it on the next start.
+
+    :param logUuid: The UUID of the log.
+    :type logUuid: str
+    :param data: Complete content of the log.
+    :type data: dict
+    """
+    with _WRITE_LOCK:
+        recoverPendingLogs()
+        if _WRITE_STATE['fd'] is None or _WRITE_STATE['pid'] != os.getpid():  # none yet, or forked
+            pendingPath = getPendingPath()
+            os.makedirs(os.path.dirname(pendingPath), exist_ok=True)
+            _WRITE_STATE['fd'] = os.open(pendingPath, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o666)
+            _WRITE_STATE['pid'] = os.getpid()
+
+        os.write(_WRITE_STATE['fd'], (json.dumps({'uuid': logUuid, 'data': data}) + '\n').encode('utf-8'))
+        _PENDING_LOGS[logUuid] = data
+
+        if len(_PENDING_LOGS) >= WRITE_BATCH:
+            flushLogs()
+
+        elif not _WRITE_STATE['timer']:
+            _WRITE_STATE['timer'] = threading.Timer(WRITE_DELAY, flushPendingLogs)
+            _WRITE_STATE['timer'].daemon = True
+            _WRITE_STATE['timer'].start()
+
+
+def recoverPendingLogs():
+    """
+    Once per process, write the logs left in the queues of the processes of this writer that are gone.
+
+    A queue is claimed by renaming it to <writer>__<pid>.<ns>.jsonl first, so two processes never
+    recover the same one, and one left by a crash during recovery is recovered again.
+    It is removed once its logs are written (see flushLogs). A queue holding the pid of this process
+    was left by an earlier process with the same pid: recovery runs before this process queues anything.
+
+    A last line cut by the crash is ignored, the next line of a queued log wins over the previous ones.
+
+    :return: Number of logs recovered.
+    :rtype: int
+    """
+    with _WRITE_LOCK:
+        if _WRITE_STATE['recovered']:
+            return 0
+
+        _WRITE_STATE['recovered'] = True
+        pendingFolder = os.path.join(LOGS_REPO, PENDING_FOLDER)
+        if not os.path.exists(pendingFolder):
+            return 0
+
+        recovered = {}
+        for fileName in sorted(os.listdir(pendingFolder)):
+            pid = getPendingPid(fileName)
+            if pid is None or (pid and pid != os.getpid() and isProcessAlive(pid)):
+                continue
+
+            claimedPath = os.path.join(pendingFolder, f'{journal.getWriter()}__{os.getpid()}.{time.time_ns()}.jsonl')
+            try:
+                os.rename(os.path.join(pendingFolder, fileName), claimedPath)
+            except OSError:
+                continue  # claimed by another process
+
+            with open(claimedPath, 'rb') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+
+                    recovered[record['uuid']] = record['data']
+
+            _WRITE_STATE['claimed'].append(claimedPath)
+
+        if not recovered:
+            for claimedPath in _WRITE_STATE['claimed']:
+                os.remove(claimedPath)
+
+            _WRITE_STATE['claimed'] = []
+            return 0
+
+        _PENDING_LOGS.update({k: v for k, v in recovered.items() if k not in _PENDING_LOGS})
+        flushLogs()
+
+    print(f'recovered: {len(recovered)} queued logs from {pendingFolder}')
+    return len(recovered)
+
+
+def syncLogs(records):
+    """
+    With WRITE_THROUGH, write saved and deleted logs to SQL_DB in the same operation.
+
+    The outbox is drained first to keep the order of the changes. When the database is unreachable
+    (missing, locked longer than DB_TIMEOUT, share offline) the records wait in the outbox instead.
+
+    :param records: (uuid, data) pairs, data None for a delete.
+    :type records: list[tuple[str, dict or None]]
+    """
+    if not WRITE_THROUGH or not records:
+        return
+
+    with _OUTBOX_LOCK:
+        try:
+            drainOutbox()
+            writeLogsToDb(records)
+
+        except (sqlite3.Error, OSError) as e:
+            print(f'database unreachable: {e}, {len(records)} logs kept in outbox')
+            appendOutbox(records)
+
+
+def appendOutbox(records):
+    """
+    :param records: (uuid, data) pairs, data None for a delete.
+    :type records: list[tuple[str, dict or None]]
+    """
+    outboxPath = getOutboxPath()
+    os.makedirs(os.path.dirname(outboxPath), exist_ok=True)
+    with open(outboxPath, 'a', encoding='utf-8') as f:
+        f.writelines(json.dumps({'uuid': logUuid, 'data': data}) + '\n' for logUuid, data in records)
+
+
+def drainOutbox():
+    """
+    Write the records waiting in the outbox of this writer to SQL_DB, OUTBOX_BATCH per transaction.
+
+    Only the last record of each log is written; the outbox keeps the records of the batches not committed.
+
+    :return: Number of records written.
+    :rtype: int
+    """
+    with _OUTBOX_LOCK:
+        outboxPath = getOutboxPath()
+        if not os.path.exists(outboxPath):
+            return 0
+
+        records = {}  # uuid -> data, in order of last change
+        with open(outboxPath, 'rb') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+
+                records.pop(record['uuid'], None)
+                records[record['uuid']] = record['data']
+
+        items = list(records.items())
+        written = 0
+        try:
+            for i in range(0, len(items), OUTBOX_BATCH):
+                writeLogsToDb(items[i:i + OUTBOX_BATCH])
+                written = min(i + OUTBOX_BATCH, len(items))
+
+        finally:
+            if written == len(items):
+                os.remove(outboxPath)
+            elif written:
+                with open(outboxPath + '.tmp', 'w', encoding='utf-8') as f:
+                    f.writelines(json.dumps({'uuid': k, 'data': v}) + '\n' for k, v in items[written:])
+
+                os.replace(outboxPath + '.tmp', outboxPath)
+
+    if written:
+        print(f'drained: {written} logs from {outboxPath}')
+
+    return written
+
+
+def drainOutboxInBackground():
+    """
+    With WRITE_THROUGH, try to drain the outbox in a daemon thread (Logger / LogViewer start).
+    """
+    if not WRITE_THROUGH or not os.path.exists(getOutboxPath()):
+        return
+
+    def drain():
+        try:
+            drainOutbox()
+        except (sqlite3.Error, OSError) as e:
+            print(f'database unreachable: {e}, outbox kept')
+
+    threading.Thread(target=drain, name='logOutbox', daemon=True).start()
+
+
+def getOutboxPath():
+    """
+    :return: Outbox of this writer: LOGS_REPO/.outbox/<writer>.jsonl
+    :rtype: str
+    """
+    return os.path.join(LOGS_REPO, OUTBOX_FOLDER, f'{journal.getWriter()}.jsonl')
+
+
+def writeLogsToDb(records):
+    """
+    Write logs to the logs table of SQL_DB in one transaction (see sqlLib.writeLines).
+
+    Logs the table cannot hold (missing required field) are printed and skipped, like init_db does.
+
+    :param records: (uuid, data) pairs, data None for a delete.
+    :type records: list[tuple[str, dict or None]]
+    """
+    if not os.path.exists(SQL_DB):
+        raise FileNotFoundError(f'database not found: {SQL_DB}')
+
+    sqlInfo = getRelatedSQLInfo(SQL_DB, 'logs')
+    rows = []
+    for logUuid, data in records:
+        if data is None:
+            continue
+
+        try:
+            rows.append(convertRecord(sqlInfo, logUuid, data))
+        except (ValueError, TypeError) as e:
+            print(f'not written to database: {logUuid} -> {e}')
+
+    writeLines(SQL_DB, 'logs', rows, [k for k, v in records if v is None], DB_TIMEOUT)
+
+
+def loadLogsIndex():
+    """
+    Load the log index from LOGS_INDEX_FILE.
+
+    :return: uuid -> {'mtime': ns, 'size': bytes, 'data': parsed log}, empty if missing, unreadable or outdated.
+    :rtype: dict
+    """
+    if not os.path.exists(LOGS_INDEX_FILE):
+        return {}
+
+    try:
+        with open(LOGS_INDEX_FILE, 'r', encoding='utf-8') as f:
+            content = json.load(f)
+
+    except (OSError, ValueError) as e:
+        print(f'ignored index: {LOGS_INDEX_FILE} -> {e}')
+        return {}
+
+    if content.get('version') != INDEX_VERSION:
+        return {}
+
+    return content.get('logs', {})
+
+
+def refreshLogsIndex(cancelled=None):
+    """
+    Bring the log index up to date with LOGS_REPO and return it.
+
+    Only files whose mtime or size differ from the index are parsed again, in parallel once there
+    are PARALLEL_LOAD_THRESHOLD of them (LOAD_MODE, LOAD_WORKERS); files gone from LOGS_REPO are dropped.
+    LOGS_INDEX_FILE is rewritten only when something changed.
+
+    :param cancelled: Checked while scanning and every LOAD_CHUNK files parsed: once it returns True,
+        the pass stops, the logs parsed so far stay in the index for the next pass.
+    :type cancelled: callable or None
+
+    :return: uuid -> {'mtime': ns, 'size': bytes, 'data': parsed log}, None if cancelled.
+    :rtype: dict or None
+    """
+    with _INDEX_LOCK:
+        if not _LOGS_INDEX:
+            _LOGS_INDEX.update(loadLogsIndex())
+
+        if not os.path.exists(LOGS_REPO):
+            _LOGS_INDEX.clear()
+            return _LOGS_INDEX
+
+        found = set()
+        toLoad = []  # (uuid, path, stat) of new or modified files
+        with os.scandir(LOGS_REPO) as entries:
+            for i, entry in enumerate(entries):
+                if cancelled and not i % LOAD_CHUNK and cancelled():
+                    return None
+
+                uuidValue, extension = os.path.splitext(entry.name)
+                if extension != '.json' or not re.match(UUID_PATTERN, uuidValue) or not entry.is_file():
+                    continue
+
+                found.add(uuidValue)
+                stat = entry.stat()
+                cached = _LOGS_INDEX.get(uuidValue)
+                if cached and cached['mtime'] == stat.st_mtime_ns and cached['size'] == stat.st_size:
+                    continue
+
+                toLoad.append((uuidValue, entry.path, stat))
+
+        changed = False
+        chunk = LOAD_CHUNK if cancelled else max(len(toLoad), 1)
+        for i in range(0, len(toLoad), chunk):
+            if cancelled and cancelled():
+                return None
+
+            paths = [x[1] for x in toLoad[i:i + chunk]]
+            if len(paths) >= PARALLEL_LOAD_THRESHOLD:
+                contents = loadJsonFiles(paths, LOAD_WORKERS, LOAD_MODE)  # first start or index rebuild
+            else:
+                contents = [readJsonFile(path) for path in paths]
+
+            for (uuidValue, _, stat), data in zip(toLoad[i:i + chunk], contents):
+                if data is None:
+                    continue
+
+                _LOGS_INDEX[uuidValue] = {'mtime': stat.st_mtime_ns, 'size': stat.st_size, 'data': data}
+                changed = True
+
+        for uuidValue in set(_LOGS_INDEX) - found:
+            del _LOGS_INDEX[uuidValue]
+            changed = True
+
+        if changed:
+            try:
+                writeJsonAtomic(LOGS_INDEX_FILE, {'version': INDEX_VERSION, 'logs': _LOGS_INDEX})
+            except OSError as e:
+                print(f'fail to write index: {LOGS_INDEX_FILE} -> {e}')
+
+        return _LOGS_INDEX
+
+
+def cacheLogFile(logUuid, filePath, data):
+    """
+    Put a log file this process just wrote in the log index while the watcher keeps it current
+    (see startWatching): its event only arrives up to POLL_INTERVAL + DEBOUNCE later.
+
+    :param logUuid: The UUID of the log.
+    :type logUuid: str
+    :param filePath: File of the log.
+    :type filePath: str
+    :param data: Content written to the file.
+    :type data: dict
+    """
+    if not _WATCH_STATE['synced']:
+        return
+
+    stat = os.stat(filePath)
+    with _INDEX_LOCK:
+        _LOGS_INDEX[logUuid] = {'mtime': stat.st_mtime_ns, 'size': stat.st_size, 'data': data}
+
+
+def applyLogEvent(kind, name):
+    """
+    Update the log index with one watcher event of LOGS_REPO.
+
+    :param kind: One of watchLib.EVENT_KINDS.
+    :type kind: str
+    :param name: File name, None for 'rescan'.
+    :type name: str or None
+    """
+    if kind == 'rescan':
+        refreshLogsIndex()
+        return
+
+    uuidValue, extension = os.path.splitext(name)
+    if extension != '.json' or not re.match(UUID_PATTERN, uuidValue):
+        return
+
+    with _INDEX_LOCK:
+        filePath = os.path.join(LOGS_REPO, name)
+        if kind == 'deleted' or not os.path.exists(filePath):
+            _LOGS_INDEX.pop(uuidValue, None)
+            return
+
+        stat = os.stat(filePath)
+        cached = _LOGS_INDEX.get(uuidValue)
+        if cached and cached['mtime'] == stat.st_mtime_ns and cached['size'] == stat.st_size:
+            return  # written by this process, already indexed (see cacheLogFile)
+
+        data = readJsonFile(filePath)
+        if data is not None:
+            _LOGS_INDEX[uuidValue] = {'mtime': stat.st_mtime_ns, 'size': stat.st_size, 'data': data}
+
+
+def onWatchEvents(callback, events):
+    """
+    Apply watcher events to the in-memory caches, then hand them to callback.
+
+    :param callback: Called with the events once the caches are updated (LogViewer), or None.
+    :type callback: callable or None
+    :param events: (kind, folder, name) from watchLib.FolderWatcher.
+    :type events: list[tuple]
+    """
+    for kind, folder, name in events:
+        if folder == os.path.abspath(LOGS_REPO) and LOG_STORAGE == 'files':
+            applyLogEvent(kind, name)
+
+        elif folder == os.path.abspath(MACHINE_FOLDER) and name:
+            getMachineRecord(os.path.splitext(name)[0])  # reloads or forgets the cached record
+
+    if callback:
+        callback(events)
+
+
+def startWatching(callback=None, mode=None):
+    """
+    Watch LOGS_REPO (or the journal), the machines and the employs folders, so the log index and the
+    machine records follow the changes without rescanning the folders.
+
+    Starting takes the baseline of the folders (scan in poll mode): call it outside the GUI thread.
+    The log index is synced by the next getLogsData, one full pass after the baseline, then kept current by the events.
+
+    :param callback: Called from the watcher thread with the events once the caches are updated.
+    :type callback: callable or None
+    :param mode: One of watchLib.WATCH_MODES, default WATCH_MODE.
+    :type mode: str or None
+
+    :return: The running watcher.
+    :rtype: FolderWatcher
+    """
+    with _WATCH_LOCK:
+        if _WATCH_STATE['watcher']:
+            return _WATCH_STATE['watcher']
+
+        folders = [journal.JOURNAL_REPO if LOG_STORAGE == 'journal' else LOGS_REPO, MACHINE_FOLDER, EMPLOYS_REPO]
+        watcher = FolderWatcher(folders, partial(onWatchEvents, callback), mode or WATCH_MODE)
+        watcher.start()
+
+        _WATCH_STATE['watcher'] = watcher
+        return watcher
+
+
+def stopWatching():
+    """
+    Stop the watcher and save the log index it kept up to date.
+    """
+    with _WATCH_LOCK:
+        watcher = _WATCH_STATE['watcher']
+        if not watcher:
+            return
+
+        watcher.stop()
+        _WATCH_STATE.update(watcher=None, synced=False)
+
+    if LOG_STORAGE == 'files':
+        with _INDEX_LOCK:
+            try:
+                writeJsonAtomic(LOGS_INDEX_FILE, {'version': INDEX_VERSION, 'logs': _LOGS_INDEX})
+            except OSError as e:
+                print(f'fail to write index: {LOGS_INDEX_FILE} -> {e}')
+
+
 def getAllData():
     """
     Retrieve and combine data from all valid log files and their associated machine files.
 
-    Iterates over files in LOGS_REPO with filenames matching UUID_PATTERN, loads each file’s JSON content,
-    then loads the corresponding machine JSON from MACHINE_REPO using the 'machineName' field.
+    Log contents come from the log index (see refreshLogsIndex), so only new or modified files
+    of LOGS_REPO are read; the corresponding machine data comes from getMachineRecord using the 'machineName' field.
 
     :return: A list of dicts, each containing:
              - 'uuid': the file’s UUID
@@ -269,36 +1232,186 @@ def getAllData():
              - all fields from the machine JSON
     :rtype: list[dict]
     """
-    data = []
-    for item in os.listdir(LOGS_REPO):
-        uuidValue = os.path.splitext(item)[0]
-        if not re.match(UUID_PATTERN, uuidValue):
-            continue
+    return list(getLogSnapshot().getRows())
 
-        filePath = os.path.join(LOGS_REPO, item)
-        info = {'uuid': uuidValue, 'file': filePath}
-        with open(filePath, 'r', encoding='utf-8') as f:
-            info.update(json.load(f))
 
-        info['date'] = info['timeStamp'].split('__')[0]
+def buildRow(logUuid, logData, machines):
+    """
+    Combine a log with its machine data, as listed by getAllData.
 
-        machineName = info.get('machineName', None)
-        machineFile = os.path.join(MACHINE_REPO, f'{machineName}.json')
-        if os.path.exists(machineFile):
-            with open(machineFile, 'r', encoding='utf-8') as f:
-                info['machineData'] = json.load(f)
+    :param logUuid: The UUID of the log.
+    :type logUuid: str
+    :param logData: Content of the log.
+    :type logData: dict
+    :param machines: machineName -> machine record (see refreshValueIndex).
+    :type machines: dict
+
+    :return: uuid, file, log fields, date and machineData (if the machine exists).
+    :rtype: dict
+    """
+    filePath = journal.JOURNAL_REPO if LOG_STORAGE == 'journal' else os.path.join(LOGS_REPO, f'{logUuid}.json')
+    info = {'uuid': logUuid, 'file': filePath}
+    info.update(logData)
+
+    info['date'] = info['timeStamp'].split('__')[0]
+
+    machineName = info.get('machineName', None)
+    if machines.get(machineName) is not None:
+        info['machineData'] = machines[machineName]
+
+    return info
+
+
+def getTableHeaders(logs):
+    """
+    :param logs: uuid -> content of every log (see getLogsData).
+    :type logs: dict[str, dict]
+
+    :return: Columns of the rows built by buildRow, EXCLUDED_KEYS aside, in order of appearance.
+    :rtype: list[str]
+    """
+    keys = dict.fromkeys(['uuid'])
+    for logData in logs.values():
+        keys.update(dict.fromkeys(logData))
+
+    keys['date'] = None
+    return [k for k in keys if k not in EXCLUDED_KEYS]
+
+
+def getLogSnapshot(cancelled=None):
+    """
+    Refresh the logs and the value index once and return the matching snapshot.
+
+    The previous snapshot is returned as is when no log nor machine changed since it was built,
+    so consumers can compare LogSnapshot.version to skip their own work.
+
+    :param cancelled: Stops the refresh of the logs once it returns True, see refreshLogsIndex.
+    :type cancelled: callable or None
+
+    :return: Current snapshot, None if cancelled.
+    :rtype: LogSnapshot or None
+    """
+    logs = getLogsData(cancelled)
+    if logs is None:
+        return None
+
+    with _INDEX_LOCK:
+        machines = refreshValueIndex(logs)
+        snapshot = _INDEX_STATE['snapshot']
+        if snapshot is None or snapshot.version != _INDEX_STATE['version']:
+            snapshot = LogSnapshot(_INDEX_STATE['version'], dict(logs), machines, getCompletionCounts())
+            _INDEX_STATE['snapshot'] = snapshot
+
+        return snapshot
+
+
+def getLogsData(cancelled=None):
+    """
+    The first full refresh of the log index after startWatching marks the index as synced:
+    the watcher events keep it current from then on, LOGS_REPO is not scanned again.
+
+    :param cancelled: Stops the refresh of the log index once it returns True, see refreshLogsIndex.
+    :type cancelled: callable or None
+
+    :return: uuid -> content of every log, from the journal or the log index depending on LOG_STORAGE,
+        plus the logs queued by saveData. None if cancelled.
+    :rtype: dict[str, dict] or None
+    """
+    recoverPendingLogs()
+    if LOG_STORAGE == 'journal':
+        logs = journal.getLogs()
+        return {**logs, **_PENDING_LOGS} if _PENDING_LOGS else logs
+
+    with _INDEX_LOCK:
+        if _WATCH_STATE['synced']:
+            logsIndex = _LOGS_INDEX
+        else:
+            watcher = _WATCH_STATE['watcher']
+            logsIndex = refreshLogsIndex(cancelled)
+            if logsIndex is None:
+                return None
+
+            if watcher and watcher is _WATCH_STATE['watcher']:
+                _WATCH_STATE['synced'] = True  # full pass done after the baseline of the watcher
+
+        logs = {uuidValue: cached['data'] for uuidValue, cached in logsIndex.items()}
+        logs.update(_PENDING_LOGS)
+        return logs
+
+
+def refreshValueIndex(logs=None):
+    """
+    Bring the value index and the completion counts up to date with the logs and their machines.
+
+    Only logs whose content changed since the last call are indexed again (see indexLog).
+
+    :param logs: uuid -> content of every log, default getLogsData().
+    :type logs: dict[str, dict] or None
+
+    :return: machineName -> machine record (None if the machine file is missing).
+    :rtype: dict[str, dict or None]
+    """
+    if logs is None:
+        logs = getLogsData()
+
+    with _INDEX_LOCK:
+        for uuidValue, logData in logs.items():
+            indexLog(uuidValue, logData)
+
+        for uuidValue in set(_INDEXED_LOGS) - set(logs):
+            unIndexLog(uuidValue)
+
+        machines = {machineName: getMachineRecord(machineName) for machineName in _MACHINE_LOGS}
+        records = {k: v for k, v in machines.items() if v is not None}
+        if records.keys() != _MACHINE_RECORDS.keys() or any(_MACHINE_RECORDS[k] is not v for k, v in records.items()):
+            _INDEX_STATE['version'] += 1
+
+        _MACHINE_RECORDS.clear()
+        _MACHINE_RECORDS.update(records)
+
+        _MACHINE_VALUES.clear()
+        for machineName, record in _MACHINE_RECORDS.items():
+            for value in record.values():
+                if isHashable(value):
+                    _MACHINE_VALUES.setdefault(value, set()).add(machineName)
+
+        return machines
+
+
+def migrateLogsToJournal(removeFiles=False):
+    """
+    Copy the per-file logs of LOGS_REPO into the journal, logs already in the journal are skipped.
+
+    :param removeFiles: Delete each log file once its batch is written to the journal.
+    :type removeFiles: bool
+
+    :return: Number of logs copied.
+    :rtype: int
+    """
+    existing = journal.getLogs()
+    toCopy = [(uuidValue, cached['data']) for uuidValue, cached in refreshLogsIndex().items() if uuidValue not in existing]
+
+    for i in range(0, len(toCopy), MIGRATION_BATCH):
+        batch = toCopy[i:i + MIGRATION_BATCH]
+        journal.appendLogs(batch)
 
-        data.append(info)
+        if removeFiles:
+            for uuidValue, _ in batch:
+                os.remove(os.path.join(LOGS_REPO, f'{uuidValue}.json'))
 
-    return data
+    if removeFiles:
+        refreshLogsIndex()
+
+    print(f'migrated: {len(toCopy)} logs to {journal.JOURNAL_REPO}')
+    return len(toCopy)
 
 
 def getCompleterData(excluded=None):
     """
     Generate completion data for specified log fields.
 
-    Iterates over all log entries, filters fields by LOG_FILTERS,
-    excludes any values in the `excluded` list, and returns unique values.
+    Values come from the completion counts kept by the value index (see getCompletionCounts),
+    without the values in the `excluded` list.
 
     :param excluded: List of values to exclude from the results.
     :type excluded: list or None
@@ -306,60 +1419,190 @@ def getCompleterData(excluded=None):
     :return: Dict mapping each filter key to a list of unique values.
     :rtype: dict
     """
-    allData = getAllData()
+    excluded = set(x for x in excluded or [] if isHashable(x))
+    return {k: [x for x in v if x not in excluded] for k, v in getLogSnapshot().counts.items()}
 
-    completer = {}
-    for data in allData:
-        for k, v in data.items():
-            if isinstance(v, dict):
-                for x, y in v.items():
-                    if excluded and y in excluded:
-                        continue
 
-                    completer.setdefault(x, []).append(y)
+def getCompletionCounts():
+    """
+    Number of logs holding each value, per field: log fields (EXCLUDED_KEYS aside) and machine fields.
 
-                continue
+    A machine value counts the logs of the machines holding it.
 
-            if k in EXCLUDED_KEYS:
-                continue
+    :return: field -> {value: number of logs}
+    :rtype: dict[str, dict]
+    """
+    with _INDEX_LOCK:
+        counts = {k: dict(v) for k, v in _COMPLETIONS.items()}
+        for machineName, record in _MACHINE_RECORDS.items():
+            logCount = len(_MACHINE_LOGS.get(machineName, ()))
+            for k, v in record.items():
+                if isHashable(v):
+                    fieldCounts = counts.setdefault(k, {})
+                    fieldCounts[v] = fieldCounts.get(v, 0) + logCount
 
-            if excluded and v in excluded:
-                continue
+        return counts
+
+
+def getCompletionsFromPrefix(prefix, field=None):
+    """
+    :param prefix: Start of the values to find (case insensitive).
+    :type prefix: str
+    :param field: Restrict to one field.
+    :type field: str or None
+
+    :return: (value, field) pairs whose text starts with prefix.
+    :rtype: list[tuple]
+    """
+    prefix = prefix.lower()
+    counts = getCompletionCounts()
+    fields = [field] if field else list(counts)
+    return [(v, k) for k in fields for v in counts.get(k, {}) if str(v).lower().startswith(prefix)]
 
-            completer.setdefault(k, []).append(v)
 
-    return {k: list(set(v)) for k, v in completer.items()}
+def getFilteredUuids(filters, matchAll=False):
+    """
+    Resolve filter values to log uuids through the value index (filled by getAllData).
+
+    A value matches a log if one of its fields or one of the fields of its machine holds it.
 
+    :param filters: Values to look for.
+    :type filters: list
+    :param matchAll: Keep the logs matching every value instead of any of them.
+    :type matchAll: bool
 
-def getTableWidgetData(filters=None):
+    :return: uuids of the matching logs.
+    :rtype: set[str]
+    """
+    with _INDEX_LOCK:
+        matches = []
+        for value in filters:
+            uuids = _VALUE_INDEX.get(value, set()) if isHashable(value) else set()
+            machineNames = _MACHINE_VALUES.get(value, ()) if isHashable(value) else ()
+            if machineNames:
+                uuids = uuids.union(*[_MACHINE_LOGS.get(x, set()) for x in machineNames])
+
+            matches.append(uuids)
+
+        if not matches:
+            return set()
+
+        if matchAll:
+            return set.intersection(*sorted(matches, key=len))
+
+        return set().union(*matches)
+
+
+def getTableWidgetData(filters=None, matchAll=False):
     """
     Retrieve table data from logs, optionally filtered by specified values.
 
     :param filters: List of values to filter entries. If None or empty, returns all data.
     :type filters: list or None
+    :param matchAll: Keep the logs matching every filter instead of any of them.
+    :type matchAll: bool
 
-    :return: List of data dicts matching provided filters or all data if no filters.
+    :return: List of data dicts matching provided filters or all data if no filters, each log once.
     :rtype: list[dict]
     """
     allData = getAllData()
     if not filters:
         return allData
 
-    data = []
-    for info in allData:
-        for k, v in info.items():
-            if not isinstance(v, dict):
-                if v not in filters:
-                    continue
+    uuids = getFilteredUuids(filters, matchAll)
+    return [info for info in allData if info['uuid'] in uuids]
 
-                data.append(info)
-                continue
 
-            for x, y in v.items():
-                if y not in filters:
-                    continue
+def indexLog(logUuid, logData):
+    """
+    Add a log to the value index, replacing its previous entry if logData is a new object.
 
-                data.append(info)
-                continue
+    :param logUuid: The UUID of the log.
+    :type logUuid: str
+    :param logData: Content of the log (as held by the log index or the journal).
+    :type logData: dict
+    """
+    with _INDEX_LOCK:
+        indexed = _INDEXED_LOGS.get(logUuid)
+        if indexed and indexed[0] is logData:
+            return
+
+        if indexed:
+            unIndexLog(logUuid)
+
+        _INDEX_STATE['version'] += 1
+        pairs = [('uuid', logUuid)]
+        pairs += [(k, v) for k, v in logData.items() if k not in EXCLUDED_KEYS and isHashable(v)]
+        if isinstance(logData.get('timeStamp'), str):
+            pairs.append(('date', logData['timeStamp'].split('__')[0]))
+
+        for field, value in pairs:
+            _VALUE_INDEX.setdefault(value, set()).add(logUuid)
+            fieldCounts = _COMPLETIONS.setdefault(field, {})
+            fieldCounts[value] = fieldCounts.get(value, 0) + 1
+
+        machineName = logData.get('machineName')
+        if machineName:
+            _MACHINE_LOGS.setdefault(machineName, set()).add(logUuid)
+
+        _INDEXED_LOGS[logUuid] = (logData, tuple(pairs))
+
+
+def isCompletionValue(value):
+    """
+    :param value: Text typed in the filter field.
+    :type value: any
+
+    :return: True if a log or the machine of a log holds this value (O(1), no refresh).
+    :rtype: bool
+    """
+    return isHashable(value) and (value in _VALUE_INDEX or value in _MACHINE_VALUES)
 
-    return data
+
+def isHashable(value):
+    """
+    :param value: Any log or machine value.
+    :type value: any
+
+    :return: True if value can be a key of the value index (lists such as 'modified' cannot).
+    :rtype: bool
+    """
+    try:
+        hash(value)
+        return True
+
+    except TypeError:
+        return False
+
+
+def unIndexLog(logUuid):
+    """
+    Remove a log from the value index.
+
+    :param logUuid: The UUID of the log.
+    :type logUuid: str
+    """
+    with _INDEX_LOCK:
+        _INDEX_STATE['version'] += 1
+        logData, pairs = _INDEXED_LOGS.pop(logUuid)
+        for field, value in pairs:
+            uuids = _VALUE_INDEX.get(value)
+            if uuids is not None:
+                uuids.discard(logUuid)
+                if not uuids:
+                    del _VALUE_INDEX[value]
+
+            fieldCounts = _COMPLETIONS.get(field, {})
+            if value in fieldCounts:
+                fieldCounts[value] -= 1
+                if not fieldCounts[value]:
+                    del fieldCounts[value]
+
+        machineName = logData.get('machineName')
+        if machineName in _MACHINE_LOGS:
+            _MACHINE_LOGS[machineName].discard(logUuid)
+            if not _MACHINE_LOGS[machineName]:
+                del _MACHINE_LOGS[machineName]
+
+
+atexit.register(flushLogs)
@@ -0,0 +1,382 @@
+"""
+===============================================================================
+fileName: machineMonitor.logger.journal
+scripter: angiu
+creation date: 19/10/2026
+description: append-only storage of the logs (MACHINE_MONITOR_LOG_STORAGE=journal)
+    - every writer (host + user) appends JSON lines to its own segments: <writer>__<seq>.jsonl
+    - a line is {'uuid', 'ts', 'op': 'put' | 'del', 'data'}, the record with the highest ts wins
+    - ts is the writer clock in ns, raised above the last ts of the log so a late clock can't lose an edit
+    - segments are read sequentially, only the new bytes on the next refresh (offset index)
+    - sealed segments are rewritten without their dead records by compact (background thread)
+===============================================================================
+"""
+# ==== native ==== #
+import os
+import json
+import time
+import socket
+import getpass
+import threading
+
+# ==== third ==== #
+
+# ==== local ===== #
+from machineMonitor.library.fileLib import syncFolder
+from machineMonitor.library.fileLib import createLockFile
+from machineMonitor.library.fileLib import breakStaleLock
+from machineMonitor.library.fileLib import releaseLockFile
+from machineMonitor.library.infoLib import getUUID
+
+# ==== global ==== #
+BASE_FOLDER = os.sep.join(__file__.split(os.sep)[:-2])
+JOURNAL_REPO = os.path.join(BASE_FOLDER, 'data', 'logs', '.journal')
+SEGMENT_EXTENSION = '.jsonl'
+SEGMENT_SIZE = 8 * 1024 * 1024  # bytes after which a writer starts a new segment
+COMPACTED_WRITER = 'compacted'
+COMPACT_RATIO = 0.3  # dead records / records of the sealed segments from which compaction runs
+COMPACT_LOCK_AGE = 600  # seconds after which a compaction lock is considered abandoned, in the clock of the file server
+_OFFSETS = {}  # uuid -> (ts, segment name, offset, length) of the winning record, deletes included
+_LOGS = {}  # uuid -> data of the living logs
+_SEGMENTS = {}  # segment name -> bytes already read
+_RECORDS = {}  # segment name -> records read, to estimate the dead ones
+_LOCK = threading.RLock()
+_COMPACTION = {'thread': None}
+
+
+def appendLogs(records, fsync=False):
+    """
+    Append records to the segment of this writer in one write.
+
+    The ts of a record is above the last ts read for its log, so the order of the edits of a log
+    does not depend on the clocks of the writers (logger.core.lockLog serializes the writers).
+
+    :param records: (uuid, data) pairs, data None for a delete (tombstone).
+    :type records: list[tuple[str, dict or None]]
+    :param fsync: Flush the segment to disk before returning (group commit of logger.core.flushLogs).
+    :type fsync: bool
+    """
+    if not os.path.exists(JOURNAL_REPO):
+        os.makedirs(JOURNAL_REPO)
+        print(f'created: {JOURNAL_REPO}')
+
+    with _LOCK:
+        refreshJournal()
+        now = time.time_ns()
+        lastTs = {}  # uuid -> ts of its last record, from the journal then from this batch
+        lines = []
+        for i, (uuidValue, data) in enumerate(records):
+            last = lastTs.get(uuidValue, _OFFSETS[uuidValue][0] if uuidValue in _OFFSETS else -1)
+            lastTs[uuidValue] = max(now + i, last + 1)  # a writer whose clock is behind still comes after
+            record = {'uuid': uuidValue, 'ts': lastTs[uuidValue], 'op': 'del' if data is None else 'put'}
+            if data is not None:
+                record['data'] = data
+
+            lines.append(json.dumps(record) + '\n')
+
+        segmentPath = getWriterSegment()
+        fd = os.open(segmentPath, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o666)
+        try:
+            os.write(fd, ''.join(lines).encode('utf-8'))
+            if fsync:
+                os.fsync(fd)
+
+        finally:
+            os.close(fd)
+
+        if fsync:
+            syncFolder(JOURNAL_REPO)  # the segment may be new
+
+    refreshJournal()
+    if needsCompaction():
+        compactInBackground()
+
+
+def compact():
+    """
+    Rewrite the sealed segments (every segment but the last one of each writer) into one
+    compacted segment holding only their winning records, then remove them.
+
+    Another process reading meanwhile sees the records twice at most, which the ts order absorbs.
+    A lock file keeps two processes from compacting together, see fileLib.createLockFile.
+
+    :return: Number of dead records dropped, None if another compaction holds the lock.
+    :rtype: int or None
+    """
+    lockPath = os.path.join(JOURNAL_REPO, '.compact.lock')
+    token = f'{getWriter()}:{os.getpid()}:{getUUID()}'
+    try:
+        if not createLockFile(lockPath, token):
+            if not breakStaleLock(lockPath, COMPACT_LOCK_AGE) or not createLockFile(lockPath, token):
+                return None
+
+    except FileNotFoundError:
+        return None  # no journal
+
+    try:
+        with _LOCK:
+            refreshJournal()
+            sealed = getSealedSegments()
+            if not sealed:
+                return 0
+
+            kept = []  # (ts, raw line) of the winning records found in the sealed segments
+            read = 0
+            for segment in sealed:
+                with open(os.path.join(JOURNAL_REPO, segment), 'rb') as f:
+                    offset = 0
+                    for line in f:
+                        read += 1
+                        try:
+                            record = json.loads(line)
+                        except ValueError:
+                            offset += len(line)
+                            continue
+
+                        if _OFFSETS.get(record['uuid']) == (record['ts'], segment, offset, len(line)):
+                            kept.append((record['ts'], line))
+
+                        offset += len(line)
+
+            kept.sort(key=lambda x: x[0])
+            compactedName = f'{COMPACTED_WRITER}__{time.time_ns()}{SEGMENT_EXTENSION}'
+            tempPath = os.path.join(JOURNAL_REPO, f'.{compactedName}.tmp')
+            with open(tempPath, 'wb') as f:
+                f.writelines(line for _, line in kept)
+                f.flush()
+                os.fsync(f.fileno())
+
+            os.replace(tempPath, os.path.join(JOURNAL_REPO, compactedName))
+            for segment in sealed:
+                os.remove(os.path.join(JOURNAL_REPO, segment))
+
+            resetJournal()
+            refreshJournal()
+
+    finally:
+        releaseLockFile(lockPath, token)
+
+    print(f'compacted: {len(sealed)} segments, dropped {read - len(kept)} dead records')
+    return read - len(kept)
+
+
+def compactInBackground():
+    """
+    Run compact in a daemon thread unless one is already running.
+    """
+    with _LOCK:
+        running = _COMPACTION['thread']
+        if running and running.is_alive():
+            return
+
+        _COMPACTION['thread'] = threading.Thread(target=compact, name='logJournalCompaction', daemon=True)
+        _COMPACTION['thread'].start()
+
+
+def deleteLog(logUuid):
+    """
+    Append a tombstone for the given log.
+
+    :param logUuid: The UUID of the log to delete.
+    :type logUuid: str
+
+    :return: True if the log existed.
+    :rtype: bool
+    """
+    if getLog(logUuid) is None:
+        return False
+
+    appendLogs([(logUuid, None)])
+    return True
+
+
+def getLog(logUuid):
+    """
+    :param logUuid: The UUID of the log.
+    :type logUuid: str
+
+    :return: Data of the log, None if unknown or deleted.
+    :rtype: dict or None
+    """
+    return refreshJournal().get(logUuid)
+
+
+def getLogs():
+    """
+    :return: uuid -> data of every living log.
+    :rtype: dict[str, dict]
+    """
+    return refreshJournal()
+
+
+def getLogStates():
+    """
+    :return: uuid -> (ts, length) of the winning record of every living log, tells an edited log apart
+        without reading its data (see data.init_db.publishFromLocal).
+    :rtype: dict[str, tuple[int, int]]
+    """
+    with _LOCK:
+        return {logUuid: (_OFFSETS[logUuid][0], _OFFSETS[logUuid][3]) for logUuid in refreshJournal()}
+
+
+def getSealedSegments():
+    """
+    :return: Segments no writer appends to anymore: all but the last one of each writer, plus compacted ones.
+    :rtype: list[str]
+    """
+    last = {}
+    for segment in _SEGMENTS:
+        writer, seq = splitSegmentName(segment)
+        if writer != COMPACTED_WRITER and seq > last.get(writer, -1):
+            last[writer] = seq
+
+    return sorted(s for s in _SEGMENTS if splitSegmentName(s)[1] != last.get(splitSegmentName(s)[0]))
+
+
+def getWriter():
+    """
+    :return: Name of the writer owning the segments appended by this process.
+    :rtype: str
+    """
+    return f'{socket.gethostname()}_{getpass.getuser()}'  # getlogin needs a terminal, not available to services
+
+
+def getWriterSegment():
+    """
+    :return: Path of the segment this writer appends to, a new one once SEGMENT_SIZE is reached.
+    :rtype: str
+    """
+    writer = getWriter()
+    seqs = [splitSegmentName(entry.name)[1] for entry in os.scandir(JOURNAL_REPO)
+            if entry.name.endswith(SEGMENT_EXTENSION) and splitSegmentName(entry.name)[0] == writer]
+
+    seq = max(seqs, default=0)
+    segmentPath = os.path.join(JOURNAL_REPO, f'{writer}__{seq:06d}{SEGMENT_EXTENSION}')
+    if os.path.exists(segmentPath) and os.path.getsize(segmentPath) >= SEGMENT_SIZE:
+        segmentPath = os.path.join(JOURNAL_REPO, f'{writer}__{seq + 1:06d}{SEGMENT_EXTENSION}')
+
+    return segmentPath
+
+
+def needsCompaction():
+    """
+    :return: True if the sealed segments hold more than COMPACT_RATIO of dead records.
+    :rtype: bool
+    """
+    with _LOCK:
+        sealed = set(getSealedSegments())
+        records = sum(_RECORDS.get(segment, 0) for segment in sealed)
+        if not records:
+            return False
+
+        alive = sum(1 for _, segment, _, _ in _OFFSETS.values() if segment in sealed)
+        return 1 - alive / records > COMPACT_RATIO
+
+
+def readSegment(segment, start):
+    """
+    Apply the complete lines of a segment from start to the offset index.
+
+    :param segment: Segment file name.
+    :type segment: str
+    :param start: Offset to read from (bytes already read).
+    :type start: int
+
+    :return: Offset after the last complete line, None if the segment is gone (compacted by another process).
+    :rtype: int or None
+    """
+    try:
+        with open(os.path.join(JOURNAL_REPO, segment), 'rb') as f:
+            f.seek(start)
+            content = f.read()
+
+    except FileNotFoundError:
+        return None
+
+    offset = start
+    end = content.rfind(b'\n') + 1  # a line still being written is read on the next refresh
+    for line in content[:end].splitlines(keepends=True):
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            print(f'skipped line: {segment}@{offset} -> {e}')
+            offset += len(line)
+            continue
+
+        _RECORDS[segment] = _RECORDS.get(segment, 0) + 1
+        current = _OFFSETS.get(record['uuid'])
+        if not current or record['ts'] >= current[0]:
+            _OFFSETS[record['uuid']] = (record['ts'], segment, offset, len(line))
+            if record['op'] == 'del':
+                _LOGS.pop(record['uuid'], None)
+            else:
+                _LOGS[record['uuid']] = record['data']
+
+        offset += len(line)
+
+    return offset
+
+
+def refreshJournal():
+    """
+    Read the bytes appended to the segments since the last call.
+
+    Everything is read again when a known segment vanished or shrank, or vanishes while being listed
+    or read (compaction by another process).
+
+    :return: uuid -> data of every living log.
+    :rtype: dict[str, dict]
+    """
+    with _LOCK:
+        while True:
+            if not os.path.exists(JOURNAL_REPO):
+                resetJournal()
+                return _LOGS
+
+            try:
+                sizes = {entry.name: entry.stat().st_size for entry in os.scandir(JOURNAL_REPO)
+                         if entry.name.endswith(SEGMENT_EXTENSION) and entry.is_file()}
+            except FileNotFoundError:
+                continue
+
+            if any(sizes.get(segment, -1) < read for segment, read in _SEGMENTS.items()):
+                resetJournal()
+
+            for segment in sorted(sizes, key=lambda s: splitSegmentName(s)[0] != COMPACTED_WRITER):
+                read = _SEGMENTS.get(segment, 0)
+                if sizes[segment] > read:
+                    offset = readSegment(segment, read)
+                    if offset is None:
+                        break
+
+                    _SEGMENTS[segment] = offset
+                else:
+                    _SEGMENTS.setdefault(segment, read)
+
+            else:
+                return _LOGS
+
+            resetJournal()  # a segment was compacted away meanwhile, its records are in the compacted one
+
+
+def resetJournal():
+    """
+    Forget everything read from the segments (next refresh reads them all again).
+    """
+    with _LOCK:
+        _OFFSETS.clear()
+        _LOGS.clear()
+        _SEGMENTS.clear()
+        _RECORDS.clear()
+
+
+def splitSegmentName(segment):
+    """
+    :param segment: Segment file name: <writer>__<seq>.jsonl
+    :type segment: str
+
+    :return: writer, seq
+    :rtype: tuple[str, int]
+    """
+    writer, _, seq = os.path.splitext(segment)[0].rpartition('__')
+    return writer, int(seq) if seq.isdigit() else 0
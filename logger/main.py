@@ -13,8 +13,8 @@ from functools import partial
 
 # ==== third ==== #
 from PyQt5 import QtWidgets
+from PyQt5 import QtCore
 from PyQt5.QtGui import QIcon
-from PyQt5.QtCore import Qt
 
 # ==== local ===== #
 from machineMonitor.library.uiLib import applyStyleSheet
@@ -24,20 +24,31 @@ from machineMonitor.library.uiLib import loadUi
 from machineMonitor.library.uiLib import ensureQtApp
 from machineMonitor.library.uiLib import initializeUi
 from machineMonitor.library.uiLib import STYLE_SHEET
+from machineMonitor.library.completionLib import CompletionEngine
 from machineMonitor.machineManager.core import getMachineData
 from machineMonitor.logger.core import LOG_TYPES
 from machineMonitor.logger.core import getInitInfo
 from machineMonitor.logger.core import ICON_FOLDER
 from machineMonitor.logger.core import NO_MACHINE_CMD
-from machineMonitor.logger.core import EXCLUDED_KEYS
 from machineMonitor.logger.core import saveData
 from machineMonitor.logger.core import clearTempData
-from machineMonitor.logger.core import getCompleterData
-from machineMonitor.logger.core import getTableWidgetData
+from machineMonitor.logger.core import drainOutboxInBackground
+from machineMonitor.logger.core import removeDraft
+from machineMonitor.logger.core import isCompletionValue
+from machineMonitor.logger.core import buildRow
+from machineMonitor.logger.core import getFilteredUuids
+from machineMonitor.logger.core import getLogSnapshot
+from machineMonitor.logger.core import startWatching
+from machineMonitor.logger.core import stopWatching
+from machineMonitor.logger.core import LOGS_REPO
+from machineMonitor.logger.core import LOG_STORAGE
+from machineMonitor.logger.core import EMPLOYS_REPO
 from machineMonitor.logger.core import deleteLogs
 from machineMonitor.logger.core import getDataFromUuid
+from machineMonitor.logger.core import LogConflictError
 
 # ==== global ==== #
+LOAD_BATCH = 2000  # rows sent to the table at once by LogLoader
 
 
 class Logger:
@@ -51,8 +62,10 @@ class Logger:
         self.unfolded = False
         self.fromTemp = None
         self.mode = 'create'
+        self.logVersion = None  # 'version' of the edited log when loaded, see saveData
 
         clearTempData()
+        drainOutboxInBackground()
 
         self.storeWidget()
         self.fillUi()
@@ -87,13 +100,14 @@ class Logger:
                     return
 
             if fromError:
-                os.remove(filePath)
+                removeDraft(filePath)
                 return
 
             self.fromTemp = filePath
 
         else:
             data = getDataFromUuid(self.logUuid)
+            self.logVersion = data.get('version', 0)
 
         self.machineBox.setCurrentText(data.get('machineName', ''))
         self.logBox.setCurrentText(data.get('type'))
@@ -143,7 +157,15 @@ class Logger:
             'comment': self.commentField.toPlainText()
         }
 
-        result = saveData(data, mode='temp' if not machine else 'save', logUuid=None if not machine else self.logUuid)
+        result = saveData(data, mode='temp' if not machine else 'save', logUuid=None if not machine else self.logUuid,
+                          version=self.logVersion if machine else None)
+        if isinstance(result, LogConflictError):
+            choice = confirmDialog(message='this log was modified meanwhile ! do you want to overwrite it ?')
+            if not choice:
+                return
+
+            result = saveData(data, mode='save', logUuid=self.logUuid)
+
         if result:
             choice = confirmDialog(message=f'fail while saving data: {result} ! do you want to backup ?')
             if not choice:
@@ -154,7 +176,7 @@ class Logger:
                 print(f'fail to backup: {result}')
 
         if self.fromTemp:
-            os.remove(self.fromTemp)
+            removeDraft(self.fromTemp)
 
         self.ui.close()
 
@@ -167,8 +189,13 @@ class LogViewer:
         self.uiMenus = self.ui.uiMenus
 
         self.saveButton = False
-        self.completionList = getCompleterData()
+        self.completionEngine = CompletionEngine()
+        self.loader = None
+        self.stoppedLoaders = set()  # cancelled loaders still running, kept alive until they end
+        self.snapshot = None  # logger.core.LogSnapshot shown by the table and the completer
+        self.watchBridge = WatchBridge()
         clearTempData()
+        drainOutboxInBackground()
 
         self.storeWidget()
         self.fillUi()
@@ -184,24 +211,28 @@ class LogViewer:
         self.filterButton = self.ui.filterButton
         self.scorllContainer = self.ui.scorllContainer
         self.scrollLayout = self.ui.scrollLayout
-        self.tableWidget = self.ui.tableWidget
+        self.tableView = self.ui.tableView
+        self.tableModel = self.ui.tableModel
+        self.proxyModel = self.ui.proxyModel
+        self.progressBar = self.ui.progressBar
 
     def fillUi(self):
-        self.fillCompleter()
-        self.fillTable()
+        self.loadData()
 
     def connectWidgets(self):
+        self.ui.finished.connect(self.close)
+        self.watchBridge.changed.connect(self.onFilesChanged)
         self.filterField.textChanged.connect(self.checkEntry)
+        self.filterField.textEdited.connect(self.updateCompleter)
         self.popup.clicked.connect(self.fillFieldFromCompleter)
         self.filterButton.clicked.connect(self.addFilter)
-        self.tableWidget.cellClicked.connect(self.onCellSelected)
+        self.tableView.clicked.connect(self.onCellSelected)
         for name, button in self.uiMenus.get('sideButtons', {}).items():
             button.clicked.connect(partial(self.sideCommand, name))
 
     def getUuiFromTableSelection(self):
-        row = self.tableWidget.currentRow()
-        col = next(i for i in range(self.tableWidget.columnCount()) if self.tableWidget.horizontalHeaderItem(i).text() == 'uuid')
-        return self.tableWidget.item(row, col).text()
+        index = self.proxyModel.mapToSource(self.tableView.currentIndex())
+        return self.tableModel.getUuid(index.row())
 
     def sideCommand(self, action, *args):
         logUuid = self.getUuiFromTableSelection()
@@ -211,7 +242,7 @@ class LogViewer:
                 return
 
             value = deleteLogs(logUuid)
-            if not value:
+            if value:
                 print(f'error deleting: {logUuid} -> {value}')
                 return
 
@@ -228,10 +259,7 @@ class LogViewer:
 
     def checkEntry(self):
         entry = self.filterField.text()
-        if entry not in [x for v in self.completionList.values() for x in v]:
-            value = False
-        else:
-            value = True
+        value = isCompletionValue(entry) and entry not in self.uiMenus.get('excluded', [])
 
         self.filterButton.setEnabled(value)
 
@@ -265,7 +293,7 @@ class LogViewer:
         self.uiMenus.setdefault('excluded', []).append(entry)
         self.uiMenus.setdefault('filter', {})[entry] = layout
 
-        self.fillTable()
+        self.applyFilters()
 
     def removeFilter(self, name, *args):
         excluded = self.uiMenus.get('excluded', [])
@@ -283,42 +311,156 @@ class LogViewer:
         if not filters:
             self.scorllContainer.setVisible(False)
 
-        self.fillTable()
+        self.applyFilters()
+
+    def loadData(self, *args):
+        # logs are read by LogLoader, the window stays responsive and fills batch by batch
+        self.stopLoading()
+
+        # the loader also starts the watcher, away from the GUI thread (see logger.core.startWatching)
+        loader = LogLoader(version=self.snapshot.version if self.snapshot else None, watch=self.watchBridge.changed.emit)
+        loader.snapshotReady.connect(partial(self.onSnapshot, loader))
+        loader.batchReady.connect(partial(self.onBatchReady, loader))
+        loader.progress.connect(partial(self.onProgress, loader))
+        loader.finished.connect(partial(self.onLoaded, loader))
+        self.loader = loader
+
+        self.progressBar.setRange(0, 0)  # busy until the number of logs is known
+        self.progressBar.setVisible(True)
+        loader.start()
+
+    def stopLoading(self, *args):
+        # no wait: the loader checks its cancellation while scanning, ends by itself and its signals are ignored
+        if self.loader and self.loader.isRunning():
+            loader = self.loader
+            loader.cancel()
+            self.stoppedLoaders.add(loader)
+            loader.finished.connect(partial(self.stoppedLoaders.discard, loader))
+
+        self.loader = None
+
+    def close(self, *args):
+        self.stopLoading()
+        for loader in list(self.stoppedLoaders):
+            loader.wait()  # cancelled: returns within one LOAD_CHUNK of files
+
+        stopWatching()  # once no loader can start it anymore
+
+    def onSnapshot(self, loader, snapshot):
+        if loader is not self.loader:
+            return
+
+        self.snapshot = snapshot
+        self.fillCompleter()
+        self.tableModel.setRows([], snapshot.headers)
+        self.progressBar.setRange(0, len(snapshot))
+        self.applyFilters()
+        self.checkEntry()
+
+    def onBatchReady(self, loader, rows):
+        if loader is not self.loader:
+            return
+
+        self.tableModel.appendRows(rows)
+
+    def onProgress(self, loader, done, total):
+        if loader is not self.loader:
+            return
 
-    def fillTable(self, startup=False, *args):
-        tableData = getTableWidgetData(list(self.uiMenus.get('filter', {}).keys()))
+        self.progressBar.setValue(done)
 
-        headers = list(set([x for info in tableData for x in info.keys() if x not in EXCLUDED_KEYS]))
+    def onLoaded(self, loader):
+        if loader is not self.loader:
+            return
 
-        self.tableWidget.clearContents()
+        self.progressBar.setVisible(False)
 
-        # build header
-        self.tableWidget.setColumnCount(len(headers))
-        self.tableWidget.setHorizontalHeaderLabels(headers)
+    def onFilesChanged(self, events):
+        events = [x for x in events if x[1] != os.path.abspath(EMPLOYS_REPO)]
+        if not events:
+            return
 
-        self.tableWidget.setRowCount(len(tableData))
+        logsFolder = os.path.abspath(LOGS_REPO)
+        loading = self.loader and self.loader.isRunning()
+        if not self.snapshot or loading or LOG_STORAGE != 'files' or any(x[1] != logsFolder or not x[2] for x in events):
+            self.loadData()  # machines, journal, lost events or rows still coming: the loader rebuilds what changed
+            return
 
-        # fill cells
-        for rowIndex, data in enumerate(tableData):
-            for columnIndex, key in enumerate(headers):
-                item = QtWidgets.QTableWidgetItem(str(data[key]))
-                item.setTextAlignment(Qt.AlignCenter)  # Center text horizontally and vertically
-                if key == 'machineName':
-                    toolTip = '\n'.join(f'{k}: {v}' for k, v in data['machineData'].items())
-                elif key == 'date':
-                    toolTip = data['timeStamp']
-                elif key == 'type':
-                    toolTip = data['comment']
-                elif key == 'modified':
-                    toolTip = '\n'.join('modified by: {0} at: {1}'.format(*x) for x in data[key])
-                else:
-                    toolTip = data[key]
+        self.updateRows({os.path.splitext(x[2])[0] for x in events})
 
-                item.setToolTip(toolTip)
+    def updateRows(self, uuids):
+        # the watcher kept the log index current: the snapshot comes without rescanning LOGS_REPO
+        snapshot = getLogSnapshot()
+        if snapshot.version == self.snapshot.version:
+            return
 
-                self.tableWidget.setItem(rowIndex, columnIndex, item)
+        if snapshot.headers != self.snapshot.headers:
+            self.loadData()
+            return
+
+        self.snapshot = snapshot
+        rows = {x: buildRow(x, snapshot.logs[x], snapshot.machines) for x in uuids if x in snapshot.logs}
+        self.tableModel.updateRows(rows, [x for x in uuids if x not in snapshot.logs])
+        self.fillCompleter()
+        self.applyFilters()
+
+    def applyFilters(self, *args):
+        # filters go through the value index, the model keeps every log; new rows are filtered as they come
+        if not self.snapshot:
+            return  # applied by onSnapshot
+
+        filters = list(self.uiMenus.get('filter', {}).keys())
+        self.proxyModel.setUuids(getFilteredUuids(filters) if filters else None)
 
     def fillCompleter(self, *args):
-        self.completionList = getCompleterData(excluded=self.uiMenus.get('excluded', []))
-        self.model.setStringList([])
-        self.model.setStringList([f'{x} [{k}]' for k, v in self.completionList.items() for x in v])
+        counts = self.snapshot.counts if self.snapshot else {}
+        self.completionEngine.update(counts, excluded=self.uiMenus.get('excluded', []))
+        self.updateCompleter(self.filterField.text(), popup=False)
+
+    def updateCompleter(self, text, popup=True):
+        # only the visible candidates go to Qt, the engine does the matching
+        candidates = self.completionEngine.complete(text)
+        self.model.setStringList([f'{x} [{k}]' for x, k, _ in candidates])
+        if popup and candidates:
+            self.completer.complete()
+
+
+class WatchBridge(QtCore.QObject):
+    changed = QtCore.pyqtSignal(object)  # watcher events, emitted from the watcher thread, received in the GUI one
+
+
+class LogLoader(QtCore.QThread):
+    snapshotReady = QtCore.pyqtSignal(object)  # logger.core.LogSnapshot, only if its version differs from the shown one
+    batchReady = QtCore.pyqtSignal(object)  # rows of the snapshot
+    progress = QtCore.pyqtSignal(int, int)  # rows sent, number of logs
+
+    def __init__(self, parent=None, batchSize=LOAD_BATCH, version=None, watch=None):
+        super(LogLoader, self).__init__(parent)
+        self.batchSize = batchSize
+        self.version = version  # version of the snapshot already shown
+        self.watch = watch  # callback of logger.core.startWatching, the watcher is started before the first scan
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    def isCancelled(self):
+        return self.cancelled
+
+    def run(self):
+        if self.watch and not self.cancelled:
+            startWatching(self.watch)  # baseline first, then the snapshot below syncs the log index once
+
+        snapshot = getLogSnapshot(self.isCancelled)
+        if self.cancelled or snapshot is None or snapshot.version == self.version:
+            return
+
+        self.snapshotReady.emit(snapshot)
+
+        rows = snapshot.getRows()
+        for i in range(0, len(rows), self.batchSize):
+            if self.cancelled:
+                return
+
+            self.batchReady.emit(rows[i:i + self.batchSize])
+            self.progress.emit(min(i + self.batchSize, len(rows)), len(rows))
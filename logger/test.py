@@ -0,0 +1,516 @@
+import os
+import json
+import time
+import uuid
+import sqlite3
+import threading
+import importlib
+import multiprocessing
+from datetime import datetime
+from datetime import timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from machineMonitor.logger import core
+from machineMonitor.logger import journal
+from machineMonitor.data import init_db
+from machineMonitor.library import fileLib
+from machineMonitor.library.completionLib import CompletionEngine
+from machineMonitor.library.watchLib import FolderWatcher
+
+WRITERS = 8
+UPDATES = 25
+LOG_UUIDS = ['f4f1a2b3-0000-4000-8000-000000000010', 'f4f1a2b3-0000-4000-8000-000000000011']
+
+
+@pytest.fixture
+def logsRepo(tmp_path, monkeypatch):
+    monkeypatch.setattr(core, 'LOGS_REPO', str(tmp_path))
+    monkeypatch.setattr(core, 'LOGS_INDEX_FILE', str(tmp_path / '.index.json'))
+    monkeypatch.setattr(core, 'LOG_STORAGE', 'files')
+    monkeypatch.setattr(core, 'WRITE_BATCH', 0)
+    monkeypatch.setattr(os, 'getlogin', lambda: 'tester')
+    return tmp_path
+
+
+def createLog(logsRepo):
+    assert core.saveData({'machineName': 'testMachine', 'type': 'info', 'project': 'test', 'comment': ''}) is None
+    return next(os.path.splitext(x)[0] for x in os.listdir(logsRepo) if x.endswith('.json'))
+
+
+def updateLog(logUuid, writer):
+    for i in range(UPDATES):
+        assert core.saveData({'comment': f'{writer}-{i}'}, logUuid=logUuid) is None
+
+
+def readLog(logsRepo, logUuid):
+    with open(logsRepo / f'{logUuid}.json', 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def testConcurrentThreadUpdatesKeepEveryModification(logsRepo):
+    logUuid = createLog(logsRepo)
+    threads = [threading.Thread(target=updateLog, args=(logUuid, i)) for i in range(WRITERS)]
+    for thread in threads:
+        thread.start()
+
+    for thread in threads:
+        thread.join()
+
+    data = readLog(logsRepo, logUuid)
+    assert len(data['modified']) == WRITERS * UPDATES
+    assert data['version'] == WRITERS * UPDATES
+    assert not os.listdir(logsRepo / core.LOCK_FOLDER)
+
+
+@pytest.mark.skipif('fork' not in multiprocessing.get_all_start_methods(), reason='needs fork')
+def testConcurrentProcessUpdatesKeepEveryModification(logsRepo):
+    logUuid = createLog(logsRepo)
+    context = multiprocessing.get_context('fork')
+    processes = [context.Process(target=updateLog, args=(logUuid, i)) for i in range(WRITERS)]
+    for process in processes:
+        process.start()
+
+    for process in processes:
+        process.join()
+
+    assert all(process.exitcode == 0 for process in processes)
+    data = readLog(logsRepo, logUuid)
+    assert len(data['modified']) == WRITERS * UPDATES
+    assert data['version'] == WRITERS * UPDATES
+    assert core.getDataFromUuid(logUuid) == data
+
+
+def testStaleVersionIsRefused(logsRepo):
+    logUuid = createLog(logsRepo)
+    assert core.saveData({'comment': 'first'}, logUuid=logUuid, version=0) is None
+
+    result = core.saveData({'comment': 'second'}, logUuid=logUuid, version=0)
+    assert isinstance(result, core.LogConflictError)
+    assert readLog(logsRepo, logUuid)['comment'] == 'first'
+
+
+def testJournalKeepsEditsOfLateClock(tmp_path, monkeypatch):
+    monkeypatch.setattr(journal, 'JOURNAL_REPO', str(tmp_path / '.journal'))
+    journal.resetJournal()
+    logUuid = 'f4f1a2b3-0000-4000-8000-000000000000'
+
+    monkeypatch.setattr(journal, 'getWriter', lambda: 'hostA_tester')
+    journal.appendLogs([(logUuid, {'comment': 'v1'})])
+
+    late = time.time_ns() - 60 * 10 ** 9  # hostB is one minute behind
+    monkeypatch.setattr(journal, 'time', SimpleNamespace(time_ns=lambda: late, time=time.time))
+    monkeypatch.setattr(journal, 'getWriter', lambda: 'hostB_tester')
+    journal.appendLogs([(logUuid, {'comment': 'v2'})])
+    assert journal.getLog(logUuid) == {'comment': 'v2'}
+
+    assert journal.deleteLog(logUuid)
+    journal.resetJournal()  # read back from the segments only
+    assert journal.getLog(logUuid) is None
+    journal.resetJournal()
+
+
+def testLockAgeIgnoresLocalClockAndOwner(logsRepo, monkeypatch):
+    monkeypatch.setattr(core, 'LOCK_CHECK', 0.0)
+    logUuid = 'f4f1a2b3-0000-4000-8000-000000000001'
+    lockPath = logsRepo / core.LOCK_FOLDER / f'{logUuid}.lock'
+    lockPath.parent.mkdir()
+    lockPath.write_text('otherHost:1:live')
+
+    ahead = time.time() + 2 * 3600  # local clock two hours ahead of the file server
+    monkeypatch.setattr(core, 'time', SimpleNamespace(time=lambda: ahead, monotonic=time.monotonic, sleep=time.sleep))
+    with pytest.raises(TimeoutError):
+        with core.lockLog(logUuid, timeout=0.2):
+            pass
+
+    assert lockPath.read_text() == 'otherHost:1:live'
+
+    old = os.path.getmtime(lockPath) - core.LOCK_AGE - 1
+    os.utime(lockPath, (old, old))  # abandoned for the file server too
+    with core.lockLog(logUuid, timeout=0.2):
+        lockPath.write_text('otherHost:2:taken')  # another owner after ours was broken
+
+    assert lockPath.read_text() == 'otherHost:2:taken'
+    assert os.listdir(lockPath.parent) == [lockPath.name]
+
+
+@pytest.fixture
+def journalRepo(tmp_path, monkeypatch):
+    monkeypatch.setattr(journal, 'JOURNAL_REPO', str(tmp_path / '.journal'))
+    journal.resetJournal()
+    yield tmp_path / '.journal'
+    journal.resetJournal()
+
+
+def testJournalReadsThroughConcurrentCompaction(journalRepo, monkeypatch):
+    for writer, logUuid in [('hostA_tester', LOG_UUIDS[0]), ('hostB_tester', LOG_UUIDS[1])]:
+        monkeypatch.setattr(journal, 'getWriter', lambda: writer)
+        journal.appendLogs([(logUuid, {'comment': writer})])
+
+    journal.resetJournal()  # a reader that has not read the segments yet
+    readSegment = journal.readSegment
+
+    def compactFirst(segment, start):
+        # another process compacts between the listing of the segments and their reading
+        monkeypatch.setattr(journal, 'readSegment', readSegment)
+        segments = sorted(journalRepo.glob('*.jsonl'))
+        content = b''.join(x.read_bytes() for x in segments)
+        (journalRepo / f'{journal.COMPACTED_WRITER}__000001.jsonl').write_bytes(content)
+        for x in segments:
+            x.unlink()
+
+        return readSegment(segment, start)
+
+    monkeypatch.setattr(journal, 'readSegment', compactFirst)
+    assert set(journal.getLogs()) == set(LOG_UUIDS)
+
+
+def testCompactionLockAgeIgnoresLocalClock(journalRepo, monkeypatch):
+    journal.appendLogs([(LOG_UUIDS[0], {'comment': 'v1'})])
+    lockPath = journalRepo / '.compact.lock'
+    lockPath.write_text('otherHost:1:live')
+
+    ahead = time.time() + 2 * 3600  # local clock two hours ahead of the file server
+    monkeypatch.setattr(time, 'time', lambda: ahead)
+    assert journal.compact() is None
+    assert lockPath.read_text() == 'otherHost:1:live'
+
+    old = os.path.getmtime(lockPath) - journal.COMPACT_LOCK_AGE - 1
+    os.utime(lockPath, (old, old))  # abandoned for the file server too
+    assert journal.compact() == 0
+    assert not lockPath.exists()
+
+
+def testWatcherReportsChangeRightAfterStart(tmp_path):
+    received = threading.Event()
+    watcher = FolderWatcher([str(tmp_path)], lambda events: received.set(), mode='poll', interval=0.05)
+    watcher.start()
+    try:
+        (tmp_path / 'log.json').write_text('{}', encoding='utf-8')
+        assert received.wait(2)
+
+    finally:
+        watcher.stop()
+
+
+def testOwnWritesReachWatchedIndex(logsRepo):
+    core.startWatching(mode='poll')
+    try:
+        logUuid = createLog(logsRepo)
+        assert logUuid in core.getLogsData()
+
+        core.saveData({'comment': 'edited'}, logUuid=logUuid)
+        assert core.getLogsData()[logUuid]['comment'] == 'edited'
+
+        assert core.deleteLogs(logUuid) is None
+        assert logUuid not in core.getLogsData()
+
+    finally:
+        core.stopWatching()
+
+
+def testFirstSnapshotSyncsWatchedIndexUnlessCancelled(logsRepo, monkeypatch):
+    logUuid = createLog(logsRepo)
+    monkeypatch.setattr(core, '_LOGS_INDEX', {})  # cold start, no index file
+    if os.path.exists(core.LOGS_INDEX_FILE):
+        os.remove(core.LOGS_INDEX_FILE)
+
+    scans = []
+    refresh = core.refreshLogsIndex
+    monkeypatch.setattr(core, 'refreshLogsIndex', lambda cancelled=None: scans.append(1) or refresh(cancelled))
+
+    core.startWatching(mode='poll')  # baseline only, the index is not scanned here
+    try:
+        assert not scans
+        assert core.getLogSnapshot(lambda: True) is None
+        assert not core._WATCH_STATE['synced']
+
+        assert logUuid in core.getLogSnapshot().logs
+        assert core._WATCH_STATE['synced']
+        core.getLogSnapshot()
+        assert len(scans) == 2  # the cancelled pass and the syncing one, none afterwards
+
+    finally:
+        core.stopWatching()
+
+
+def testLogIndexIsKeptOutOfSharedRepo():
+    assert os.path.dirname(core.LOGS_INDEX_FILE) == core.CACHE_FOLDER
+    assert not os.path.abspath(core.LOGS_INDEX_FILE).startswith(os.path.abspath(core.LOGS_REPO))
+
+
+def testCancelledRefreshStopsWithinOneChunk(logsRepo, monkeypatch):
+    monkeypatch.setattr(core, 'LOAD_CHUNK', 2)
+    monkeypatch.setattr(core, '_LOGS_INDEX', {})
+    for _ in range(5):
+        (logsRepo / f'{uuid.uuid4()}.json').write_text(json.dumps({'comment': ''}), encoding='utf-8')
+
+    checks = []
+    assert core.refreshLogsIndex(lambda: checks.append(1) or len(checks) > 4) is None  # 3 scan checks, 1 chunk parsed
+    assert len(core._LOGS_INDEX) == 2
+    assert not os.path.exists(core.LOGS_INDEX_FILE)
+    assert len(core.refreshLogsIndex()) == 5
+
+
+@pytest.mark.skipif(os.name == 'nt', reason='no unix rights on Windows')
+def testAtomicWriteKeepsProcessUmask(tmp_path, monkeypatch):
+    def failUmask(mask):
+        raise AssertionError('the process umask must not be touched')
+
+    monkeypatch.setattr(os, 'umask', failUmask)
+    importlib.reload(fileLib)  # import time included
+    monkeypatch.undo()
+
+    previous = os.umask(0o027)
+    try:
+        monkeypatch.setattr(os, 'umask', failUmask)
+        fileLib.writeJsonAtomic(str(tmp_path / 'data.json'), {'a': 1})
+
+    finally:
+        monkeypatch.undo()
+        os.umask(previous)
+
+    assert os.stat(tmp_path / 'data.json').st_mode & 0o777 == 0o640
+    assert os.listdir(tmp_path) == ['data.json']
+
+
+@pytest.fixture
+def queuedRepo(logsRepo, monkeypatch):
+    monkeypatch.setattr(core, 'WRITE_BATCH', 100)
+    monkeypatch.setattr(core, '_PENDING_LOGS', {})
+    monkeypatch.setattr(core, '_WRITE_STATE', {'fd': None, 'pid': None, 'timer': None, 'recovered': False,
+                                               'claimed': []})
+    (logsRepo / core.PENDING_FOLDER).mkdir()
+    yield logsRepo
+    core.flushLogs()
+    if core._WRITE_STATE['fd'] is not None:
+        os.close(core._WRITE_STATE['fd'])
+
+
+def writeQueue(pid, logUuid):
+    with open(core.getPendingPath(pid), 'w', encoding='utf-8') as f:
+        f.write(json.dumps({'uuid': logUuid, 'data': {'comment': str(pid)}}) + '\n')
+
+
+def testRecoveryOnlyTakesQueuesOfDeadProcesses(queuedRepo):
+    process = multiprocessing.Process(target=time.sleep, args=(0,))
+    process.start()
+    process.join()
+
+    writeQueue(os.getppid(), 'aaaaaaaa-0000-4000-8000-000000000000')  # alive, still queuing
+    writeQueue(process.pid, 'bbbbbbbb-0000-4000-8000-000000000000')
+    assert core.recoverPendingLogs() == 1
+
+    assert os.listdir(queuedRepo / core.PENDING_FOLDER) == [os.path.basename(core.getPendingPath(os.getppid()))]
+    assert readLog(queuedRepo, 'bbbbbbbb-0000-4000-8000-000000000000') == {'comment': str(process.pid)}
+    assert not (queuedRepo / 'aaaaaaaa-0000-4000-8000-000000000000.json').exists()
+
+
+def testFlushSyncsLogsBeforeEmptyingQueue(queuedRepo, monkeypatch):
+    calls = []
+    writeJsonAtomic = core.writeJsonAtomic
+    ftruncate = os.ftruncate
+    monkeypatch.setattr(core, 'writeJsonAtomic', lambda path, data, fsync=False: (
+        calls.append(('write', fsync)), writeJsonAtomic(path, data, fsync)))
+    monkeypatch.setattr(core, 'syncFolder', lambda folder: calls.append(('folder', folder)))
+    monkeypatch.setattr(os, 'ftruncate', lambda fd, size: (calls.append(('truncate', size)), ftruncate(fd, size)))
+
+    for i in range(3):
+        core.saveData({'machineName': 'testMachine', 'type': 'info', 'project': 'test', 'comment': str(i)})
+
+    assert core.flushLogs() == 3
+    assert calls == [('write', True)] * 3 + [('folder', core.LOGS_REPO), ('truncate', 0)]
+    assert os.path.getsize(core.getPendingPath()) == 0
+
+
+@pytest.fixture
+def valueIndex(monkeypatch):
+    for name in ['_VALUE_INDEX', '_INDEXED_LOGS', '_MACHINE_LOGS', '_MACHINE_VALUES', '_MACHINE_RECORDS', '_COMPLETIONS']:
+        monkeypatch.setattr(core, name, {})
+
+    monkeypatch.setattr(core, '_INDEX_STATE', {'version': 0, 'snapshot': None})
+    machines = {'m1': {'machineName': 'm1', 'site': 'paris'}, 'm2': {'machineName': 'm2', 'site': 'lyon'}}
+    monkeypatch.setattr(core, 'getMachineRecord', machines.get)
+    logs = {
+        LOG_UUIDS[0]: {'machineName': 'm1', 'type': 'info', 'project': 'alpha', 'operator': 'alpha',
+                       'timeStamp': '2026_10_19__10_00_00', 'modified': [['2026_10_19__11_00_00', 'tester']]},
+        LOG_UUIDS[1]: {'machineName': 'm2', 'type': 'error', 'project': 'alpha', 'timeStamp': '2026_10_18__10_00_00'},
+    }
+    monkeypatch.setattr(core, 'getLogsData', lambda cancelled=None: logs)
+    return logs, machines
+
+
+def testFilterListsEachMatchingLogOnce(valueIndex):
+    core.refreshValueIndex()
+    first, second = LOG_UUIDS
+
+    assert core.getFilteredUuids(['alpha']) == {first, second}
+    assert core.getFilteredUuids(['info', 'lyon']) == {first, second}  # log field or machine field, any of them
+    assert core.getFilteredUuids(['alpha', 'paris'], matchAll=True) == {first}
+    assert core.getFilteredUuids(['paris', 'error'], matchAll=True) == set()
+    assert core.getFilteredUuids([['not', 'hashable'], 'unknown']) == set()
+
+    rows = core.getTableWidgetData(['alpha', 'info', 'm1'])  # 'alpha' held twice by the first log
+    assert sorted(row['uuid'] for row in rows) == [first, second]
+    assert [row['uuid'] for row in core.getTableWidgetData(['alpha', '2026_10_18'], matchAll=True)] == [second]
+
+
+def testCompletionCountsFollowLogChanges(valueIndex):
+    logs, machines = valueIndex
+    first, second = LOG_UUIDS
+    core.refreshValueIndex()
+    counts = core.getCompletionCounts()
+    assert counts['project'] == {'alpha': 2}
+    assert counts['site'] == {'paris': 1, 'lyon': 1}  # logs of the machines holding the value
+    assert 'modified' not in counts
+
+    core.refreshValueIndex()  # same log objects: nothing counted twice
+    assert core.getCompletionCounts() == counts
+
+    logs[first] = dict(logs[first], project='beta')
+    logs[second]['project'] = 'ignored'  # same object: indexed content is kept until the log is replaced
+    core.refreshValueIndex()
+    assert core.getCompletionCounts()['project'] == {'alpha': 1, 'beta': 1}
+
+    del logs[second]
+    core.refreshValueIndex()
+    counts = core.getCompletionCounts()
+    assert counts['project'] == {'beta': 1}
+    assert counts['type'] == {'info': 1}
+    assert not core.isCompletionValue('error') and core.isCompletionValue('beta')
+    assert core.getCompletionsFromPrefix('BE') == [('beta', 'project')]
+    assert core.getCompleterData(excluded=['beta'])['project'] == []
+
+
+def testCompletionRanksPrefixThenSubstringMatches():
+    counts = {'project': {'alpha': 5, 'Alpine': 2, 'beta': 9, 'multi\nline': 50}, 'operator': {'al': 1, 'palace': 7}}
+    engine = CompletionEngine(counts)
+    assert len(engine) == 5  # the separator can't be part of a value
+
+    assert engine.complete('AL') == [('alpha', 'project', 5), ('Alpine', 'project', 2), ('al', 'operator', 1),
+                                     ('palace', 'operator', 7)]
+    assert engine.complete('al', k=2) == [('alpha', 'project', 5), ('Alpine', 'project', 2)]
+    assert engine.complete('', k=2) == [('beta', 'project', 9), ('palace', 'operator', 7)]
+    assert engine.getSubstringMatches('lp') == [('alpha', 'project', 5), ('Alpine', 'project', 2)]
+    assert engine.getSubstringMatches('\n') == []
+
+    engine.update(counts, excluded=['alpha'])
+    assert engine.complete('alp') == [('Alpine', 'project', 2)]
+
+
+def testCompletionMatchesFullScan():
+    values = [f'{a}{b}{c}' for a in 'abc' for b in 'xyz' for c in 'ab']
+    counts = {'field': {value: i + 1 for i, value in enumerate(values)}}
+    engine = CompletionEngine(counts)
+
+    for text in ['a', 'ax', 'axa', 'ya', 'z', 'Cz', 'q']:  # prefixes over a large and a small range
+        items = sorted(((v, 'field', c) for v, c in counts['field'].items()), key=lambda x: -x[2])
+        prefixed = [x for x in items if x[0].startswith(text.lower())]
+        contained = [x for x in items if text.lower() in x[0]]
+        assert engine.getPrefixMatches(text, 5) == prefixed[:5]
+        assert engine.getSubstringMatches(text, 5) == contained[:5]
+
+
+def testSnapshotIsSharedUntilLogsOrMachinesChange(valueIndex):
+    logs, machines = valueIndex
+    snapshot = core.getLogSnapshot()
+    rows = snapshot.getRows()
+    assert core.getLogSnapshot() is snapshot
+    assert snapshot.getRows() is rows and len(rows) == len(snapshot) == 2
+    assert rows[0]['machineData'] == machines['m1']
+
+    logs[LOG_UUIDS[0]] = dict(logs[LOG_UUIDS[0]], project='beta')
+    changed = core.getLogSnapshot()
+    assert changed.version > snapshot.version
+    assert changed.counts['project'] == {'alpha': 1, 'beta': 1}
+    assert snapshot.logs[LOG_UUIDS[0]]['project'] == 'alpha'  # earlier snapshots stay as built
+
+    machines['m2'] = dict(machines['m2'], site='nantes')
+    moved = core.getLogSnapshot()
+    assert moved.version > changed.version
+    assert moved.counts['site'] == {'paris': 1, 'nantes': 1}
+    assert core.getLogSnapshot() is moved
+
+
+def testDraftManifestKeepsRecentDraftsOnly(logsRepo, monkeypatch):
+    monkeypatch.setattr(core, '_DRAFTS', {})
+    folder = core.getDraftFolder('temp', 'tester')
+    os.makedirs(folder)
+    now = datetime.now()
+    paths = [os.path.join(folder, f"{(now - timedelta(days=days)).strftime('%Y_%m_%d__%H_%M_%S')}.json")
+             for days in [10, 5, 1, 0]]
+    for path in [paths[2], paths[0], paths[3], paths[1]]:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'comment': os.path.basename(path)}, f)
+
+        core.addDraft(path)
+
+    assert core.saveData({'comment': 'backup'}, mode='backup') is None
+    backupPath = core.getLatestDraft('error')
+    assert core.getDraftManifest('tester')['drafts']['temp'] == [os.path.basename(x) for x in paths]
+    assert core.getInitInfo()[0] == backupPath and core.getInitInfo()[2]
+
+    assert core.clearTempData(force=True) == 2  # older than RETENTION_DAYS
+    assert core.clearTempData() == 0  # last pass too recent
+    assert [os.path.exists(x) for x in paths] == [False, False, True, True]
+    assert list(core.getTempData().values()) == paths[2:]
+    assert os.path.exists(backupPath)
+
+    core.removeDraft(backupPath)
+    os.remove(paths[3])  # removed outside of removeDraft
+    assert core.getInitInfo() == (paths[2], {'comment': os.path.basename(paths[2])}, False)
+    assert core.getDraftManifest('tester')['drafts'] == {'temp': [os.path.basename(paths[2])], 'error': []}
+
+    os.remove(os.path.join(folder, core.DRAFTS_FILE))
+    core._DRAFTS.clear()
+    assert core.getDraftManifest('tester')['drafts']['temp'] == [os.path.basename(paths[2])]  # rebuilt from the folder
+
+
+def readDbComments(dbPath):
+    with sqlite3.connect(dbPath) as conn:
+        return dict(conn.execute("SELECT uuid, comment FROM logs;").fetchall())
+
+
+def testOutboxIsDrainedOnceDatabaseIsBack(logsRepo, monkeypatch):
+    dbPath = str(logsRepo / 'machineMonitor.db')
+    monkeypatch.setattr(core, 'WRITE_THROUGH', True)
+    monkeypatch.setattr(core, 'SQL_DB', dbPath)
+    monkeypatch.setattr(core, 'OUTBOX_BATCH', 1)
+
+    logUuid = createLog(logsRepo)  # no database yet: kept in the outbox
+    assert core.saveData({'comment': 'edited'}, logUuid=logUuid) is None
+    with open(core.getOutboxPath(), 'r', encoding='utf-8') as f:
+        assert len(f.readlines()) == 2
+
+    init_db.migrateDatabase(dbPath)
+    assert core.saveData({'machineName': 'testMachine', 'type': 'info', 'project': 'test', 'comment': 'new'}) is None
+    comments = readDbComments(dbPath)
+    assert comments.pop(logUuid) == 'edited'  # last change of the log only
+    assert list(comments.values()) == ['new']
+    assert not os.path.exists(core.getOutboxPath())
+
+    other = dict(core.getDataFromUuid(logUuid), comment='other')
+    core.appendOutbox([(LOG_UUIDS[0], other), (LOG_UUIDS[1], None), (logUuid, None)])
+    writeLogsToDb = core.writeLogsToDb
+
+    def failAfterFirstBatch(records):
+        if calls:
+            raise sqlite3.OperationalError('database is locked')
+
+        calls.append(records)
+        writeLogsToDb(records)
+
+    calls = []
+    monkeypatch.setattr(core, 'writeLogsToDb', failAfterFirstBatch)
+    with pytest.raises(sqlite3.OperationalError):
+        core.drainOutbox()
+
+    with open(core.getOutboxPath(), 'r', encoding='utf-8') as f:  # committed batch removed, the others kept
+        assert [json.loads(x)['uuid'] for x in f] == [LOG_UUIDS[1], logUuid]
+
+    monkeypatch.setattr(core, 'writeLogsToDb', writeLogsToDb)
+    assert core.drainOutbox() == 2
+    comments = readDbComments(dbPath)
+    assert comments[LOG_UUIDS[0]] == 'other' and logUuid not in comments
+    assert not os.path.exists(core.getOutboxPath())
@@ -190,7 +190,7 @@ class LogViewerUi(QtWidgets.QDialog):
         self.model = QStringListModel()
         self.completer = QtWidgets.QCompleter()
         self.completer.setModel(self.model)
-        self.completer.setCompletionMode(QtWidgets.QCompleter.PopupCompletion)  # Display suggestions in a popup list
+        self.completer.setCompletionMode(QtWidgets.QCompleter.UnfilteredPopupCompletion)  # candidates come from CompletionEngine
         self.completer.setCaseSensitivity(Qt.CaseInsensitive)  # Make completion matching case-insensitive
         self.filterField.setCompleter(self.completer)
         layout.addWidget(self.filterField)
@@ -212,18 +212,22 @@ class LogViewerUi(QtWidgets.QDialog):
         self.mainLayout.addItem(spacer)
 
         layout = QtWidgets.QHBoxLayout()
-        self.tableWidget = QtWidgets.QTableWidget()
-        self.tableWidget.verticalHeader().setVisible(False)  # Hide the vertical header
-        self.tableWidget.horizontalHeader().setSectionResizeMode(QtWidgets.QHeaderView.Stretch)  # Make columns stretch proportionally with the widget
-        # self.tableWidget.horizontalHeader().setSectionResizeMode(QtWidgets.QHeaderView.Interactive)  # Allow the user to drag‑resize columns
-        self.tableWidget.horizontalHeader().setFixedHeight(30)
-        self.tableWidget.setSortingEnabled(True)  # Enable alphabetical sorting via header clicks
-        self.tableWidget.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)  # Disable cell editing
-        self.tableWidget.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectRows)  # Enable row-based selection
-        self.tableWidget.setSelectionMode(QtWidgets.QAbstractItemView.SingleSelection)  # Allow only a single row to be selected at a time
-        self.tableWidget.setMinimumSize(((self.uiWidth // 3) * 2) - 20, 20)
-        self.tableWidget.setSizePolicy(QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Expanding)
-        layout.addWidget(self.tableWidget)
+        self.tableModel = LogTableModel(self)
+        self.proxyModel = LogFilterProxyModel(self)
+        self.proxyModel.setSourceModel(self.tableModel)
+        self.tableView = QtWidgets.QTableView()
+        self.tableView.setModel(self.proxyModel)  # only the visible rows are asked to the model
+        self.tableView.verticalHeader().setVisible(False)  # Hide the vertical header
+        self.tableView.horizontalHeader().setSectionResizeMode(QtWidgets.QHeaderView.Stretch)  # Make columns stretch proportionally with the widget
+        # self.tableView.horizontalHeader().setSectionResizeMode(QtWidgets.QHeaderView.Interactive)  # Allow the user to drag‑resize columns
+        self.tableView.horizontalHeader().setFixedHeight(30)
+        self.tableView.setSortingEnabled(True)  # Enable alphabetical sorting via header clicks
+        self.tableView.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)  # Disable cell editing
+        self.tableView.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectRows)  # Enable row-based selection
+        self.tableView.setSelectionMode(QtWidgets.QAbstractItemView.SingleSelection)  # Allow only a single row to be selected at a time
+        self.tableView.setMinimumSize(((self.uiWidth // 3) * 2) - 20, 20)
+        self.tableView.setSizePolicy(QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Expanding)
+        layout.addWidget(self.tableView)
 
         degree = getAuthorisationDegree()
         key = min(AUTHORISATION_MENUS, key=lambda k: abs(degree - k))
@@ -245,3 +249,108 @@ class LogViewerUi(QtWidgets.QDialog):
             layout.addLayout(sideLayout)
 
         self.mainLayout.addLayout(layout)
+
+        self.progressBar = QtWidgets.QProgressBar()
+        self.progressBar.setMaximumHeight(10)
+        self.progressBar.setTextVisible(False)
+        self.progressBar.setVisible(False)
+        self.mainLayout.addWidget(self.progressBar)
+
+
+class LogTableModel(QtCore.QAbstractTableModel):
+    def __init__(self, parent=None):
+        super(LogTableModel, self).__init__(parent)
+        self.headers = []
+        self.rows = []  # log dicts from logger.core.getAllData, shared: read only
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self.headers)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole and section < len(self.headers):
+            return self.headers[section]
+
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        # text and tooltips are built when a cell is displayed, not for every log
+        if not index.isValid():
+            return None
+
+        row = self.rows[index.row()]
+        key = self.headers[index.column()]
+        if role == Qt.DisplayRole:
+            return str(row.get(key, ''))
+
+        if role == Qt.TextAlignmentRole:
+            return Qt.AlignCenter  # Center text horizontally and vertically
+
+        if role == Qt.ToolTipRole:
+            return self.getToolTip(row, key)
+
+        return None
+
+    def getToolTip(self, row, key):
+        if key == 'machineName':
+            return '\n'.join(f'{k}: {v}' for k, v in row.get('machineData', {}).items())
+
+        if key == 'date':
+            return row.get('timeStamp', '')
+
+        if key == 'type':
+            return row.get('comment', '')
+
+        if key == 'modified':
+            return '\n'.join('modified by: {0} at: {1}'.format(*x) for x in row.get(key, []))
+
+        return str(row.get(key, ''))
+
+    def updateRows(self, rows, removed):
+        # rows: uuid -> row to replace or append, removed: uuids to drop
+        positions = {row['uuid']: i for i, row in enumerate(self.rows)}
+        for logUuid, row in rows.items():
+            if logUuid in positions:
+                i = positions[logUuid]
+                self.rows[i] = row
+                self.dataChanged.emit(self.index(i, 0), self.index(i, len(self.headers) - 1))
+            else:
+                self.appendRows([row])
+
+        for i in sorted((positions[x] for x in removed if x in positions), reverse=True):
+            self.beginRemoveRows(QtCore.QModelIndex(), i, i)
+            del self.rows[i]
+            self.endRemoveRows()
+
+    def getUuid(self, row):
+        return self.rows[row]['uuid']
+
+    def appendRows(self, rows):
+        if not rows:
+            return
+
+        start = len(self.rows)
+        self.beginInsertRows(QtCore.QModelIndex(), start, start + len(rows) - 1)
+        self.rows.extend(rows)
+        self.endInsertRows()
+
+    def setRows(self, rows, headers):
+        self.beginResetModel()
+        self.rows = rows
+        self.headers = headers
+        self.endResetModel()
+
+
+class LogFilterProxyModel(QtCore.QSortFilterProxyModel):
+    def __init__(self, parent=None):
+        super(LogFilterProxyModel, self).__init__(parent)
+        self.uuids = None  # uuids to show (logger.core.getFilteredUuids), None shows every row
+
+    def setUuids(self, uuids):
+        self.uuids = uuids
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, sourceRow, sourceParent):
+        return self.uuids is None or self.sourceModel().getUuid(sourceRow) in self.uuids
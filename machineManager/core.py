@@ -25,6 +25,7 @@ NEEDED_INFOS = {'sector': ['1A', '1B', '1C', '2A', '2B', '2C'],
                 'in_service': True}
 MACHINE_FOLDER = os.path.join(BASE_FOLDER, 'data', 'machines')
 BUTTONS = ['edit', 'delete', 'add']
+_MACHINE_CACHE = {}  # machineName -> (mtime ns, size, data)
 
 
 def addEntry(name, data):
@@ -57,6 +58,7 @@ def deleteEntry(name):
     jsonFile = os.path.join(MACHINE_FOLDER, f'{name}.json')
 
     os.remove(jsonFile)
+    _MACHINE_CACHE.pop(name, None)
     print(f'deleted archive: {jsonFile}')
 
 
@@ -66,6 +68,7 @@ def getMachineData(machineName=None):
 
     If machineName is provided, only load that machine's data.
     Returns an empty dict if MACHINE_FOLDER does not exist or no matching file is found.
+    Files are only parsed when they changed since the last call (see getMachineRecord).
 
     :param machineName: The specific machine identifier to load data for, or None to load all machines.
     :type machineName: str or None
@@ -76,17 +79,51 @@ def getMachineData(machineName=None):
     if not os.path.exists(MACHINE_FOLDER):
         return {}
 
+    if machineName:
+        record = getMachineRecord(machineName)
+        return {machineName: record} if record is not None else {}
+
     data = {}
-    for item in os.listdir(MACHINE_FOLDER):
-        if not item.endswith('.json'):
-            continue
+    with os.scandir(MACHINE_FOLDER) as entries:
+        for entry in entries:
+            if not entry.name.endswith('.json'):
+                continue
+
+            shortName = os.path.splitext(entry.name)[0]
+            record = getMachineRecord(shortName, entry.stat())
+            if record is not None:
+                data[shortName] = record
+
+    return data
+
+
+def getMachineRecord(machineName, stat=None):
+    """
+    Load one machine JSON, parsing the file only if its mtime or size changed since the last load.
+
+    The returned dict is shared by every caller: read it, do not modify it.
+
+    :param machineName: The machine identifier (file name without extension).
+    :type machineName: str
+    :param stat: stat result of the file if the caller already has it (os.scandir).
+    :type stat: os.stat_result or None
+
+    :return: The machine data, or None if the file does not exist.
+    :rtype: dict or None
+    """
+    jsonFile = os.path.join(MACHINE_FOLDER, f'{machineName}.json')
+    try:
+        stat = stat or os.stat(jsonFile)
+    except OSError:
+        _MACHINE_CACHE.pop(machineName, None)
+        return None
 
-        shortName = os.path.splitext(item)[0]
-        if machineName and shortName != machineName:
-            continue
+    cached = _MACHINE_CACHE.get(machineName)
+    if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+        return cached[2]
 
-        itemPath = os.path.join(MACHINE_FOLDER, item)
-        with open(itemPath, 'r', encoding='utf-8') as f:
-            data[shortName] = json.load(f)
+    with open(jsonFile, 'r', encoding='utf-8') as f:
+        data = json.load(f)
 
+    _MACHINE_CACHE[machineName] = (stat.st_mtime_ns, stat.st_size, data)
     return data